@@ -48,6 +48,7 @@ def block_predict(config):
         path_imagedir (str):                Path to the directory containing the images for prediction.
         path_modeldir (str):                Path to the model directory in which fitted model weights and metadata are stored.
         path_pred (str):                    Path to the output file in which predicted csv file should be stored.
+        path_manifest (str):                Path to a manifest file or cache directory for persisting the directory scan (optional).
         xai_method (str or None):           Key for XAI method.
         xai_directory (str or None):        Path to the output directory in which predicted image xai heatmaps should be stored.
         batch_size (int):                   Number of samples inside a single batch.
@@ -59,7 +60,8 @@ def block_predict(config):
                          path_data=None,
                          training=False,
                          ohe=False,
-                         image_format=None)
+                         image_format=None,
+                         manifest=config.get("path_manifest"))
     (index_list, _, _, _, image_format) = ds
 
     # Verify existence of input directory
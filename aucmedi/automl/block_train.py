@@ -29,7 +29,9 @@ from tensorflow.keras.callbacks import ModelCheckpoint, CSVLogger, \
                                        ReduceLROnPlateau, EarlyStopping
 # Internal libraries
 from aucmedi import *
-from aucmedi.data_processing.io_loader import image_loader, sitk_loader
+from aucmedi.data_processing.io_loader import image_loader, sitk_loader, \
+                                              shard_loader
+from aucmedi.data_processing.io_shards import build_shards
 from aucmedi.sampling import sampling_split
 from aucmedi.utils.class_weights import *
 from aucmedi.data_processing.subfunctions import *
@@ -57,6 +59,8 @@ def block_train(config):
         path_gt (str):                      Path to the index/class annotation file if required. (only for 'csv' interface).
         analysis (str):                     Analysis mode for the AutoML training. Options: `["minimal", "standard", "advanced"]`.
         ohe (bool):                         Boolean option whether annotation data is sparse categorical or one-hot encoded.
+        path_shards (str):                  Path to a directory in which the images are packed into shards (optional).
+        path_manifest (str):                Path to a manifest file or cache directory for persisting the directory scan (optional).
         three_dim (bool):                   Boolean, whether data is 2D or 3D.
         shape_3D (tuple of int):            Desired input shape of 3D volume for architecture (will be cropped).
         epochs (int):                       Number of epochs. A single epoch is defined as one iteration through
@@ -75,7 +79,8 @@ def block_train(config):
                          path_data=config["path_gt"],
                          training=True,
                          ohe=config["ohe"],
-                         image_format=None)
+                         image_format=None,
+                         manifest=config.get("path_manifest"))
     (index_list, class_ohe, class_n, class_names, image_format) = ds
 
     # Create output directory
@@ -192,6 +197,16 @@ def block_train(config):
     if not config["three_dim"] : paras_datagen["loader"] = image_loader
     else : paras_datagen["loader"] = sitk_loader
 
+    # Pack images into shards for sequential reading if requested
+    if config.get("path_shards", None) is not None:
+        if not config["three_dim"] : shard_mode = "encoded"
+        else : shard_mode = "raw"
+        build_shards(index_list, config["path_imagedir"],
+                     config["path_shards"], image_format=image_format,
+                     mode=shard_mode, loader=paras_datagen["loader"])
+        paras_datagen["path_imagedir"] = config["path_shards"]
+        paras_datagen["loader"] = shard_loader
+
     # Gather training parameters
     paras_train = {
         "epochs": config["epochs"],
@@ -88,6 +88,8 @@ def cli_training(subparsers):
     | I/O           | `--path_modeldir`      | str        | `model`        | Path to the output directory in which fitted models and metadata are stored. |
     | I/O           | `--path_gt`            | str        | `None`         | Path to the index/class annotation file if required. (only for 'csv' interface). |
     | I/O           | `--ohe`                | bool       | `False`        | Boolean option whether annotation data is sparse categorical or one-hot encoded. |
+    | I/O           | `--path_shards`        | str        | `None`         | Path to a directory in which the images are packed into shards for sequential reading. |
+    | I/O           | `--path_manifest`      | str        | `None`         | Path to a manifest file or cache directory for persisting the scan of the image directory. |
     | Configuration | `--analysis`           | str        | `standard`     | Analysis mode for the AutoML training. Options: `["minimal", "standard", "advanced"]`. |
     | Configuration | `--three_dim`          | bool       | `False`        | Boolean, whether data is 2D or 3D. |
     | Configuration | `--shape_3D`           | str        | `128x128x128`  | Desired input shape of 3D volume for architecture (will be cropped into, format: `1x2x3`). |
@@ -148,6 +150,23 @@ def cli_training(subparsers):
                          "label data, " + \
                          "default: '%(default)s')",
                     )
+    od.add_argument("--path_shards",
+                    type=str,
+                    required=False,
+                    help="Path to a directory in which the images are " + \
+                         "packed into large shard files for sequential " + \
+                         "reading during training (created or extended " + \
+                         "automatically, default: '%(default)s')",
+                    )
+    od.add_argument("--path_manifest",
+                    type=str,
+                    required=False,
+                    help="Path to a manifest file or cache directory in " + \
+                         "which the scan of the image directory is " + \
+                         "persisted and only modified directories are " + \
+                         "rescanned (only for interface 'directory', " + \
+                         "default: '%(default)s')",
+                    )
 
     # Add configuration arguments
     oc = parser_train.add_argument_group("Arguments - Configuration")
@@ -234,6 +253,7 @@ def cli_prediction(subparsers):
     | I/O           | `--path_imagedir`      | str        | `test`         | Path to the directory containing the images. |
     | I/O           | `--path_modeldir`      | str        | `model`        | Path to the output directory in which fitted models and metadata are stored. |
     | I/O           | `--path_pred`          | str        | `preds.csv`    | Path to the output file in which predicted csv file should be stored. |
+    | I/O           | `--path_manifest`      | str        | `None`         | Path to a manifest file or cache directory for persisting the scan of the image directory. |
     | Configuration | `--xai_method`         | str        | `None`         | Key for XAI method.  |
     | Configuration | `--xai_directory`      | str        | `xai`          | Path to the output directory in which predicted image xai heatmaps should be stored. |
     | Configuration | `--batch_size`         | int        | `24`           | Number of samples inside a single batch. |
@@ -276,6 +296,14 @@ def cli_prediction(subparsers):
                          "file should be stored " + \
                          "(default: '%(default)s')",
                     )
+    od.add_argument("--path_manifest",
+                    type=str,
+                    required=False,
+                    help="Path to a manifest file or cache directory in " + \
+                         "which the scan of the image directory is " + \
+                         "persisted and only modified directories are " + \
+                         "rescanned (default: '%(default)s')",
+                    )
 
     # Add configuration arguments
     oc = parser_predict.add_argument_group("Arguments - Configuration")
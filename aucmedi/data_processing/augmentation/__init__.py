@@ -45,6 +45,7 @@ instead of meaningless characteristics due to a small data set size.
 
 **Recommendation:** <br>
 - For images (2D data): ImageAugmentation() <br>
+- For images (2D data) with cheap transformations only: ImageAugmentation(batch_mode=True) <br>
 - For volumes (3D data): BatchgeneratorsAugmentation() <br>
 
 ???+ example
@@ -23,6 +23,7 @@
 from albumentations import Compose
 import albumentations.augmentations as ai
 import warnings
+import cv2
 import numpy as np
 import random
 
@@ -51,6 +52,11 @@ class ImageAugmentation():
     operator = None
     # Option for augmentation refinement (padding, cropping and clipping)
     refine = True
+    # Option for applying transformations with a vectorized form on stacked batches
+    batch_mode = False
+    # OpenCV rotation codes for k counterclockwise 90 degree rotations (batch mode)
+    rotations = {1: cv2.ROTATE_90_COUNTERCLOCKWISE, 2: cv2.ROTATE_180,
+                 3: cv2.ROTATE_90_CLOCKWISE}
     # Augmentation: Flip
     aug_flip = False
     aug_flip_p = 0.5
@@ -113,13 +119,23 @@ class ImageAugmentation():
                  saturation=True, hue=True, scale=True, crop=False,
                  grid_distortion=False, compression=False, gaussian_noise=False,
                  gaussian_blur=False, downscaling=False, gamma=False,
-                 elastic_transform=False):
+                 elastic_transform=False, batch_mode=False):
         """ Initialization function for the Image Augmentation interface.
 
         With boolean switches, it is possible to selected desired augmentation techniques.
         Recommended augmentation configurations are defined as class variables.
         Of course, these configs can be adjusted if needed.
 
+        In batch mode, the cheap transformations flip, rotate, brightness, contrast and gamma are
+        applied by [apply_batch][aucmedi.data_processing.augmentation.aug_image.ImageAugmentation.apply_batch]
+        on the complete stacked batch (with random parameters for each sample, which are drawn for the batch at once).
+        Only the remaining transformations are applied via Albumentations on each sample individually.
+        The [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator] automatically
+        utilizes the batch mode if activated.
+
+        ???+ info
+            In batch mode, the vectorized transformations are applied after the sample-wise transformations.
+
         Args:
             flip (bool):                    Boolean, whether flipping should be performed as data augmentation.
             rotate (bool):                  Boolean, whether rotations should be performed as data augmentation.
@@ -136,6 +152,8 @@ class ImageAugmentation():
             downscaling (bool):             Boolean, whether downscaling should be added as data augmentation.
             gamma (bool):                   Boolean, whether gamma changes should be added as data augmentation.
             elastic_transform (bool):       Boolean, whether elastic deformation should be performed as data augmentation.
+            batch_mode (bool):              Boolean, whether flip, rotate, brightness, contrast and gamma should be
+                                            applied vectorized on complete batches instead of each sample.
 
         !!! warning
             If class variables (attributes) are modified, the internal augmentation operator
@@ -185,6 +203,7 @@ class ImageAugmentation():
         self.aug_gamma = gamma
         self.aug_gridDistortion = grid_distortion
         self.aug_elasticTransform = elastic_transform
+        self.batch_mode = batch_mode
         # Build augmentation operator
         self.build()
 
@@ -197,23 +216,26 @@ class ImageAugmentation():
         The activated transformation and their configurations are defined as
         class variables.
 
+        In batch mode, transformations with a vectorized form are excluded from the
+        operator and applied by apply_batch() instead.
+
         -> Builds a new self.operator
         """
         # Initialize transform list
         transforms = []
         # Fill transform list
-        if self.aug_flip:
+        if self.aug_flip and not self.batch_mode:
             tf = ai.Flip(p=self.aug_flip_p)
             transforms.append(tf)
-        if self.aug_rotate:
+        if self.aug_rotate and not self.batch_mode:
             tf = ai.RandomRotate90(p=self.aug_rotate_p)
             transforms.append(tf)
-        if self.aug_brightness:
+        if self.aug_brightness and not self.batch_mode:
             tf = ai.RandomBrightnessContrast(brightness_limit=self.aug_brightness_limits,
                                              contrast_limit=0,
                                              p=self.aug_brightness_p)
             transforms.append(tf)
-        if self.aug_contrast:
+        if self.aug_contrast and not self.batch_mode:
             tf = ai.RandomBrightnessContrast(contrast_limit=self.aug_contrast_limits,
                                              brightness_limit=0,
                                              p=self.aug_contrast_p)
@@ -256,7 +278,7 @@ class ImageAugmentation():
                               scale_max=self.aug_downscaling_effect,
                               p=self.aug_downscaling_p)
             transforms.append(tf)
-        if self.aug_gamma:
+        if self.aug_gamma and not self.batch_mode:
             tf = ai.RandomGamma(gamma_limit=self.aug_gamma_limit,
                                 p=self.aug_gamma_p)
             transforms.append(tf)
@@ -275,11 +297,15 @@ class ImageAugmentation():
 
         This **internal** function is called in the DataGenerator during batch generation.
 
+        In batch mode, only the transformations without a vectorized form are performed.
+
         Args:
             image (numpy.ndarray):          An image encoded as NumPy array with shape (x, y, channels).
         Returns:
             aug_image (numpy.ndarray):      An augmented / transformed image.
         """
+        # Skip sample-wise augmentation if all transformations are applied on the batch
+        if self.batch_mode and len(self.operator.transforms) == 0 : return image
         # Verify that image is in grayscale/RGB encoding
         if np.min(image) < 0 or np.max(image) > 255:
             warnings.warn("Image Augmentation: A value of the image is lower than 0 or higher than 255.",
@@ -291,13 +317,165 @@ class ImageAugmentation():
         aug_image = self.operator(image=image)["image"]
         # Perform padding & cropping if image shape changed
         if self.refine and aug_image.shape != org_shape:
-            aug_image = ai.pad(aug_image, org_shape[0], org_shape[1])
-            offset = (random.random(), random.random())
-            aug_image = ai.random_crop(aug_image,
-                                       org_shape[0], org_shape[1],
-                                       offset[0], offset[1])
+            aug_image = self._reshape(aug_image, org_shape)
         # Perform clipping if image is out of grayscale/RGB encodings
         if self.refine and (np.min(aug_image) < 0 or np.max(aug_image) > 255):
             aug_image = np.clip(aug_image, a_min=0, a_max=255)
         # Return augmented image
         return aug_image
+
+    """ Internal function for padding & cropping an augmented image back to its original shape. """
+    def _reshape(self, aug_image, org_shape):
+        aug_image = ai.pad(aug_image, org_shape[0], org_shape[1])
+        offset = (random.random(), random.random())
+        return ai.random_crop(aug_image, org_shape[0], org_shape[1],
+                              offset[0], offset[1])
+
+    #-----------------------------------------------------#
+    #              Perform Batch Augmentation             #
+    #-----------------------------------------------------#
+    def apply_batch(self, batch):
+        """ Performs the vectorized image augmentations of the batch mode on a stacked batch.
+
+        This **internal** function is called in the DataGenerator during batch generation
+        after all samples have been processed by apply().
+
+        Each transformation is applied on a random subset of the batch (according to its probability)
+        with individual random parameters for each sample, which are drawn for the complete batch at once.
+        Brightness, contrast and gamma changes of uint8 images are chained into a single lookup table for
+        each sample, which requires only one pass over the image.
+
+        Args:
+            batch (numpy.ndarray):          A batch of images encoded as NumPy array with shape (batch, x, y, channels).
+        Returns:
+            aug_batch (numpy.ndarray):      An augmented / transformed batch.
+        """
+        if not self.batch_mode : return np.array(batch)
+        # Perform flipping & rotation
+        aug_batch = self._geometric(batch)
+        # Perform brightness, contrast & gamma changes
+        if aug_batch.dtype == np.uint8 : self._intensity_uint8(aug_batch)
+        else : aug_batch = self._intensity_float(aug_batch)
+        # Perform clipping if batch is out of grayscale/RGB encodings
+        if self.refine and aug_batch.dtype != np.uint8 and \
+                (np.min(aug_batch) < 0 or np.max(aug_batch) > 255):
+            aug_batch = np.clip(aug_batch, a_min=0, a_max=255)
+        # Return augmented batch
+        return aug_batch
+
+    """ Internal function for randomly selecting the samples of a batch on which a transformation is applied. """
+    def _select(self, n, p):
+        return np.random.random_sample(n) < p
+
+    """ Internal function for flipping & rotating a batch.
+
+    The random parameters are drawn for all samples at once. Afterwards, only the selected samples
+    are flipped & rotated via OpenCV (samples which change their shape due to rotation are padded &
+    cropped back to their original shape).
+    """
+    def _geometric(self, batch):
+        n = len(batch)
+        code = np.full(n, 2)
+        factor = np.zeros(n, dtype=int)
+        # Sample flip code: 0 for vertical, 1 for horizontal and -1 for both
+        if self.aug_flip:
+            selected = self._select(n, self.aug_flip_p)
+            code = np.where(selected, np.random.randint(-1, 2, size=n), 2)
+        # Sample number of 90 degree rotations (counterclockwise)
+        if self.aug_rotate:
+            selected = self._select(n, self.aug_rotate_p)
+            factor = np.where(selected, np.random.randint(0, 4, size=n), 0)
+        # Transform selected samples
+        aug_batch = np.array(batch)
+        for i in np.flatnonzero((code != 2) | (factor > 0)):
+            img = aug_batch[i]
+            if code[i] != 2 : img = cv2.flip(img, int(code[i]))
+            if factor[i] > 0 : img = cv2.rotate(img, self.rotations[factor[i]])
+            # Restore channel axis (dropped by OpenCV for single channel images)
+            img = img.reshape(img.shape[:2] + aug_batch.shape[3:])
+            if img.shape != aug_batch.shape[1:]:
+                img = self._reshape(img, aug_batch.shape[1:])
+            aug_batch[i] = img
+        return aug_batch
+
+    """ Internal function for brightness, contrast & gamma changes of an uint8 batch (in-place).
+
+    Identical to Albumentations: Each transformation corresponds to a lookup table for each sample,
+    which are computed for all samples at once and chained into a single lookup table.
+    """
+    def _intensity_uint8(self, aug_batch):
+        n = len(aug_batch)
+        lut = np.tile(np.arange(0, 256, dtype=np.uint8), (n, 1))
+        changed = np.zeros(n, dtype=bool)
+        values = np.arange(0, 256, dtype=np.float32)[np.newaxis]
+        # Chain lookup table of brightness changes
+        if self.aug_brightness:
+            selected = self._select(n, self.aug_brightness_p)
+            beta = np.random.uniform(self.aug_brightness_limits[0],
+                                     self.aug_brightness_limits[1], size=n)
+            table = values + (beta[:, np.newaxis] * 255).astype(np.float32)
+            table = np.clip(table, 0, 255).astype(np.uint8)
+            lut[selected] = np.take_along_axis(table[selected],
+                                               lut[selected], axis=1)
+            changed |= selected
+        # Chain lookup table of contrast changes
+        if self.aug_contrast:
+            selected = self._select(n, self.aug_contrast_p)
+            alpha = 1.0 + np.random.uniform(self.aug_contrast_limits[0],
+                                            self.aug_contrast_limits[1], size=n)
+            table = values * alpha[:, np.newaxis].astype(np.float32)
+            table = np.clip(table, 0, 255).astype(np.uint8)
+            lut[selected] = np.take_along_axis(table[selected],
+                                               lut[selected], axis=1)
+            changed |= selected
+        # Chain lookup table of gamma changes
+        if self.aug_gamma:
+            selected = self._select(n, self.aug_gamma_p)
+            gamma = np.random.uniform(self.aug_gamma_limit[0],
+                                      self.aug_gamma_limit[1], size=n) / 100.0
+            table = np.arange(0, 256.0 / 255, 1.0 / 255)[np.newaxis]
+            table = ((table ** gamma[:, np.newaxis]) * 255).astype(np.uint8)
+            lut[selected] = np.take_along_axis(table[selected],
+                                               lut[selected], axis=1)
+            changed |= selected
+        # Apply chained lookup table on each changed sample
+        for i in np.flatnonzero(changed):
+            cv2.LUT(aug_batch[i], lut[i], dst=aug_batch[i])
+
+    """ Internal function for brightness, contrast & gamma changes of a non-uint8 batch.
+
+    Identical to Albumentations: Brightness & contrast are adjusted relative to the maximum value
+    of the data type and clipped. The random parameters are drawn for all samples at once and
+    each selected sample is adjusted in-place.
+    """
+    def _intensity_float(self, aug_batch):
+        n = len(aug_batch)
+        # Compute integer data types in single precision
+        if np.issubdtype(aug_batch.dtype, np.integer):
+            max_value = np.iinfo(aug_batch.dtype).max
+            img = aug_batch.astype(np.float32)
+        else : max_value, img = 1.0, aug_batch
+        # Perform brightness changes
+        if self.aug_brightness:
+            selected = self._select(n, self.aug_brightness_p)
+            beta = np.random.uniform(self.aug_brightness_limits[0],
+                                     self.aug_brightness_limits[1], size=n)
+            for i in np.flatnonzero(selected):
+                img[i] += beta[i] * max_value
+                np.clip(img[i], 0, max_value, out=img[i])
+        # Perform contrast changes
+        if self.aug_contrast:
+            selected = self._select(n, self.aug_contrast_p)
+            alpha = 1.0 + np.random.uniform(self.aug_contrast_limits[0],
+                                            self.aug_contrast_limits[1], size=n)
+            for i in np.flatnonzero(selected):
+                img[i] *= alpha[i]
+                np.clip(img[i], 0, max_value, out=img[i])
+        # Perform gamma changes
+        if self.aug_gamma:
+            selected = self._select(n, self.aug_gamma_p)
+            gamma = np.random.uniform(self.aug_gamma_limit[0],
+                                      self.aug_gamma_limit[1], size=n) / 100.0
+            for i in np.flatnonzero(selected):
+                np.power(img[i], gamma[i], out=img[i])
+        return img.astype(aug_batch.dtype, copy=False)
@@ -21,15 +21,29 @@
 #-----------------------------------------------------#
 # External libraries
 from tensorflow.keras.preprocessing.image import Iterator
+import tensorflow as tf
+from scipy import sparse
 import numpy as np
-from multiprocessing.pool import ThreadPool
+from multiprocessing.pool import ThreadPool, Pool
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing import resource_tracker
+from collections import OrderedDict
 from itertools import repeat
+import threading
+import random
+import queue
 import tempfile
 import pickle
+import time
 import os
 # Internal libraries
-from aucmedi.data_processing.io_loader import image_loader
+from aucmedi.data_processing.io_loader import image_loader, shard_loader
+from aucmedi.data_processing.io_loader.shard_loader import shard_entry
+from aucmedi.data_processing.io_cache import PreparedStore, DiskCache, \
+                                             MemoryCache, ReadAhead, fingerprint
 from aucmedi.data_processing.subfunctions import Standardize, Resize
+from aucmedi.data_processing.profiler import Profiler
+from aucmedi.data_processing.shuffling import BlockShuffle
 
 #-----------------------------------------------------#
 #                 Keras Data Generator                #
@@ -133,7 +147,10 @@ class DataGenerator(Iterator):
                  resize=(224, 224), standardize_mode="z-score", data_aug=None,
                  shuffle=False, grayscale=False, sample_weights=None, workers=1,
                  prepare_images=False, loader=image_loader, seed=None,
-                 **kwargs):
+                 prefetch=0, multiprocessing=False, prepare_dtype=None,
+                 prepared_store=None, disk_cache=None, memory_cache=None,
+                 profiling=False, loader_resize=False, read_ahead=None,
+                 load_policy=None, **kwargs):
         """ Initialization function of the DataGenerator which acts as a configuration hub.
 
         If using for prediction, the 'labels' parameter has to be `None`.
@@ -161,11 +178,13 @@ class DataGenerator(Iterator):
             Parameters defined in `**kwargs` are passed down to IO_loader functions.
 
         Args:
-            samples (list of str):              List of sample/index encoded as Strings. Provided by
+            samples (list of str):              List of sample/index encoded as Strings or a compact
+                                                [SampleTable][aucmedi.data_processing.sample_table.SampleTable]. Provided by
                                                 [input_interface][aucmedi.data_processing.io_data.input_interface].
             path_imagedir (str):                Path to the directory containing the images.
             labels (numpy.ndarray):             Classification list with One-Hot Encoding. Provided by
                                                 [input_interface][aucmedi.data_processing.io_data.input_interface].
+                                                A scipy.sparse matrix is densified separately for each batch.
             metadata (numpy.ndarray):           NumPy Array with additional metadata. Have to be shape (n_samples, meta_variables).
             image_format (str):                 Image format to add at the end of the sample index for image loading.
                                                 Provided by [input_interface][aucmedi.data_processing.io_data.input_interface].
@@ -176,15 +195,53 @@ class DataGenerator(Iterator):
                                                 Calls the [Standardize][aucmedi.data_processing.subfunctions.standardize] Subfunction.
             data_aug (Augmentation Interface):  Data Augmentation class instance which performs diverse augmentation techniques.
                                                 If `None` is provided, no augmentation will be performed.
-            shuffle (bool):                     Boolean, whether dataset should be shuffled.
+                                                If the batch mode of the augmentation is activated, vectorized transformations
+                                                and the standardization are applied on the complete batch.
+            shuffle (bool or BlockShuffle):     Boolean, whether dataset should be shuffled. Alternatively, a locality-aware
+                                                [BlockShuffle][aucmedi.data_processing.shuffling.BlockShuffle] strategy.
             grayscale (bool):                   Boolean, whether images are grayscale or RGB.
             sample_weights (list of float):     List of weights for samples. Can be computed via
                                                 [compute_sample_weights()][aucmedi.utils.class_weights.compute_sample_weights].
             workers (int):                      Number of workers. If n_workers > 1 = use multi-threading for image preprocessing.
+                                                The worker pool is created once and kept alive for the lifetime of the DataGenerator.
+            multiprocessing (bool):             Option whether to utilize multi-processing for workers instead of threading.
+                                                Worker processes write preprocessed samples directly into a shared memory batch.
+                                                Requires that all preprocessed samples have the same shape (e.g. by using `resize`).
             prepare_images (bool):              Boolean, whether all images should be prepared and backup to disk before training.
                                                 Recommended for large images or volumes to reduce CPU computing time.
+                                                If `resize` is defined, prepared images are stored in a memory-mapped
+                                                [PreparedStore][aucmedi.data_processing.io_cache.prepared_store.PreparedStore].
             loader (io_loader function):        Function for loading samples/images from disk.
             seed (int):                         Seed to ensure reproducibility for random function.
+            prefetch (int):                     Number of upcoming batches which are prepared in the background while the current
+                                                batch is consumed. If `0` is provided, no batches will be prefetched.
+            prepare_dtype (str):                Data type of the PreparedStore (e.g. `"float16"` or `"uint8"`) for reducing the disk and
+                                                memory footprint of prepared images. If `None`, the dtype of the prepared images is used.
+            prepared_store (PreparedStore):     An already filled PreparedStore for reusing prepared images of another DataGenerator
+                                                with identical preprocessing. Implies `prepare_images=True`.
+            disk_cache (DiskCache or str):      Persistent [DiskCache][aucmedi.data_processing.io_cache.disk_cache.DiskCache] (or path to its
+                                                directory) for sharing loaded, Subfunction processed and resized images across runs
+                                                and processes. If `None`, no disk cache is used.
+            memory_cache (MemoryCache or int):  In-memory LRU [MemoryCache][aucmedi.data_processing.io_cache.memory_cache.MemoryCache]
+                                                (or its byte budget) for keeping loaded, Subfunction processed and resized images
+                                                in the memory. If `None`, no memory cache is used.
+            profiling (bool or Profiler):       Option whether the runtime of each preprocessing stage should be recorded in a
+                                                [Profiler][aucmedi.data_processing.profiler.Profiler] (accessible via `profiler`).
+            loader_resize (bool):               Option whether the resize shape is passed to the IO_loader function as `resize` parameter,
+                                                e.g. for reduced-resolution decoding in the
+                                                [image_loader()][aucmedi.data_processing.io_loader.image_loader] or
+                                                single-pass resampling in the [sitk_loader()][aucmedi.data_processing.io_loader.sitk_loader].
+                                                Resizing is skipped for images which already have the target shape.
+                                                Only supported with shape preserving Subfunctions (e.g. not with Crop or Padding),
+                                                because the Subfunctions are applied after the reduced-resolution loading.
+            read_ahead (ReadAhead or int):      [ReadAhead][aucmedi.data_processing.io_cache.read_ahead.ReadAhead] (or its look-ahead
+                                                window in samples) for fetching the raw files of upcoming samples of the epoch
+                                                in the background. If `None`, files are read on demand.
+                                                Not applied with the [shard_loader()][aucmedi.data_processing.io_loader.shard_loader],
+                                                which reads samples from already opened shards.
+            load_policy (LoadPolicy):           [LoadPolicy][aucmedi.data_processing.load_policy.LoadPolicy] for loading samples with
+                                                hedged reads, per-sample deadlines and a fallback for straggling samples.
+                                                If `None`, samples are loaded directly without deadline.
             **kwargs (dict):                    Additional parameters for the sample loader.
         """
         # Cache class variables
@@ -192,17 +249,30 @@ class DataGenerator(Iterator):
         self.metadata = metadata
         self.sample_weights = sample_weights
         self.prepare_images = prepare_images
+        self.prepare_dtype = prepare_dtype
+        self.prepared_store = prepared_store
         self.workers = workers
         self.sample_loader = loader
         self.kwargs = kwargs
+        self.loader_resize = loader_resize
         self.samples = samples
         self.path_imagedir = path_imagedir
         self.image_format = image_format
         self.grayscale = grayscale
         self.subfunctions = subfunctions
         self.data_aug = data_aug
+        # Apply vectorized augmentation on complete batches if supported
+        self.aug_batch = getattr(data_aug, "batch_mode", False)
         self.standardize_mode = standardize_mode
         self.resize = resize
+        self.prefetch = prefetch
+        self.multiprocessing = multiprocessing
+        # Initialize profiler for recording stage runtimes
+        if isinstance(profiling, Profiler) : self.profiler = profiling
+        elif profiling : self.profiler = Profiler()
+        else : self.profiler = None
+        # Initialize persistent worker pool and prefetch queue (created lazily)
+        self.__init_pools__()
 
         # Initialize Standardization Subfunction
         if standardize_mode is not None:
@@ -211,13 +281,36 @@ class DataGenerator(Iterator):
         # Initialize Resizing Subfunction
         if resize is not None : self.sf_resize = Resize(shape=resize)
         else : self.sf_resize = None
+        # Pass resize shape to the IO_loader if activated
+        if loader_resize and resize is not None:
+            # Subfunctions would operate on the downscaled instead of the original image
+            for sf in subfunctions:
+                if not getattr(sf, "shape_preserving", False):
+                    raise ValueError("Option loader_resize is not supported with " + \
+                                     "Subfunctions changing the image shape!",
+                                     type(sf).__name__)
+            self.loader_kwargs = dict(kwargs, resize=resize)
+        else : self.loader_kwargs = kwargs
+        # Initialize image caches and fingerprint of the preprocessing
+        if isinstance(disk_cache, str) : disk_cache = DiskCache(disk_cache)
+        self.disk_cache = disk_cache
+        if isinstance(memory_cache, int):
+            memory_cache = MemoryCache(max_size=memory_cache)
+        self.memory_cache = memory_cache
+        if isinstance(read_ahead, int) : read_ahead = ReadAhead(window=read_ahead)
+        self.read_ahead = read_ahead
+        self.load_policy = load_policy
+        if disk_cache is not None or memory_cache is not None:
+            self.cache_config = fingerprint(loader, self.loader_kwargs,
+                                            image_format, grayscale,
+                                            subfunctions, resize)
         # Sanity check for full sample list
         if samples is not None and len(samples) == 0:
             raise ValueError("Provided sample list is empty!", len(samples))
         # Sanity check for label correctness
-        if labels is not None and len(samples) != len(labels):
+        if labels is not None and len(samples) != np.shape(labels)[0]:
             raise ValueError("Samples and labels do not have same size!",
-                             len(samples), len(labels))
+                             len(samples), np.shape(labels)[0])
         # Sanity check for metadata correctness
         if metadata is not None and len(samples) != len(metadata):
             raise ValueError("Samples and metadata do not have same size!",
@@ -227,7 +320,9 @@ class DataGenerator(Iterator):
             raise ValueError("Samples and sample weights do not have same size!",
                              len(samples), len(sample_weights))
         # Verify that labels, metadata and sample weights are NumPy arrays
-        if labels is not None and not isinstance(labels, np.ndarray):
+        if labels is not None and sparse.issparse(labels):
+            self.labels = labels.tocsr()
+        elif labels is not None and not isinstance(labels, np.ndarray):
             self.labels = np.asarray(self.labels)
         if metadata is not None and not isinstance(metadata, np.ndarray):
             self.metadata = np.asarray(self.metadata)
@@ -235,127 +330,791 @@ class DataGenerator(Iterator):
                                                          np.ndarray):
             self.sample_weights = np.asarray(self.sample_weights)
 
+        # If a PreparedStore is provided -> reuse already prepared images
+        if self.prepared_store is not None:
+            self.prepare_images = True
+            if not self.prepared_store.fits(resize):
+                raise ValueError("Shape of the provided PreparedStore does " + \
+                                 "not match the resize shape!",
+                                 self.prepared_store.shape, resize)
+            for sample in samples:
+                if not self.prepared_store.contains(sample):
+                    raise ValueError("Sample is not prepared in the provided" + \
+                                     " PreparedStore!", sample)
         # If prepare_image modus activated
         # -> Preprocess images beforehand and store them to disk for fast usage later
-        if self.prepare_images:
+        elif self.prepare_images:
             self.prepare_dir_object = tempfile.TemporaryDirectory(
                                                prefix="aucmedi.tmp.",
                                                suffix=".data")
             self.prepare_dir = self.prepare_dir_object.name
+            index_array = list(range(0, len(samples)))
+
+            # Allocate a memory-mapped store if all images have an identical shape
+            if self.sf_resize is not None:
+                img = self.preprocess_image(index=0, prepared_image=False,
+                                            run_aug=False,
+                                            run_standardize=False)
+                if self.prepare_dtype is None : dtype = img.dtype
+                else : dtype = self.prepare_dtype
+                self.prepared_store = PreparedStore(
+                                        os.path.join(self.prepare_dir, "store"),
+                                        samples, img.shape, dtype)
+                self.prepared_store.write(samples[0], img)
+                # Prepare each unique sample only once
+                index_unique = {}
+                for i, sample in enumerate(samples):
+                    if sample not in index_unique : index_unique[sample] = i
+                index_array = list(index_unique.values())[1:]
 
             # Preprocess image for each index - Sequential
             if self.workers == 0 or self.workers == 1:
-                for i in range(0, len(samples)):
+                for i in index_array:
                     self.preprocess_image(index=i, prepared_image=False,
                                           run_aug=False, run_standardize=False,
                                           dump_pickle=True)
+            # Preprocess image for each index - Multi-processing
+            elif self.multiprocessing:
+                self._get_worker_pool().map(__mp_prepare__, index_array)
             # Preprocess image for each index - Multi-threading
             else:
-                with ThreadPool(self.workers) as pool:
-                    index_array = list(range(0, len(samples)))
-                    mp_params = zip(index_array, repeat(False), repeat(False),
-                                    repeat(False), repeat(True))
-                    pool.starmap(self.preprocess_image, mp_params)
+                mp_params = zip(index_array, repeat(False), repeat(False),
+                                repeat(False), repeat(True))
+                self._get_worker_pool().starmap(self.preprocess_image,
+                                                mp_params)
+            if self.prepared_store is not None : self.prepared_store.flush()
             print("A directory for image preparation was created:",
                   self.prepare_dir)
 
         # Pass initialization parameters to parent Iterator class
         size = len(samples)
         super(DataGenerator, self).__init__(size, batch_size, shuffle, seed)
+        # Create worker pool in the main thread (process workers obtain a snapshot of the DataGenerator)
+        if self.workers > 1 : self._get_worker_pool()
 
     #-----------------------------------------------------#
     #              Batch Generation Function              #
     #-----------------------------------------------------#
     """ Internal function for batch generation given a list of random selected samples. """
     def _get_batches_of_transformed_samples(self, index_array):
-        # Initialize Batch stack
-        batch_stack = ([],)
-        if self.labels is not None : batch_stack += ([],)
-        if self.sample_weights is not None : batch_stack += ([],)
+        # Reinitialize pools if generator was forked into a new process
+        if self.pool_pid != os.getpid() : self.__init_pools__()
+        # Obtain batch from prefetch queue if it was already prepared
+        batch = self._fetch_prefetched_batch(index_array)
+        if batch is not None : return batch
+        # Otherwise, generate batch directly
+        return self._run_stage("batch", self._generate_batch, index_array)
 
-        # Process image for each index - Sequential
-        if self.workers == 0 or self.workers == 1:
-            for i in index_array:
-                batch_img = self.preprocess_image(index=i,
-                                                  prepared_image=self.prepare_images)
-                batch_stack[0].append(batch_img)
-        # Process image for each index - Multi-threading
-        else:
-            with ThreadPool(self.workers) as pool:
-                mp_params = zip(index_array, repeat(self.prepare_images))
-                batches_img = pool.starmap(self.preprocess_image, mp_params)
-            batch_stack[0].extend(batches_img)
-
-        # Add classification to batch if available
-        if self.labels is not None:
-            batch_stack[1].extend(self.labels[index_array])
-        # Add sample weight to batch if available
-        if self.sample_weights is not None:
-            batch_stack[2].extend(self.sample_weights[index_array])
+    """ Internal function for creating a batch by preprocessing all samples of the index array. """
+    def _generate_batch(self, index_array):
+        # Process images for each index - Multi-processing
+        if self.workers > 1 and self.multiprocessing:
+            input_stack = self._preprocess_shared(index_array)
+        # Process images for each index - Sequential or Multi-threading
+        else : input_stack = self._preprocess_batch(index_array)
+        # Apply vectorized augmentation & standardization on the complete batch
+        if self.aug_batch : input_stack = self._augment_batch(input_stack)
 
-        # Stack images and optional metadata together into a batch
-        input_stack = np.stack(batch_stack[0], axis=0)
+        # Add optional metadata to batch
         if self.metadata is not None:
             input_stack = [input_stack, self.metadata[index_array]]
         batch = (input_stack, )
-        # Stack classifications together into a batch if available
-        if self.labels is not None:
-            batch += (np.stack(batch_stack[1], axis=0), )
-        # Stack sample weights together into a batch if available
+        # Add classifications to batch if available
+        if self.labels is not None and sparse.issparse(self.labels):
+            batch += (self.labels[index_array].toarray(), )
+        elif self.labels is not None:
+            batch += (self.labels[index_array], )
+        # Add sample weights to batch if available
         if self.sample_weights is not None:
-            batch += (np.stack(batch_stack[2], axis=0), )
+            batch += (self.sample_weights[index_array], )
         # Return generated Batch
         return batch
 
+    """ Internal function for preprocessing samples directly into a preallocated batch.
+
+    The output shape and dtype of a sample is inferred once by processing the first sample.
+    Samples which do not fit into the preallocated batch (e.g. varying shapes without resizing)
+    fall back to stacking the batch.
+    """
+    def _preprocess_batch(self, index_array):
+        index_array = list(index_array)
+        # Infer sample shape & dtype by preprocessing the first sample
+        first_img = None
+        if self.sample_spec is None:
+            first_img = self.preprocess_image(index=index_array[0],
+                                              prepared_image=self.prepare_images,
+                                              run_standardize=not self.aug_batch)
+            self.sample_spec = (first_img.shape, first_img.dtype.str)
+        shape, dtype = self.sample_spec
+        # Allocate batch
+        batch_img = np.empty((len(index_array),) + tuple(shape), dtype=dtype)
+        params = [(batch_img, slot, i) for slot, i in enumerate(index_array)]
+        if first_img is not None:
+            batch_img[0] = first_img
+            params = params[1:]
+        # Process image for each index - Sequential
+        if self.workers == 0 or self.workers == 1:
+            misfits = [self._preprocess_into(*p) for p in params]
+        # Process image for each index - Multi-threading
+        else:
+            misfits = self._get_worker_pool().starmap(self._preprocess_into,
+                                                      params)
+        # Stack batch if samples did not fit into the preallocated batch
+        if any(img is not None for img in misfits):
+            if first_img is not None : misfits = [None] + misfits
+            batch_list = [batch_img[slot] if img is None else img \
+                          for slot, img in enumerate(misfits)]
+            batch_img = np.stack(batch_list, axis=0)
+        # Return batch of images
+        return batch_img
+
+    """ Internal function for preprocessing a sample and writing it into a slot of the batch.
+
+    Returns None if successful or the preprocessed image if it does not fit into the batch.
+    """
+    def _preprocess_into(self, batch_img, slot, index):
+        img = self.preprocess_image(index=index,
+                                    prepared_image=self.prepare_images,
+                                    run_standardize=not self.aug_batch)
+        if img.shape != batch_img.shape[1:] or img.dtype != batch_img.dtype:
+            return img
+        self._run_stage("batch_assembly", self._write_slot, batch_img, slot, img)
+
+    """ Internal function for applying the vectorized augmentation and afterwards the standardization
+        on a batch of images (only utilized if the batch mode of the augmentation is activated).
+    """
+    def _augment_batch(self, batch_img):
+        batch_img = self._run_stage("augmentation_batch",
+                                    self.data_aug.apply_batch, batch_img)
+        if self.sf_standardize is None : return batch_img
+        # Standardize first image & allocate standardized batch
+        first_img = self._run_stage("standardize",
+                                    self.sf_standardize.transform, batch_img[0])
+        batch_std = np.empty((len(batch_img),) + first_img.shape,
+                             dtype=first_img.dtype)
+        batch_std[0] = first_img
+        params = [(batch_img, batch_std, slot) \
+                  for slot in range(1, len(batch_img))]
+        # Standardize each image - Multi-threading
+        if self.workers > 1 and not self.multiprocessing:
+            self._get_worker_pool().starmap(self._standardize_into, params)
+        # Standardize each image - Sequential
+        else:
+            for p in params : self._standardize_into(*p)
+        return batch_std
+
+    """ Internal function for standardizing an image of a batch and writing it into the standardized batch. """
+    def _standardize_into(self, batch_img, batch_std, slot):
+        batch_std[slot] = self._run_stage("standardize",
+                                          self.sf_standardize.transform,
+                                          batch_img[slot])
+
+    """ Internal function for writing a sample into a slot of the batch. """
+    def _write_slot(self, batch_img, slot, img):
+        batch_img[slot] = img
+        return batch_img[slot]
+
+    """ Keras Iterator: Compute the sample order of an epoch (global or locality-aware shuffling). """
+    def _set_index_array(self):
+        if isinstance(self.shuffle, BlockShuffle):
+            self.index_array = self.shuffle.permutation(self.n)
+        else : super(DataGenerator, self)._set_index_array()
+
+    #-----------------------------------------------------#
+    #                  Batch Prefetching                  #
+    #-----------------------------------------------------#
+    """ Keras Sequence access: Schedule the upcoming batches before returning the batch at position idx. """
+    def __getitem__(self, idx):
+        if self.pool_pid != os.getpid() : self.__init_pools__()
+        # Create worker pool in the calling thread instead of the prefetching thread
+        if self.workers > 1 : self._get_worker_pool()
+        if (self.prefetch or self.read_ahead is not None) and idx < len(self):
+            # Compute sample order of the epoch like the Keras Sequence access
+            if self.index_array is None:
+                if self.seed is not None:
+                    np.random.seed(self.seed + self.total_batches_seen)
+                self._set_index_array()
+            if self.read_ahead is not None : self._schedule_read_ahead(idx)
+            if self.prefetch : self._schedule_prefetch(idx + 1)
+        return super(DataGenerator, self).__getitem__(idx)
+
+    """ Keras Iterator access: Schedule the upcoming batches of the current epoch before returning the next batch. """
+    def next(self):
+        if self.pool_pid != os.getpid() : self.__init_pools__()
+        # Create worker pool in the calling thread instead of the prefetching thread
+        if self.workers > 1 : self._get_worker_pool()
+        with self.lock:
+            index_array = next(self.index_generator)
+            next_idx = self.batch_index
+        # Fetch files of the current and upcoming samples in the background
+        if self.read_ahead is not None:
+            self._schedule_read_ahead((next_idx - 1) % len(self))
+        # Prefetch only inside the current epoch (new epochs are reshuffled)
+        if self.prefetch and next_idx > 0 : self._schedule_prefetch(next_idx)
+        # The transformation of images is not under thread lock
+        return self._get_batches_of_transformed_samples(index_array)
+
+    """ Internal function for scheduling the batches [start, start+prefetch) in the background.
+
+    The batches are identified by the known index_array order of the current epoch.
+    """
+    def _schedule_prefetch(self, start):
+        end = min(start + self.prefetch, len(self))
+        with self.prefetch_lock:
+            # Drop stale batches which were skipped by the consumer
+            for idx in list(self.prefetch_queue.keys()):
+                if idx < start - 1 : del self.prefetch_queue[idx]
+            # Initialize background thread for batch preparation
+            if self.pool_prefetch is None : self.pool_prefetch = ThreadPool(1)
+            # Queue batch generation for upcoming batches
+            for idx in range(start, end):
+                if idx in self.prefetch_queue : continue
+                index_array = self.index_array[self.batch_size * idx :
+                                               self.batch_size * (idx + 1)]
+                result = self.pool_prefetch.apply_async(self._run_stage,
+                                                        ("batch",
+                                                         self._generate_batch,
+                                                         index_array))
+                self.prefetch_queue[idx] = (index_array, result)
+
+    """ Internal function for obtaining a prefetched batch. Returns None if the batch was not prefetched. """
+    def _fetch_prefetched_batch(self, index_array):
+        result = None
+        with self.prefetch_lock:
+            for idx, (prefetched_array, prefetched_result) in \
+                    self.prefetch_queue.items():
+                if np.array_equal(prefetched_array, index_array):
+                    result = prefetched_result
+                    del self.prefetch_queue[idx]
+                    break
+        # Wait until background preparation of batch is finished
+        if result is not None : return result.get()
+        else : return None
+
+    """ Internal function for scheduling the raw files of the samples starting at batch idx for the read-ahead.
+
+    The look-ahead window covers the upcoming samples of the current epoch.
+    """
+    def _schedule_read_ahead(self, idx):
+        # Worker processes load samples directly
+        if self.workers > 1 and self.multiprocessing : return
+        start = self.batch_size * idx
+        index_array = self.index_array[start : start + self.read_ahead.window]
+        files = [self._sample_file(i) for i in index_array]
+        self.read_ahead.schedule(self.path_imagedir, files)
+
+    """ Internal function for stopping the prefetching thread and clearing the prefetch queue. """
+    def _stop_prefetch(self):
+        with self.prefetch_lock:
+            self.prefetch_queue.clear()
+            if self.pool_prefetch is not None:
+                self.pool_prefetch.terminate()
+                self.pool_prefetch = None
+
+    #-----------------------------------------------------#
+    #                 Worker Pool Handling                #
+    #-----------------------------------------------------#
+    """ Internal function for (re)initializing the worker pool, prefetch queue and shared memory buffers.
+
+    Pools are bound to the process which created them. Thus, a forked DataGenerator
+    (e.g. via Keras `use_multiprocessing`) creates its own pools on first access.
+    """
+    def __init_pools__(self):
+        self.pool_workers = None
+        self.pools = {}
+        self.pool_size = None
+        self.pool_lock = threading.Lock()
+        self.pool_prefetch = None
+        self.pool_pid = os.getpid()
+        self.prefetch_queue = OrderedDict()
+        self.prefetch_lock = threading.Lock()
+        self.shm_buffers = queue.LifoQueue()
+        self.shm_blocks = []
+        self.sample_spec = None
+
+    """ Internal function for obtaining the persistent worker pool (threads or processes).
+
+    One pool is kept for each multi-processing option. The pools are rebuilt if the number of workers changed.
+    Process workers obtain a pickled snapshot of the DataGenerator instead of a reference, which
+    would keep the DataGenerator (and thereby the pool) alive.
+    """
+    def _get_worker_pool(self):
+        multiprocessing = self.multiprocessing
+        with self.pool_lock:
+            if self.pool_size != self.workers:
+                for pool in self.pools.values() : pool.terminate()
+                self.pools = {}
+                self.pool_size = self.workers
+            if multiprocessing not in self.pools and multiprocessing:
+                # Share the resource tracker with workers to avoid early unlinking
+                resource_tracker.ensure_running()
+                self.pools[True] = Pool(self.workers,
+                                        initializer=__mp_initialize__,
+                                        initargs=(pickle.dumps(self),))
+            elif multiprocessing not in self.pools:
+                self.pools[False] = ThreadPool(self.workers)
+            self.pool_workers = self.pools[multiprocessing]
+            return self.pools[multiprocessing]
+
+    """ Multi-processing option: Changing it switches an existing worker pool in the calling thread. """
+    @property
+    def multiprocessing(self):
+        return self._multiprocessing
+
+    @multiprocessing.setter
+    def multiprocessing(self, multiprocessing):
+        self._multiprocessing = bool(multiprocessing)
+        if getattr(self, "pool_workers", None) is not None and \
+                self.pool_pid == os.getpid():
+            self._get_worker_pool()
+
+    """ Internal function for preprocessing samples via worker processes into a shared memory batch.
+
+    The output shape and dtype of a sample is inferred once by processing the first sample in the
+    main process. Afterwards, workers write their samples directly into a reusable shared memory block
+    and only the finished batch is copied out of it.
+    """
+    def _preprocess_shared(self, index_array):
+        pool = self._get_worker_pool()
+        index_array = list(index_array)
+        # Infer sample shape & dtype by preprocessing the first sample locally
+        first_img = None
+        if self.sample_spec is None:
+            first_img = self.preprocess_image(index=index_array[0],
+                                              prepared_image=self.prepare_images,
+                                              run_standardize=not self.aug_batch)
+            self.sample_spec = (first_img.shape, first_img.dtype.str)
+        shape, dtype = self.sample_spec
+        # Obtain a free shared memory block (or allocate a new one)
+        try : shm = self.shm_buffers.get_nowait()
+        except queue.Empty:
+            nbytes = self.batch_size * int(np.prod(shape)) * \
+                     np.dtype(dtype).itemsize
+            shm = SharedMemory(create=True, size=max(nbytes, 1))
+            self.shm_blocks.append(shm)
+        try:
+            batch_shape = (len(index_array),) + tuple(shape)
+            batch_img = np.ndarray(batch_shape, dtype=dtype, buffer=shm.buf)
+            # Let workers write preprocessed samples into the shared memory
+            mp_params = [(i, self.prepare_images, shm.name, batch_shape, dtype,
+                          slot) for slot, i in enumerate(index_array)]
+            if first_img is not None:
+                batch_img[0] = first_img
+                mp_params = mp_params[1:]
+            pool.starmap(__mp_preprocess__, mp_params)
+            # Copy finished batch out of the reusable shared memory block
+            batch = np.array(batch_img)
+            del batch_img
+        finally : self.shm_buffers.put(shm)
+        return batch
+
+    """ Internal function for closing all pools and releasing the shared memory blocks. """
+    def _shutdown_pools(self):
+        self._stop_prefetch()
+        for pool in self.pools.values() : pool.terminate()
+        self.pools = {}
+        self.pool_workers = None
+        for shm in self.shm_blocks:
+            shm.close()
+            try : shm.unlink()
+            except FileNotFoundError : pass
+        self.shm_blocks = []
+        self.shm_buffers = queue.LifoQueue()
+
+    """ Pickling support: Pools, locks and shared memory are not transferred to other processes. """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in ["pool_workers", "pools", "pool_lock", "pool_prefetch",
+                     "prefetch_queue",
+                     "prefetch_lock", "shm_buffers", "shm_blocks", "lock",
+                     "index_generator", "prepare_dir_object"]:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__init_pools__()
+        self.lock = threading.Lock()
+        self.index_generator = self._flow_index()
+
+    """ Keras Iterator functions: Prefetched batches become invalid on a new epoch or a reset. """
+    def on_epoch_end(self):
+        self._stop_prefetch()
+        if self.read_ahead is not None : self.read_ahead.clear()
+        super(DataGenerator, self).on_epoch_end()
+
+    def reset(self):
+        self._stop_prefetch()
+        if self.read_ahead is not None : self.read_ahead.clear()
+        super(DataGenerator, self).reset()
+
+    """ Clean shutdown of the worker pool and prefetching thread on garbage collection. """
+    def __del__(self):
+        if getattr(self, "pool_pid", None) == os.getpid():
+            self._shutdown_pools()
+
     #-----------------------------------------------------#
     #                 Image Preprocessing                 #
     #-----------------------------------------------------#
+    """ Internal function for obtaining an image given its index with applied Subfunctions and resizing.
+
+    As the output is independent of augmentation, it is obtained from or stored in the memory and disk cache if provided.
+    """
+    def load_image(self, index):
+        # Obtain image from memory cache if available
+        if self.memory_cache is not None:
+            memory_key = (self.cache_config, self.samples[index])
+            img = self._run_stage("memory_cache", self.memory_cache.get,
+                                  memory_key)
+            if img is not None : return img
+        # Obtain image from persistent disk cache if available
+        img = None
+        if self.disk_cache is not None:
+            cache_key = self._disk_cache_key(index)
+            img = self._run_stage("disk_cache", self.disk_cache.get, cache_key)
+        if img is None:
+            try : img = self._load_transform(index)
+            # Substitute timed out samples if defined by the load policy
+            # (substitutes are not cached for the timed out sample)
+            except TimeoutError:
+                if self.load_policy is None : raise
+                substitute = self.load_policy.substitute(index, self.labels)
+                if substitute is None : raise
+                return self._load_transform(substitute)
+            # Store preprocessed image in persistent disk cache
+            if self.disk_cache is not None:
+                self.disk_cache.put(cache_key, img)
+        # Store preprocessed image as read-only view in memory cache
+        if self.memory_cache is not None:
+            img = img.view()
+            img.flags.writeable = False
+            self.memory_cache.put(memory_key, img)
+        # Return loaded image
+        return img
+
+    """ Internal function for loading an image given its index and applying Subfunctions and resizing. """
+    def _load_transform(self, index):
+        # Obtain directory of the raw file (staged by the read-ahead)
+        path_imagedir = self.path_imagedir
+        if self.read_ahead is not None:
+            file = self._sample_file(index)
+            if file is not None:
+                path_imagedir = self._run_stage("read_ahead",
+                                                self.read_ahead.get,
+                                                self.path_imagedir, file)
+        # Load image from disk (optionally with hedged reads and deadline)
+        if self.load_policy is not None:
+            load = (self.load_policy.load, self.sample_loader)
+        else : load = (self.sample_loader, )
+        try:
+            img = self._run_stage("loader", *load,
+                                  self.samples[index], path_imagedir,
+                                  image_format=self.image_format,
+                                  grayscale=self.grayscale,
+                                  **self.loader_kwargs)
+        # Remove staged copy of the raw file
+        finally:
+            if path_imagedir != self.path_imagedir:
+                self.read_ahead.release(path_imagedir, file)
+        # Apply subfunctions on image
+        for sf in self.subfunctions:
+            img = self._run_stage("subfunction." + type(sf).__name__,
+                                  sf.transform, img)
+        # Apply resizing on image if activated
+        # (skipped if the IO_loader already resized the image to the target shape)
+        if self.sf_resize is not None and not (self.loader_resize and \
+                tuple(img.shape[:-1]) == tuple(self.resize)):
+            img = self._run_stage("resize", self.sf_resize.transform, img)
+        # Return loaded image
+        return img
+
+    """ Internal function for running a preprocessing stage and recording its runtime if profiling is activated. """
+    def _run_stage(self, stage, func, *args, **kwargs):
+        if self.profiler is None : return func(*args, **kwargs)
+        start = time.perf_counter()
+        output = func(*args, **kwargs)
+        self.profiler.record(stage, time.perf_counter() - start, output)
+        return output
+
+    """ Internal function for obtaining the relative file path of a sample given its index (or None if the sample is not a path). """
+    def _sample_file(self, index):
+        sample = self.samples[index]
+        if not isinstance(sample, str) : return None
+        # Samples of shards are no single files
+        if self.sample_loader is shard_loader : return None
+        if self.image_format : sample = sample + "." + self.image_format
+        return sample
+
+    """ Internal function for computing the disk cache key of an image given its index.
+
+    The key is based on the preprocessing configuration, the sample path and its modification time & size.
+    Samples of shards are identified by their index entry (shard, offset & length) instead.
+    """
+    def _disk_cache_key(self, index):
+        sample = self.samples[index]
+        # Obtain location of sample in append-only shards
+        if self.sample_loader is shard_loader:
+            return self.disk_cache.key(self.cache_config, self.path_imagedir,
+                                       sample, shard_entry(self.path_imagedir,
+                                                           sample))
+        if self.image_format : sample = sample + "." + self.image_format
+        # Obtain file status (if sample is a file)
+        try:
+            path_sample = os.path.join(self.path_imagedir, sample)
+            stat = os.stat(path_sample)
+            file_status = (stat.st_mtime_ns, stat.st_size)
+        except (OSError, TypeError):
+            path_sample, file_status = sample, None
+        return self.disk_cache.key(self.cache_config, path_sample,
+                                   file_status)
+
     """ Internal preprocessing function for applying Subfunctions, augmentation, resizing and standardization
         on an image given its index.
 
-    Activating the prepared_image option also allows loading a beforehand preprocessed image from disk.
+    Activating the prepared_image option also allows loading a beforehand preprocessed image from disk
+    (from the PreparedStore or as pickle).
 
     Deactivating the run_aug & run_standardize option to output image without augmentation and standardization.
 
-    Activating dump_pickle will store the preprocessed image as pickle on disk instead of returning.
+    Activating dump_pickle will store the preprocessed image on disk instead of returning
+    (into the PreparedStore or as pickle).
     """
     def preprocess_image(self, index, prepared_image=False, run_aug=True,
                          run_standardize=True, dump_pickle=False):
         # Load prepared image from disk
         if prepared_image:
+            # Load from memory-mapped store (read-only view)
+            if self.prepared_store is not None:
+                img = self._run_stage("prepared_read", self.prepared_store.read,
+                                      self.samples[index])
+                # Half precision is only a storage format -> compute in single precision
+                if img.dtype == np.float16 : img = img.astype(np.float32)
             # Load from disk
-            path_img = os.path.join(self.prepare_dir, "img_" + str(index))
-            with open(path_img + ".pickle", "rb") as pickle_loader:
-                img = pickle.load(pickle_loader)
-            # Apply image augmentation on image if activated
-            if self.data_aug is not None and run_aug:
-                img = self.data_aug.apply(img)
-            # Apply standardization on image if activated
-            if self.sf_standardize is not None and run_standardize:
-                img = self.sf_standardize.transform(img)
+            else:
+                path_img = os.path.join(self.prepare_dir, "img_" + str(index))
+                with open(path_img + ".pickle", "rb") as pickle_loader:
+                    img = pickle.load(pickle_loader)
         # Preprocess image during runtime
-        else:
-            # Load image from disk
-            img = self.sample_loader(self.samples[index], self.path_imagedir,
-                                     image_format=self.image_format,
-                                     grayscale=self.grayscale,
-                                     **self.kwargs)
-            # Apply subfunctions on image
-            for sf in self.subfunctions:
-                img = sf.transform(img)
-            # Apply resizing on image if activated
-            if self.sf_resize is not None:
-                img = self.sf_resize.transform(img)
-            # Apply image augmentation on image if activated
-            if self.data_aug is not None and run_aug:
-                img = self.data_aug.apply(img)
-            # Apply standardization on image if activated
-            if self.sf_standardize is not None and run_standardize:
-                img = self.sf_standardize.transform(img)
+        else : img = self.load_image(index)
+        # Apply image augmentation on image if activated
+        if self.data_aug is not None and run_aug:
+            img = self._run_stage("augmentation", self.data_aug.apply, img)
+        # Apply standardization on image if activated
+        if self.sf_standardize is not None and run_standardize:
+            img = self._run_stage("standardize", self.sf_standardize.transform,
+                                  img)
         # Dump preprocessed image to disk (for later usage via prepared_image)
-        if dump_pickle:
+        if dump_pickle and self.prepared_store is not None:
+            self.prepared_store.write(self.samples[index], img)
+        elif dump_pickle:
             path_img = os.path.join(self.prepare_dir, "img_" + str(index))
             with open(path_img + ".pickle", "wb") as pickle_writer:
                 pickle.dump(img, pickle_writer)
         # Return preprocessed image
         else : return img
+
+    #-----------------------------------------------------#
+    #              TensorFlow Dataset Export              #
+    #-----------------------------------------------------#
+    def as_tf_dataset(self, cache=False, prefetch=True, num_parallel_calls=None):
+        """ Export the DataGenerator as a `tf.data.Dataset` with parallel preprocessing and prefetching.
+
+        The dataset yields the same batches as the DataGenerator (including metadata, labels and sample weights).
+        Image loading, Subfunctions, resizing, augmentation and standardization of the DataGenerator are
+        executed via `tf.data` with `num_parallel_calls`, which allows TensorFlow to overlap IO,
+        preprocessing and model computation.
+
+        If `cache` is activated, only the loaded, Subfunction processed and resized images are cached.
+        Augmentation and standardization are still applied in each epoch.
+        With a [BlockShuffle][aucmedi.data_processing.shuffling.BlockShuffle], the images are loaded in
+        block order for filling the cache, whereas the cached images are shuffled globally afterwards.
+
+        ???+ warning
+            All preprocessed images are required to have an identical shape (e.g. by using `resize`).
+
+        ???+ example
+            ```python
+            # Initialize DataGenerator
+            datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                    resize=model.meta_input,
+                                    standardize_mode=model.meta_standardize,
+                                    data_aug=ImageAugmentation(), shuffle=True)
+
+            # Export as TensorFlow dataset with in-memory caching of loaded images
+            dataset = datagen.as_tf_dataset(cache=True)
+
+            # Run training with the dataset
+            model.train(dataset, epochs=10)
+            ```
+
+        Args:
+            cache (bool or str):                Option whether loaded images should be cached in memory (`True`) or
+                                                in a cache file (path as `str`) via `tf.data.Dataset.cache()`.
+            prefetch (bool or int):             Number of batches which are prefetched via `tf.data.Dataset.prefetch()`.
+                                                If `True`, the prefetch buffer size is autotuned.
+            num_parallel_calls (int):           Number of samples which are processed in parallel.
+                                                If `None`, the parallelism is autotuned.
+
+        Returns:
+            dataset (tf.data.Dataset):          TensorFlow dataset yielding batches like the DataGenerator.
+        """
+        if num_parallel_calls is None : num_parallel_calls = tf.data.AUTOTUNE
+        # Infer sample shape & dtype by preprocessing the first sample
+        if self.sample_spec is None:
+            img = self.preprocess_image(index=0,
+                                        prepared_image=self.prepare_images,
+                                        run_standardize=not self.aug_batch)
+            self.sample_spec = (img.shape, img.dtype.str)
+        shape, dtype = self.sample_spec
+        # Create dataset of sample indices with optional annotations
+        elements = {"index": np.arange(len(self.samples))}
+        if self.metadata is not None : elements["metadata"] = self.metadata
+        if self.labels is not None and not sparse.issparse(self.labels):
+            elements["labels"] = self.labels
+        if self.sample_weights is not None:
+            elements["weights"] = self.sample_weights
+        ds = tf.data.Dataset.from_tensor_slices(elements)
+        # Apply locality-aware shuffling by gathering elements in epoch order
+        if isinstance(self.shuffle, BlockShuffle):
+            tensors = {k: tf.constant(v) for k, v in elements.items()}
+            random_state = np.random.RandomState(self.seed)
+            ds = tf.data.Dataset.from_generator(
+                lambda: self.shuffle.permutation(len(self.samples),
+                                                 random_state),
+                output_signature=tf.TensorSpec(shape=(), dtype=tf.int64))
+            ds = ds.map(lambda i: {k: tf.gather(v, i) \
+                                   for k, v in tensors.items()})
+
+        # Preprocess samples in one step
+        if not cache:
+            if self.shuffle and not isinstance(self.shuffle, BlockShuffle):
+                ds = ds.shuffle(len(self.samples), seed=self.seed,
+                                reshuffle_each_iteration=True)
+            ds = ds.map(lambda e: self._tf_map(e, self._tf_preprocess,
+                                               "index", dtype, shape),
+                        num_parallel_calls=num_parallel_calls)
+        # Preprocess samples in two steps with caching of the loaded images
+        else:
+            img = self.preprocess_image(index=0,
+                                        prepared_image=self.prepare_images,
+                                        run_aug=False, run_standardize=False)
+            ds = ds.map(lambda e: self._tf_map(e, self._tf_load, "index",
+                                               img.dtype.str, None),
+                        num_parallel_calls=num_parallel_calls)
+            if isinstance(cache, str) : ds = ds.cache(cache)
+            else : ds = ds.cache()
+            # Shuffle cached images globally (loading already followed the block order)
+            if self.shuffle:
+                ds = ds.shuffle(len(self.samples), seed=self.seed,
+                                reshuffle_each_iteration=True)
+            ds = ds.map(lambda e: self._tf_map(e, self._tf_transform,
+                                               "image", dtype, shape),
+                        num_parallel_calls=num_parallel_calls)
+
+        # Combine samples to batches in the DataGenerator structure
+        ds = ds.batch(self.batch_size)
+        # Apply vectorized augmentation & standardization on the complete batch
+        if self.aug_batch:
+            img = self.preprocess_image(index=0,
+                                        prepared_image=self.prepare_images,
+                                        run_aug=False, run_standardize=False)
+            img = self._augment_batch(np.asarray(img, dtype=dtype)[np.newaxis])
+            ds = ds.map(lambda e: self._tf_map(e, self._augment_batch, "image",
+                                               img.dtype.str,
+                                               (None,) + img.shape[1:]))
+        ds = ds.map(self._tf_structure)
+        # Prefetch upcoming batches
+        if prefetch is True : ds = ds.prefetch(tf.data.AUTOTUNE)
+        elif prefetch : ds = ds.prefetch(prefetch)
+        # Return dataset
+        return ds
+
+    """ Internal function for applying a NumPy preprocessing function on an element of the tf.data pipeline. """
+    def _tf_map(self, element, func, key, dtype, shape):
+        img = tf.numpy_function(func, [element[key]],
+                                tf.as_dtype(np.dtype(dtype)))
+        if shape is not None : img.set_shape(shape)
+        element = dict(element)
+        element["image"] = img
+        return element
+
+    """ Internal function for preprocessing a sample for the tf.data pipeline. """
+    def _tf_preprocess(self, index):
+        img = self.preprocess_image(index=int(index),
+                                    prepared_image=self.prepare_images,
+                                    run_standardize=not self.aug_batch)
+        return np.asarray(img, dtype=self.sample_spec[1])
+
+    """ Internal function for loading a sample (without augmentation & standardization) for the tf.data pipeline. """
+    def _tf_load(self, index):
+        img = self.preprocess_image(index=int(index),
+                                    prepared_image=self.prepare_images,
+                                    run_aug=False, run_standardize=False)
+        return np.array(img)
+
+    """ Internal function for applying augmentation & standardization on a cached sample for the tf.data pipeline. """
+    def _tf_transform(self, img):
+        # Apply image augmentation on image if activated
+        if self.data_aug is not None:
+            img = self._run_stage("augmentation", self.data_aug.apply, img)
+        # Apply standardization on image if activated (after batch augmentation in batch mode)
+        if self.sf_standardize is not None and not self.aug_batch:
+            img = self._run_stage("standardize", self.sf_standardize.transform,
+                                  img)
+        return np.asarray(img, dtype=self.sample_spec[1])
+
+    """ Internal function for packing a batch of the tf.data pipeline into the DataGenerator structure. """
+    def _tf_structure(self, batch):
+        if "metadata" in batch : batch_x = (batch["image"], batch["metadata"])
+        else : batch_x = batch["image"]
+        output = (batch_x, )
+        if "labels" in batch : output += (batch["labels"], )
+        # Densify sparse labels of the batch
+        elif self.labels is not None:
+            labels = tf.numpy_function(lambda i: self.labels[i].toarray(),
+                                       [batch["index"]],
+                                       tf.as_dtype(self.labels.dtype))
+            labels.set_shape((None, self.labels.shape[1]))
+            output += (labels, )
+        if "weights" in batch : output += (batch["weights"], )
+        return output
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# DataGenerator and attached shared memory blocks of a worker process
+__mp_datagen__ = None
+__mp_shm__ = {}
+
+# Internal function for initializing a worker process with a DataGenerator copy
+def __mp_initialize__(state):
+    global __mp_datagen__
+    __mp_datagen__ = pickle.loads(state)
+    # Ensure that worker processes do not share the same random state
+    np.random.seed()
+    random.seed()
+
+# Internal function for preprocessing a sample in a worker process and writing it into shared memory
+def __mp_preprocess__(index, prepared_image, shm_name, batch_shape, dtype, slot):
+    # Attach to shared memory block of the batch
+    if shm_name not in __mp_shm__:
+        __mp_shm__[shm_name] = SharedMemory(name=shm_name)
+    batch_img = np.ndarray(batch_shape, dtype=dtype,
+                           buffer=__mp_shm__[shm_name].buf)
+    # Preprocess sample
+    run_standardize = not __mp_datagen__.aug_batch
+    img = __mp_datagen__.preprocess_image(index=index,
+                                          prepared_image=prepared_image,
+                                          run_standardize=run_standardize)
+    # Verify that sample fits into the batch
+    if img.shape != batch_shape[1:]:
+        raise ValueError("Multi-processing requires preprocessed samples with " + \
+                         "identical shape!", img.shape, batch_shape[1:])
+    # Write sample into the batch
+    np.copyto(batch_img[slot], img, casting="same_kind")
+
+# Internal function for preparing a sample in a worker process
+def __mp_prepare__(index):
+    __mp_datagen__.preprocess_image(index=index, prepared_image=False,
+                                    run_aug=False, run_standardize=False,
+                                    dump_pickle=True)
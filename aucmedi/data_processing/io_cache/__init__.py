@@ -0,0 +1,45 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                    Documentation                    #
+#-----------------------------------------------------#
+""" The IO Cache classes of AUCMEDI allow storing and reusing already loaded or preprocessed samples.
+
+These classes are utilized **internally** via the [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator],
+but can also be created manually to share them between multiple DataGenerators.
+
+!!! info "IO_cache Classes"
+    | Class                                                                      | Description                                              |
+    | -------------------------------------------------------------------------- | -------------------------------------------------------- |
+    | [PreparedStore][aucmedi.data_processing.io_cache.prepared_store.PreparedStore] | Memory-mapped store for beforehand prepared images.  |
+    | [DiskCache][aucmedi.data_processing.io_cache.disk_cache.DiskCache]         | Persistent content-addressed cache for preprocessed images. |
+    | [MemoryCache][aucmedi.data_processing.io_cache.memory_cache.MemoryCache]   | In-memory LRU cache with a byte budget for loaded images. |
+    | [ReadAhead][aucmedi.data_processing.io_cache.read_ahead.ReadAhead]         | Background fetching & staging of upcoming raw files.     |
+    | [SharedCache][aucmedi.data_processing.io_cache.shared_cache.SharedCache]   | Shared memory image store for the cache_loader.          |
+
+Cache entries are addressed via [fingerprint()][aucmedi.data_processing.io_cache.fingerprint.fingerprint].
+"""
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+from aucmedi.data_processing.io_cache.fingerprint import fingerprint
+from aucmedi.data_processing.io_cache.prepared_store import PreparedStore
+from aucmedi.data_processing.io_cache.disk_cache import DiskCache
+from aucmedi.data_processing.io_cache.memory_cache import MemoryCache
+from aucmedi.data_processing.io_cache.read_ahead import ReadAhead
+from aucmedi.data_processing.io_cache.shared_cache import SharedCache
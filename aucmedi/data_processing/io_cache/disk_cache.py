@@ -0,0 +1,184 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+import tempfile
+import os
+# Internal libraries
+from aucmedi.data_processing.io_cache.fingerprint import fingerprint
+
+#-----------------------------------------------------#
+#              Persistent Disk Cache                  #
+#-----------------------------------------------------#
+class DiskCache:
+    """ A content-addressed and persistent on-disk cache for preprocessed images of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    The DataGenerator stores the deterministic output of the image loading, the Subfunctions and the resizing
+    (before augmentation and standardization) in the cache. Each entry is addressed by a hash of:
+
+    - the sample path and its file modification time & size
+    - the IO_loader function and its parameters
+    - the Subfunction chain and its parameters
+    - the resize shape
+
+    Thus, entries are automatically invalidated if any of these inputs change and the cache can be shared
+    across runs and processes (e.g. the folds of [Bagging][aucmedi.ensemble.bagging.Bagging]).
+    Entries are written atomically, which allows concurrent processes to safely read and write the cache.
+
+    If a size limit is provided, the least recently used entries are evicted as soon as the cache exceeds the limit.
+
+    ???+ warning
+        Only deterministic Subfunctions should be used together with the DiskCache
+        (e.g. no [Crop][aucmedi.data_processing.subfunctions.crop] with `mode="random"`).
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.io_cache import DiskCache
+
+        # Create a persistent cache with a size limit of 10 GB
+        cache = DiskCache("cache_dir/", max_size=10*1024**3)
+
+        # Pass the cache to the DataGenerator (or just provide the directory path)
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), disk_cache=cache)
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, path, max_size=None):
+        """ Initialization function for creating or opening a DiskCache.
+
+        Args:
+            path (str):                 Path to the directory of the cache.
+            max_size (int):             Size limit of the cache in bytes. If `None`, no entries are evicted.
+        """
+        # Cache class variables
+        self.path = path
+        self.max_size = max_size
+        # Create cache directory
+        if not os.path.exists(path) : os.makedirs(path, exist_ok=True)
+        # Estimate current cache size
+        if max_size is not None : self.size = self._scan_size()
+        else : self.size = 0
+
+    #---------------------------------------------#
+    #                 Cache Access                #
+    #---------------------------------------------#
+    def key(self, *components):
+        """ Compute the content-address of an entry based on the provided components.
+
+        Calls [fingerprint()][aucmedi.data_processing.io_cache.fingerprint.fingerprint] internally.
+
+        Args:
+            *components (list):         Components, which identify the cache entry.
+
+        Returns:
+            key (str):                  Hexadecimal SHA-256 hash of the components.
+        """
+        return fingerprint(*components)
+
+    def get(self, key):
+        """ Obtain an image from the cache.
+
+        A successful access marks the entry as recently used.
+
+        Args:
+            key (str):                  Key of the cache entry.
+
+        Returns:
+            image (numpy.ndarray):      Cached image or `None` if the key is not cached.
+        """
+        path_entry = self._path_entry(key)
+        try:
+            img = np.load(path_entry, allow_pickle=False)
+            os.utime(path_entry)
+        except (FileNotFoundError, ValueError, EOFError, OSError) : return None
+        return img
+
+    def put(self, key, image):
+        """ Store an image in the cache.
+
+        The entry is written to a temporary file first and atomically moved to its location afterwards.
+
+        Args:
+            key (str):                  Key of the cache entry.
+            image (numpy.ndarray):      Image, which should be cached.
+        """
+        path_entry = self._path_entry(key)
+        path_dir = os.path.dirname(path_entry)
+        if not os.path.exists(path_dir) : os.makedirs(path_dir, exist_ok=True)
+        # Write entry atomically
+        fd, path_tmp = tempfile.mkstemp(dir=path_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file_writer:
+                np.save(file_writer, np.asarray(image), allow_pickle=False)
+            os.replace(path_tmp, path_entry)
+        except BaseException:
+            if os.path.exists(path_tmp) : os.remove(path_tmp)
+            raise
+        # Evict least recently used entries if size limit is exceeded
+        if self.max_size is not None:
+            self.size += os.path.getsize(path_entry)
+            if self.size > self.max_size : self.evict()
+
+    def evict(self):
+        """ Remove least recently used entries until the cache fits into the size limit. """
+        entries = self._scan_entries()
+        self.size = sum(e[2] for e in entries)
+        if self.max_size is None : return
+        # Remove oldest entries first
+        for mtime, path_entry, size in sorted(entries):
+            if self.size <= self.max_size : break
+            try : os.remove(path_entry)
+            except FileNotFoundError : pass
+            self.size -= size
+
+    def clear(self):
+        """ Remove all entries from the cache. """
+        for _, path_entry, _ in self._scan_entries():
+            try : os.remove(path_entry)
+            except FileNotFoundError : pass
+        self.size = 0
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Internal function for obtaining the file path of an entry. """
+    def _path_entry(self, key):
+        return os.path.join(self.path, key[:2], key + ".npy")
+
+    """ Internal function for listing all entries as (access time, path, size) tuples. """
+    def _scan_entries(self):
+        entries = []
+        for subdir in os.scandir(self.path):
+            if not subdir.is_dir() : continue
+            for entry in os.scandir(subdir.path):
+                if not entry.name.endswith(".npy") : continue
+                try : stat = entry.stat()
+                except FileNotFoundError : continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    """ Internal function for computing the current size of the cache. """
+    def _scan_size(self):
+        return sum(e[2] for e in self._scan_entries())
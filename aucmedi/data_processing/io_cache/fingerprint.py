@@ -0,0 +1,75 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+import hashlib
+import types
+
+#-----------------------------------------------------#
+#                Cache Key Fingerprint                #
+#-----------------------------------------------------#
+def fingerprint(*components):
+    """ Compute a stable content-address for cache entries based on the provided components.
+
+    Supported components are Python primitives, lists, tuples, dictionaries, NumPy arrays,
+    functions and class instances (identified by their class and attributes).
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.io_cache import fingerprint
+
+        key = fingerprint("sample_001.png", (224, 224), my_subfunctions)
+        ```
+
+    Args:
+        *components (list):         Components, which identify the cache entry.
+
+    Returns:
+        key (str):                  Hexadecimal SHA-256 hash of the components.
+    """
+    representation = __represent__(components, depth=0)
+    return hashlib.sha256(representation.encode("utf-8")).hexdigest()
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for creating a stable string representation of an object
+def __represent__(obj, depth):
+    # Avoid infinite recursion for cyclic objects
+    if depth > 8 : return type(obj).__qualname__
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes,
+                                       np.generic)):
+        return repr(obj)
+    elif isinstance(obj, np.ndarray):
+        return "ndarray(" + str(obj.shape) + "," + obj.dtype.str + "," + \
+               hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest() + ")"
+    elif isinstance(obj, (list, tuple)):
+        return "[" + ",".join(__represent__(o, depth+1) for o in obj) + "]"
+    elif isinstance(obj, dict):
+        items = sorted((str(k), __represent__(v, depth+1)) \
+                       for k, v in obj.items())
+        return "{" + ",".join(k + ":" + v for k, v in items) + "}"
+    elif isinstance(obj, (types.FunctionType, types.BuiltinFunctionType, type)):
+        return getattr(obj, "__module__", "") + "." + obj.__qualname__
+    elif hasattr(obj, "__dict__"):
+        return type(obj).__module__ + "." + type(obj).__qualname__ + \
+               __represent__(vars(obj), depth+1)
+    else : return type(obj).__qualname__
@@ -0,0 +1,154 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from collections import OrderedDict
+import threading
+
+#-----------------------------------------------------#
+#                In-Memory LRU Cache                  #
+#-----------------------------------------------------#
+class MemoryCache:
+    """ An in-memory LRU cache with a byte budget for loaded images of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    The DataGenerator stores the decoded images after applying the Subfunctions and the resizing
+    (before augmentation and standardization) in the cache. Thus, epochs 2..N mostly skip image decoding
+    with any IO_loader function, even if the dataset does not fit completely into the memory.
+
+    If the byte budget is exceeded, the least recently used images are evicted.
+    The cache counts hits, misses and evictions, which can be obtained via `statistics()`.
+
+    Cached images are shared between the batches and, thus, should not be modified in-place.
+    The DataGenerator stores read-only views in the cache.
+
+    ???+ info
+        The cache is thread-safe. For multi-processing, each worker process utilizes its own cache.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.io_cache import MemoryCache
+
+        # Create a memory cache with a budget of 4 GB
+        cache = MemoryCache(max_size=4*1024**3)
+
+        # Pass the cache to the DataGenerator (or just provide the budget in bytes)
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), memory_cache=cache)
+
+        # Run training and check cache statistics
+        model.train(datagen, epochs=10)
+        print(cache.statistics())
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, max_size):
+        """ Initialization function for creating a MemoryCache.
+
+        Args:
+            max_size (int):             Byte budget of the cache.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    #---------------------------------------------#
+    #                 Cache Access                #
+    #---------------------------------------------#
+    def get(self, key):
+        """ Obtain an image from the cache.
+
+        A successful access marks the entry as recently used.
+
+        Args:
+            key (hashable):             Key of the cache entry.
+
+        Returns:
+            image (numpy.ndarray):      Cached image or `None` if the key is not cached.
+        """
+        with self.lock:
+            img = self.entries.get(key, None)
+            if img is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, image):
+        """ Store an image in the cache and evict least recently used entries if the budget is exceeded.
+
+        Images larger than the complete budget are not cached.
+
+        Args:
+            key (hashable):             Key of the cache entry.
+            image (numpy.ndarray):      Image, which should be cached.
+        """
+        if image.nbytes > self.max_size : return
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key).nbytes
+            self.entries[key] = image
+            self.size += image.nbytes
+            # Evict least recently used entries
+            while self.size > self.max_size:
+                _, img_evicted = self.entries.popitem(last=False)
+                self.size -= img_evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """ Remove all entries from the cache. """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def statistics(self):
+        """ Obtain the current usage and the hit/miss/eviction counters of the cache.
+
+        Returns:
+            stats (dict):               Dictionary with the keys `"hits"`, `"misses"`, `"evictions"`,
+                                        `"entries"` and `"size"` (in bytes).
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "entries": len(self.entries), "size": self.size}
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Pickling support: Only the budget is transferred and other processes start with an empty cache. """
+    def __getstate__(self):
+        return {"max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"])
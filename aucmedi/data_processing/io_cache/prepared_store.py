@@ -0,0 +1,213 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+import json
+import os
+
+#-----------------------------------------------------#
+#                 Prepared Image Store                #
+#-----------------------------------------------------#
+class PreparedStore:
+    """ A memory-mapped store for beforehand prepared images of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    All prepared images are written into a single preallocated NumPy array on disk (`images.npy`),
+    which is accessed via `np.memmap`. An index maps each sample to its row in the store.
+    Thus, reading a prepared image is a zero-copy slice instead of opening and unpickling a file.
+
+    The store is automatically created by the DataGenerator if `prepare_images=True` and `resize` is defined.
+    As all images in the store require an identical shape, a DataGenerator without resizing
+    falls back to storing each prepared image as a single pickle file.
+
+    ???+ info "Store Layout"
+        | File             | Description                                                        |
+        | ---------------- | ------------------------------------------------------------------ |
+        | `images.npy`     | Preallocated NumPy array with shape (n_samples, *image_shape).     |
+        | `prepared.npy`   | Boolean NumPy array, whether a row was already written.            |
+        | `index.json`     | Sample index, image shape and dtype of the store.                  |
+
+    A filled store can be reused by other DataGenerators with the same preprocessing configuration
+    (e.g. a subset of the samples for cross-validation folds or augmenting inference)
+    by passing it to the `prepared_store` parameter.
+
+    ???+ example
+        ```python
+        # Prepare images via a DataGenerator (store is created automatically)
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), prepare_images=True,
+                                prepare_dtype="float16")
+        store = datagen.prepared_store
+
+        # Reuse prepared images for a subset of samples
+        datagen_subset = DataGenerator(samples[:100], "images_dir/", labels=class_ohe[:100],
+                                       resize=(224, 224), prepared_store=store)
+
+        # Reopen an existing store from disk
+        from aucmedi.data_processing.io_cache import PreparedStore
+        store = PreparedStore.load(store.path)
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, path, samples, shape, dtype, create=True):
+        """ Initialization function for creating or opening a PreparedStore.
+
+        Args:
+            path (str):                 Path to the directory of the store.
+            samples (list of str):      List of sample/index encoded as Strings.
+                                        Duplicated samples are mapped to the same row.
+            shape (tuple of int):       Shape of a single prepared image.
+            dtype (str or np.dtype):    Data type of the store (e.g. `"float32"`, `"float16"` or `"uint8"`).
+            create (bool):              Option whether a new store should be allocated or an existing one opened.
+        """
+        # Cache class variables
+        self.path = path
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype).str
+        # Build sample index
+        self.index = {}
+        for sample in samples:
+            if sample not in self.index : self.index[sample] = len(self.index)
+        # Allocate store on disk
+        if create:
+            if not os.path.exists(path) : os.makedirs(path)
+            n = max(len(self.index), 1)
+            images = np.lib.format.open_memmap(self.path_images, mode="w+",
+                                               dtype=self.dtype,
+                                               shape=(n,) + self.shape)
+            prepared = np.lib.format.open_memmap(self.path_prepared,
+                                                 mode="w+", dtype=np.bool_,
+                                                 shape=(n,))
+            del images, prepared
+            # Store index and specification
+            with open(os.path.join(path, "index.json"), "w") as fd:
+                json.dump({"samples": list(self.index.keys()),
+                           "shape": list(self.shape),
+                           "dtype": self.dtype}, fd)
+        # Initialize memory maps (opened lazily)
+        self.images = None
+        self.prepared = None
+
+    @classmethod
+    def load(cls, path):
+        """ Open an existing PreparedStore from disk.
+
+        Args:
+            path (str):                 Path to the directory of the store.
+
+        Returns:
+            store (PreparedStore):      Reopened PreparedStore.
+        """
+        with open(os.path.join(path, "index.json"), "r") as fd:
+            spec = json.load(fd)
+        return cls(path, spec["samples"], spec["shape"], spec["dtype"],
+                   create=False)
+
+    #---------------------------------------------#
+    #                 Store Access                #
+    #---------------------------------------------#
+    def write(self, sample, image):
+        """ Write a prepared image of a sample into the store.
+
+        The image is casted into the dtype of the store.
+
+        Args:
+            sample (str):               Sample name/index of an image.
+            image (numpy.ndarray):      Prepared image with the shape of the store.
+        """
+        self._open()
+        if tuple(image.shape) != self.shape:
+            raise ValueError("Prepared image does not match shape of the " + \
+                             "PreparedStore!", image.shape, self.shape)
+        row = self.index[sample]
+        self.images[row] = image
+        self.prepared[row] = True
+
+    def read(self, sample):
+        """ Read a prepared image of a sample from the store.
+
+        Args:
+            sample (str):               Sample name/index of an image.
+
+        Returns:
+            image (numpy.ndarray):      Read-only view on the memory map (zero-copy).
+        """
+        self._open()
+        img = self.images[self.index[sample]]
+        img.flags.writeable = False
+        return img
+
+    def contains(self, sample):
+        """ Verify whether a sample is indexed and already prepared in the store. """
+        if sample not in self.index : return False
+        self._open()
+        return bool(self.prepared[self.index[sample]])
+
+    def fits(self, resize):
+        """ Check whether the prepared images have the shape of a DataGenerator with the provided resize.
+
+        Args:
+            resize (tuple of int):      Resize shape of the DataGenerator (without channel axis) or `None`.
+
+        Returns:
+            fits (bool):                Boolean, whether the prepared images match the resize shape.
+        """
+        if resize is None : return True
+        return self.shape[:-1] == tuple(int(s) for s in resize)
+
+    def flush(self):
+        """ Flush all changes of the memory maps to disk. """
+        if self.images is not None:
+            self.images.flush()
+            self.prepared.flush()
+
+    def __contains__(self, sample):
+        return self.contains(sample)
+
+    def __len__(self):
+        return len(self.index)
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    @property
+    def path_images(self):
+        return os.path.join(self.path, "images.npy")
+
+    @property
+    def path_prepared(self):
+        return os.path.join(self.path, "prepared.npy")
+
+    """ Internal function for opening the memory maps of the store. """
+    def _open(self):
+        if self.images is None:
+            # Assign the image memory map last as it marks the store as opened
+            self.prepared = np.load(self.path_prepared, mmap_mode="r+")
+            self.images = np.load(self.path_images, mmap_mode="r+")
+
+    """ Pickling support: Only the store location is transferred and the memory maps are reopened. """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["images"] = None
+        state["prepared"] = None
+        return state
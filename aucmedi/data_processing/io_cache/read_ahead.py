@@ -0,0 +1,290 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from multiprocessing.pool import ThreadPool
+from collections import OrderedDict
+import threading
+import tempfile
+import hashlib
+import shutil
+import os
+
+#-----------------------------------------------------#
+#              Read-Ahead Staging of Files            #
+#-----------------------------------------------------#
+class ReadAhead:
+    """ An I/O read-ahead layer, which fetches the raw files of upcoming samples of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator] in the background.
+
+    As the DataGenerator knows the sample order of the complete epoch, it schedules the files of the
+    current batch and the following samples (up to the look-ahead `window`) long before they are decoded.
+    A separate pool of I/O threads reads the files, which overlaps the latency of slow storage
+    (e.g. network file systems) with the preprocessing of the current batches.
+
+    Files are either read into the page cache of the operating system (default) or copied into a
+    staging directory on fast local disk or tmpfs (e.g. `/dev/shm`). The IO_loader functions
+    ([image_loader()][aucmedi.data_processing.io_loader.image_loader],
+    [numpy_loader()][aucmedi.data_processing.io_loader.numpy_loader],
+    [sitk_loader()][aucmedi.data_processing.io_loader.sitk_loader])
+    decode the samples from the staged copies, which are removed after loading.
+    Samples, which are not regular files or have not been fetched, are loaded from the original directory.
+
+    ???+ info
+        The read-ahead is applied for the Keras Iterator access of the DataGenerator with threading workers.
+        Worker processes and the `tf.data` pipeline load samples directly.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.io_cache import ReadAhead
+
+        # Stage the upcoming 256 samples with 8 I/O threads onto tmpfs
+        read_ahead = ReadAhead(window=256, workers=8, staging_dir="/dev/shm")
+
+        # Pass the read-ahead to the DataGenerator (or just provide the window size)
+        datagen = DataGenerator(samples, "network_storage/images/", labels=class_ohe,
+                                resize=(224, 224), read_ahead=read_ahead)
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, window=64, workers=4, staging_dir=None,
+                 chunk_size=2**20):
+        """ Initialization function for creating a ReadAhead.
+
+        Args:
+            window (int):               Number of upcoming samples (including the current batch), which are fetched ahead.
+            workers (int):              Number of I/O threads.
+            staging_dir (str):          Path to a directory on fast local storage, in which a temporary staging
+                                        directory is created. If `None`, files are only read into the page cache.
+            chunk_size (int):           Number of bytes per read call.
+        """
+        # Verify parameters
+        if window < 1 or workers < 1:
+            raise ValueError("ReadAhead requires a positive window and " + \
+                             "number of workers:", window, workers)
+        # Cache class variables
+        self.window = int(window)
+        self.workers = int(workers)
+        self.staging_dir = staging_dir
+        self.chunk_size = int(chunk_size)
+        self.__init_state__()
+
+    #---------------------------------------------#
+    #               Read-Ahead Access             #
+    #---------------------------------------------#
+    def schedule(self, path_imagedir, files):
+        """ Schedule the fetching of files in their upcoming consumption order.
+
+        Pending files, which are not part of the provided files anymore, are evicted.
+
+        Args:
+            path_imagedir (str):        Path to the directory containing the files.
+            files (list of str):        Relative file paths in consumption order. `None` entries are skipped.
+        """
+        if self.pid != os.getpid() : self.__init_state__()
+        keys = OrderedDict()
+        for file in files:
+            if file is not None : keys[os.path.join(path_imagedir, file)] = file
+        with self.lock:
+            # Evict pending files which left the look-ahead window
+            for key in list(self.pending.keys()):
+                if key not in keys : self._evict(key)
+            self._remove_evicted()
+            # Initialize I/O threads
+            if self.pool is None : self.pool = ThreadPool(self.workers)
+            # Queue fetching of upcoming files
+            for key, file in keys.items():
+                if key in self.pending : continue
+                directory = self._staging_path(path_imagedir)
+                result = self.pool.apply_async(self._fetch,
+                                               (key, directory, file))
+                self.pending[key] = (directory, file, result)
+                # Reference the staged copy until it is released or evicted
+                if directory is not None:
+                    path_staged = os.path.join(directory, file)
+                    self.staged[path_staged] = self.staged.get(path_staged, 0) + 1
+
+    def get(self, path_imagedir, file):
+        """ Obtain the directory from which a file should be loaded.
+
+        Waits until a scheduled file is fetched.
+
+        Args:
+            path_imagedir (str):        Path to the directory containing the file.
+            file (str):                 Relative file path.
+
+        Returns:
+            path_imagedir (str):        Path to the staging directory if the file was staged. Otherwise, the provided
+                                        directory is returned.
+        """
+        if self.pid != os.getpid() : self.__init_state__()
+        key = os.path.join(path_imagedir, file)
+        with self.lock:
+            entry = self.pending.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return path_imagedir
+            self.hits += 1
+        # Wait until the file is fetched (failures are raised by the IO_loader)
+        directory, _, result = entry
+        try : staged = result.get()
+        except Exception : staged = False
+        if staged and directory is not None : return directory
+        # Drop the reference of a failed staging
+        if directory is not None:
+            with self.lock : self._unstage(os.path.join(directory, file))
+        return path_imagedir
+
+    def release(self, path_imagedir, file):
+        """ Remove a staged file after it was loaded.
+
+        Staged copies are reference counted, because a file can be scheduled again before a previous
+        load released it (e.g. duplicated samples). The copy is only removed after its last release.
+        Files of other directories than the staging directory are not affected.
+
+        Args:
+            path_imagedir (str):        Directory returned by `get()`.
+            file (str):                 Relative file path.
+        """
+        if self.staging_root is None or \
+                not path_imagedir.startswith(self.staging_root + os.sep):
+            return
+        with self.lock : self._unstage(os.path.join(path_imagedir, file))
+
+    def clear(self):
+        """ Evict all pending files and remove their staged copies. """
+        if self.pid != os.getpid() : return self.__init_state__()
+        with self.lock:
+            for key in list(self.pending.keys()) : self._evict(key)
+            self._remove_evicted()
+
+    def close(self):
+        """ Stop the I/O threads and remove the staging directory. """
+        with self.lock:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+            self.pending.clear()
+            self.evicted = []
+            self.staged.clear()
+            if self.staging_root is not None:
+                shutil.rmtree(self.staging_root, ignore_errors=True)
+                self.staging_root = None
+
+    def statistics(self):
+        """ Obtain the hit/miss/eviction counters of the read-ahead.
+
+        Returns:
+            stats (dict):               Dictionary with the keys `"hits"`, `"misses"`, `"evictions"` and `"pending"`.
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "pending": len(self.pending)}
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Internal function for (re)initializing the I/O threads and the pending files.
+
+    The I/O threads and staged files are bound to the process which created them.
+    """
+    def __init_state__(self):
+        self.pool = None
+        self.pid = os.getpid()
+        self.pending = OrderedDict()
+        self.evicted = []
+        self.staged = {}
+        self.lock = threading.Lock()
+        self.staging_root = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """ Internal function for obtaining the staging directory of an image directory (or None without staging). """
+    def _staging_path(self, path_imagedir):
+        if self.staging_dir is None : return None
+        if self.staging_root is None:
+            os.makedirs(self.staging_dir, exist_ok=True)
+            self.staging_root = tempfile.mkdtemp(prefix="aucmedi.readahead.",
+                                                 dir=self.staging_dir)
+        tag = hashlib.md5(os.path.abspath(path_imagedir).encode()).hexdigest()
+        return os.path.join(self.staging_root, tag)
+
+    """ Internal function for fetching a file into the page cache or the staging directory.
+
+    Returns True if the file was fetched and False if it is not a regular file.
+    Formats with linked data files (e.g. mhd/raw) are only read into the page cache.
+    """
+    def _fetch(self, path_file, directory, file):
+        if not os.path.isfile(path_file) : return False
+        # Read file into page cache
+        if directory is None or file.endswith((".mhd", ".hdr")):
+            buffer = bytearray(self.chunk_size)
+            with open(path_file, "rb", buffering=0) as reader:
+                while reader.readinto(buffer) : pass
+            return directory is None
+        # Copy file into staging directory
+        path_staged = os.path.join(directory, file)
+        os.makedirs(os.path.dirname(path_staged), exist_ok=True)
+        path_tmp = path_staged + ".tmp." + str(threading.get_ident())
+        shutil.copyfile(path_file, path_tmp)
+        os.replace(path_tmp, path_staged)
+        return True
+
+    """ Internal function for evicting a pending file (requires the lock). """
+    def _evict(self, key):
+        directory, file, result = self.pending.pop(key)
+        if directory is not None:
+            self.evicted.append((directory, file, result))
+        self.evictions += 1
+
+    """ Internal function for removing the staged copies of evicted files after their fetching finished (requires the lock). """
+    def _remove_evicted(self):
+        remaining = []
+        for directory, file, result in self.evicted:
+            if not result.ready() : remaining.append((directory, file, result))
+            else : self._unstage(os.path.join(directory, file))
+        self.evicted = remaining
+
+    """ Internal function for dropping a reference of a staged file and removing it after the last one (requires the lock). """
+    def _unstage(self, path_staged):
+        count = self.staged.get(path_staged, 0) - 1
+        if count > 0:
+            self.staged[path_staged] = count
+            return
+        self.staged.pop(path_staged, None)
+        try : os.remove(path_staged)
+        except OSError : pass
+
+    """ Pickling support: Only the configuration is transferred and other processes start without pending files. """
+    def __getstate__(self):
+        return {"window": self.window, "workers": self.workers,
+                "staging_dir": self.staging_dir,
+                "chunk_size": self.chunk_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    """ Clean shutdown of the I/O threads and removal of the staging directory on garbage collection. """
+    def __del__(self):
+        if getattr(self, "pid", None) == os.getpid() : self.close()
@@ -0,0 +1,161 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing import resource_tracker
+from collections.abc import Mapping
+import numpy as np
+import os
+# Internal libraries
+from aucmedi.data_processing.io_loader.cache_loader import cache_loader
+
+#-----------------------------------------------------#
+#               Shared Memory Image Cache             #
+#-----------------------------------------------------#
+class SharedCache(Mapping):
+    """ A read-only image cache in shared memory for the
+        [cache_loader()][aucmedi.data_processing.io_loader.cache_loader].
+
+    A plain dictionary of images passed to the cache_loader is pickled into every worker process and every
+    training/prediction process of the ensembles ([Bagging][aucmedi.ensemble.bagging],
+    [Stacking][aucmedi.ensemble.stacking], [Composite][aucmedi.ensemble.composite]).
+    Thus, each process holds its own full copy of the dataset.
+
+    The SharedCache packs all images into a single `multiprocessing.shared_memory` block.
+    Only the name of the block and the offset index are pickled, and other processes attach to the
+    block by name. Images are returned as zero-copy, read-only NumPy views.
+
+    The image shapes are verified (and a channel axis is added if required) once when building the cache.
+
+    ???+ warning
+        The shared memory block is released when the SharedCache is garbage collected in the process
+        which built it. Thus, the building process has to outlive all processes using the cache.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.io_cache import SharedCache
+        from aucmedi.data_processing.io_loader import cache_loader
+
+        # Pack images into shared memory
+        cache = SharedCache({"sample_a": image_a, "sample_b": image_b},
+                            grayscale=False, two_dim=True)
+
+        # Pass the cache to the cache_loader (e.g. via the Bagging ensemble)
+        el = Bagging(model, k_fold=3)
+        el.train(DataGenerator(list(cache.keys()), None, labels=my_labels,
+                               resize=None, loader=cache_loader, cache=cache))
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, cache, grayscale=False, two_dim=True, alignment=64):
+        """ Initialization function for building a SharedCache.
+
+        Args:
+            cache (dict):               A Python dictionary containing one or multiple images.
+            grayscale (bool):           Boolean, whether images are grayscale or RGB.
+            two_dim (bool):             Boolean, whether images are 2D or 3D.
+            alignment (int):            Byte alignment of the images in the shared memory block.
+        """
+        # Verify image shapes once
+        images = {}
+        for sample in cache:
+            img = cache_loader(sample, cache=cache, grayscale=grayscale,
+                               two_dim=two_dim)
+            images[sample] = np.ascontiguousarray(img)
+        # Compute aligned layout of the images
+        self.index = {}
+        size = 0
+        for sample, img in images.items():
+            self.index[sample] = (size, img.shape, img.dtype.str)
+            size += -(-img.nbytes // alignment) * alignment
+        # Share the resource tracker with child processes to avoid early unlinking
+        resource_tracker.ensure_running()
+        self.tracker = resource_tracker._resource_tracker._pid
+        # Copy images into shared memory
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        for sample, img in images.items():
+            offset, shape, dtype = self.index[sample]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf,
+                       offset=offset)[...] = img
+        self.verified = (grayscale, two_dim)
+        self.owner = os.getpid()
+
+    #---------------------------------------------#
+    #                 Cache Access                #
+    #---------------------------------------------#
+    def __getitem__(self, sample):
+        offset, shape, dtype = self.index[sample]
+        img = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf,
+                         offset=offset)
+        img.flags.writeable = False
+        return img
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def name(self):
+        """ Name of the shared memory block. """
+        return self.shm.name
+
+    def close(self):
+        """ Detach from the shared memory block and release it if called in the building process.
+
+        Images obtained from the cache must not be used afterwards.
+        """
+        if self.shm is None : return
+        try : self.shm.close()
+        except BufferError : pass
+        if self.owner == os.getpid():
+            try : self.shm.unlink()
+            except FileNotFoundError : pass
+        self.shm = None
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Pickling support: Only the name of the shared memory block and the index are transferred. """
+    def __getstate__(self):
+        return {"name": self.shm.name, "index": self.index,
+                "verified": self.verified, "tracker": self.tracker}
+
+    def __setstate__(self, state):
+        self.index = state["index"]
+        self.verified = state["verified"]
+        self.tracker = state["tracker"]
+        self.owner = None
+        # Attach without registering the block at a resource tracker (Python 3.13+)
+        try : self.shm = SharedMemory(name=state["name"], track=False)
+        except TypeError:
+            self.shm = SharedMemory(name=state["name"])
+            # Spawned processes (e.g. of the ensembles) start their own resource tracker,
+            # which would unlink the block of the building process at their exit
+            if resource_tracker._resource_tracker._pid != self.tracker:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    """ Release of the shared memory block on garbage collection. """
+    def __del__(self):
+        if getattr(self, "shm", None) is not None : self.close()
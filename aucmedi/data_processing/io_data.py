@@ -23,6 +23,7 @@
 import os
 # Internal libraries
 import aucmedi.data_processing.io_interfaces as io
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #                   Static Variables                  #
@@ -35,7 +36,8 @@ ACCEPTABLE_IMAGE_FORMATS = ["jpeg", "jpg", "tif", "tiff", "png", "bmp", "gif",
 #             Input Interface for AUCMEDI             #
 #-----------------------------------------------------#
 def input_interface(interface, path_imagedir, path_data=None, training=True,
-                    ohe=False, image_format=None, **kwargs):
+                    ohe=False, image_format=None, sample_table=False,
+                    sparse_labels=False, **kwargs):
     """ Data Input Interface for all automatically extract various information of dataset structures.
 
     Different image file structures and annotation information are processed by
@@ -88,11 +90,21 @@ def input_interface(interface, path_imagedir, path_data=None, training=True,
         training (bool):                Boolean option whether annotation data is available.
         ohe (bool):                     Boolean option whether annotation data is sparse categorical or one-hot encoded.
         image_format (str):             Force to use a specific image format. By default, image format is determined automatically.
+        sample_table (bool):            Option whether the index list should be returned as compact
+                                        [SampleTable][aucmedi.data_processing.sample_table.SampleTable]
+                                        instead of a list of strings.
+        sparse_labels (bool):           Option whether the class annotations should be returned as scipy.sparse CSR matrix
+                                        instead of a dense NumPy matrix (e.g. for thousands of classes).
+                                        The CSR matrix can be passed as `labels` to the DataGenerator, which
+                                        densifies the labels of each batch separately.
         **kwargs (dict):                Additional parameters for the format interfaces.
+                                        For example, `validate=False` defers the verification of the image files
+                                        for the CSV/JSON interfaces to load time, and `manifest` persists the
+                                        directory scan of the directory interface.
 
     Returns:
-        index_list (list of str):       List of sample/index encoded as Strings. Required in DataGenerator as `samples`.
-        class_ohe (numpy.ndarray):      Classification list as One-Hot encoding. Required in DataGenerator as `labels`.
+        index_list (list of str):       List of sample/index encoded as Strings (or a SampleTable). Required in DataGenerator as `samples`.
+        class_ohe (numpy.ndarray):      Classification list as One-Hot encoding (or CSR matrix). Required in DataGenerator as `labels`.
         class_n (int):                  Number of classes. Required in NeuralNetwork for Architecture design as `n_labels`.
         class_names (list of str):      List of names for corresponding classes. Used for later prediction storage or evaluation.
         image_format (str):             Image format to add at the end of the sample index for image loading. Required in DataGenerator.
@@ -113,20 +125,29 @@ def input_interface(interface, path_imagedir, path_data=None, training=True,
     parameters = {"path_data": path_data,
                   "path_imagedir": path_imagedir,
                   "allowed_image_formats": allowed_image_formats,
-                  "training": training, "ohe": ohe}
+                  "training": training, "ohe": ohe,
+                  "sparse_labels": sparse_labels}
     # Identify correct dataset loader and parameters for CSV format
     if interface == "csv":
         ds_loader = io.csv_loader
-        additional_parameters = ["ohe_range", "col_sample", "col_class"]
+        additional_parameters = ["ohe_range", "col_sample", "col_class",
+                                 "validate"]
         for para in additional_parameters:
             if para in kwargs : parameters[para] = kwargs[para]
     # Identify correct dataset loader and parameters for JSON format
-    elif interface == "json" : ds_loader = io.json_loader
+    elif interface == "json":
+        ds_loader = io.json_loader
+        if "validate" in kwargs : parameters["validate"] = kwargs["validate"]
     # Identify correct dataset loader and parameters for directory format
     elif interface == "directory":
         ds_loader = io.directory_loader
         del parameters["ohe"]
         del parameters["path_data"]
+        if "manifest" in kwargs : parameters["manifest"] = kwargs["manifest"]
 
-    # Load the dataset with the selected format interface and return results
-    return ds_loader(**parameters)
+    # Load the dataset with the selected format interface
+    ds = ds_loader(**parameters)
+    # Convert index list into a compact SampleTable
+    if sample_table : ds = (SampleTable(ds[0]), *ds[1:])
+    # Return results
+    return ds
@@ -20,16 +20,22 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
-import os
+from scipy import sparse
 import numpy as np
 import pandas as pd
+# Internal libraries
+from aucmedi.data_processing.io_interfaces.validation import \
+                                    detect_image_format, validate_samples
+from aucmedi.data_processing.io_interfaces.parsing import SparseEncoder, \
+                                                          compact_ohe
 
 #-----------------------------------------------------#
 #          Data Loader Interface based on CSV         #
 #-----------------------------------------------------#
 def csv_loader(path_data, path_imagedir, allowed_image_formats,
                training=True, ohe=True, ohe_range=None,
-               col_sample="SAMPLE", col_class="CLASS"):
+               col_sample="SAMPLE", col_class="CLASS", validate=True,
+               sparse_labels=False):
     """ Data Input Interface for loading a dataset via a CSV and an image directory.
 
     This **internal** function allows simple parsing of class annotations encoded in a CSV,
@@ -71,73 +77,80 @@ def csv_loader(path_data, path_imagedir, allowed_image_formats,
         ohe_range (list of str):                List of column name values if annotation encoded in OHE. Example: ["classA", "classB", "classC"]
         col_sample (str):                       Index column name for the sample name column. Default: 'SAMPLE'
         col_class (str):                        Index column name for the sparse categorical classes column. Default: 'CLASS'
+        validate (bool):                        Boolean option whether the existence of all images should be verified.
+                                                If `False`, missing images are detected at load time by the IO_loader.
+        sparse_labels (bool):                   Boolean option whether the class annotations should be returned as
+                                                scipy.sparse CSR matrix instead of a dense NumPy matrix.
 
     Returns:
         index_list (list of str):               List of sample/index encoded as Strings. Required in DataGenerator as `samples`.
-        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding. Required in DataGenerator as `labels`.
+        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding (or CSR matrix). Required in DataGenerator as `labels`.
         class_n (int):                          Number of classes. Required in NeuralNetwork for Architecture design as `n_labels`.
         class_names (list of str):              List of names for corresponding classes. Used for later prediction storage or evaluation.
         image_format (str):                     Image format to add at the end of the sample index for image loading. Required in DataGenerator.
     """
-    # Load CSV file
-    dt = pd.read_csv(path_data, sep=",", header=0)
-    # Check if image index column exist and parse it
-    if col_sample in dt.columns : index_list = dt[col_sample].tolist()
-    else : raise Exception("Sample column (" + str(col_sample) + \
-                           ") not available in CSV file!", path_data)
-    # Ensure index list to contain strings
-    index_list = [str(index) for index in index_list]
+    # Load CSV header
+    header = pd.read_csv(path_data, sep=",", header=0, nrows=0).columns
+    # Check if image index column exist
+    if col_sample not in header:
+        raise Exception("Sample column (" + str(col_sample) + \
+                        ") not available in CSV file!", path_data)
+    # Identify required columns for parsing
+    ohe_columns = []
+    if training and not ohe:
+        # Verify if provided classification column in in dataframe
+        if col_class not in header:
+            raise Exception("Provided classification column not in dataset!")
+        columns = [col_sample, col_class]
+    else:
+        if training and ohe_range is None:
+            ohe_columns = [c for c in header if c != col_sample]
+        elif training : ohe_columns = list(ohe_range)
+        columns = [col_sample] + ohe_columns
+    # Parse CSV file in chunks with compact dtypes
+    dtypes = {col_sample: str}
+    if training and not ohe : dtypes[col_class] = str
+    reader = pd.read_csv(path_data, sep=",", header=0, usecols=columns,
+                         dtype=dtypes, chunksize=2**16)
+    index_list = []
+    encoder = SparseEncoder()
+    class_chunks = []
+    for chunk in reader:
+        index_list.extend(chunk[col_sample].tolist())
+        if not training : continue
+        # Store sparse categorical annotations as integer codes (CSV Format 1)
+        if not ohe : encoder.add(chunk[col_class].to_numpy())
+        # Store one-hot encoded annotations in compact form (CSV Format 2)
+        else:
+            class_ohe = chunk.loc[:, ohe_columns].to_numpy()
+            class_chunks.append(compact_ohe(class_ohe, sparse_labels))
     # Identify image format by peaking first image
-    image_format = None
-    for file in os.listdir(path_imagedir):
-        format = file.split(".")[-1]
-        if format.lower() in allowed_image_formats or \
-           format.upper() in allowed_image_formats:
-           image_format = format
-           break
-    # Raise Exception if image format is unknown
-    if image_format is None:
-        raise Exception("Unknown image format.", path_imagedir)
+    image_format = detect_image_format(path_imagedir, allowed_image_formats)
     # Check if image ending is already in sample name by peaking first one
     if index_list[0].endswith("." + image_format) : image_format = None
     # Verify if all images are existing
-    for sample in index_list:
-        # Obtain image file path
-        if image_format : img_file = sample + "." + image_format
-        else : img_file = sample
-        path_img = os.path.join(path_imagedir, img_file)
-        # Check existance
-        if not os.path.exists(path_img):
-            raise Exception("Image does not exist / not accessible!",
-                            'Sample: "' + sample + '"', path_img)
+    if validate : validate_samples(index_list, path_imagedir, image_format)
 
     # If CSV is for inference (no annotation data) -> return parsing
     if not training : return index_list, None, None, None, image_format
 
-    # Try parsing with a sparse categorical class format (CSV Format 1)
+    # Build One-Hot encoding from sparse categorical format (CSV Format 1)
     if not ohe:
-        # Verify if provided classification column in in dataframe
-        if col_class not in dt.columns:
-            raise Exception("Provided classification column not in dataset!")
-        # Obtain class information
-        classes_sparse = dt[col_class].tolist()
-        class_names = np.unique(classes_sparse).tolist()
+        class_names, class_ohe = encoder.encode(numeric=True,
+                                                sparse_labels=sparse_labels)
         class_n = len(class_names)
-        # Parse sparse categorical annotations to One-Hot Encoding
-        class_ohe = pd.get_dummies(classes_sparse).to_numpy()
-    # Try parsing one-hot encoded format (CSV Format 2)
+    # Concatenate one-hot encoded format (CSV Format 2)
     else:
-        # Identify OHE columns
-        if ohe_range is None : ohe_columns = dt.loc[:, dt.columns != col_sample]
-        else : ohe_columns = dt.loc[:, ohe_range]
-        # Parse information
-        class_names = list(ohe_columns.columns)
+        class_names = ohe_columns
         class_n = len(class_names)
-        class_ohe = ohe_columns.to_numpy()
+        if len(class_chunks) == 0:
+            class_ohe = compact_ohe(np.zeros((0, class_n)), sparse_labels)
+        elif sparse_labels : class_ohe = sparse.vstack(class_chunks, "csr")
+        else : class_ohe = np.concatenate(class_chunks)
 
     # Validate if number of samples and number of annotations match
-    if len(index_list) != len(class_ohe):
+    if len(index_list) != class_ohe.shape[0]:
         raise Exception("Numbers of samples and annotations do not match!",
-                        len(index_list), len(class_ohe))
+                        len(index_list), class_ohe.shape[0])
     # Return parsed CSV data
     return index_list, class_ohe, class_n, class_names, image_format
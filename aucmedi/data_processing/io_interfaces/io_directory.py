@@ -20,14 +20,21 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
+from multiprocessing.pool import ThreadPool
+import hashlib
+import json
+import time
 import os
 import numpy as np
 import pandas as pd
+# Internal libraries
+from aucmedi.data_processing.io_interfaces.parsing import codes_to_ohe
 
 #-----------------------------------------------------#
 #      Data Loader Interface based on Directories     #
 #-----------------------------------------------------#
-def directory_loader(path_imagedir, allowed_image_formats, training=True):
+def directory_loader(path_imagedir, allowed_image_formats, training=True,
+                     manifest=None, workers=8, sparse_labels=False):
     """ Data Input Interface for loading a dataset in a directory-based structure.
 
     This **internal** function allows simple parsing of class annotations encoded in subdirectories.
@@ -73,14 +80,28 @@ def directory_loader(path_imagedir, allowed_image_formats, training=True):
         sample100.png
     ```
 
+    ???+ info "Dataset Manifest"
+        Scanning large datasets on slow storage can take a while. If a path to a `manifest` is provided,
+        the directory structure (sample names and classes, including file size and modification time)
+        is persisted into a JSON manifest. On later calls, only directories whose modification time
+        changed are rescanned (in parallel via `workers` threads).
+
+        The manifest can be a JSON file (e.g. `"dataset/images_dir.manifest.json"` next to the data)
+        or an existing cache directory, in which a manifest per image directory is stored.
+
     Args:
         path_imagedir (str):                    Path to the directory containing the images or the subdirectories.
         allowed_image_formats (list of str):    List of allowed imaging formats. (provided by IO_Interface)
         training (bool):                        Boolean option whether annotation data is available.
+        manifest (str):                         Path to a manifest file or cache directory for persisting the directory scan.
+                                                If `None`, the directories are scanned on every call.
+        workers (int):                          Number of threads for scanning class subdirectories.
+        sparse_labels (bool):                   Boolean option whether the class annotations should be returned as
+                                                scipy.sparse CSR matrix instead of a dense NumPy matrix.
 
     Returns:
         index_list (list of str):               List of sample/index encoded as Strings. Required in DataGenerator as `samples`.
-        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding. Required in DataGenerator as `labels`.
+        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding (or CSR matrix). Required in DataGenerator as `labels`.
         class_n (int):                          Number of classes. Required in NeuralNetwork for Architecture design as `n_labels`.
         class_names (list of str):              List of names for corresponding classes. Used for later prediction storage or evaluation.
         image_format (str):                     Image format to add at the end of the sample index for image loading. Required in DataGenerator.
@@ -88,31 +109,34 @@ def directory_loader(path_imagedir, allowed_image_formats, training=True):
     # Initialize some variables
     image_format = None
     index_list = []
+    # Scan directory structure (incrementally if a manifest is provided)
+    tree = __scan_tree__(path_imagedir, training, manifest, workers)
     # Format - including class annotations encoded via subdirectories
     if training:
         class_names = []
         classes_sparse = []
         # Iterate over subdirectories
-        for c, subdirectory in enumerate(sorted(os.listdir(path_imagedir))):
+        for c, (subdirectory, is_dir) in enumerate(tree["."]):
             # Skip items which are not a directory (metadata)
-            if not os.path.isdir(os.path.join(path_imagedir, subdirectory)):
-                continue
+            if not is_dir : continue
             class_names.append(subdirectory)
             # Iterate over each sample
-            path_sd = os.path.join(path_imagedir, subdirectory)
-            for file in sorted(os.listdir(path_sd)):
+            for file, _ in tree[subdirectory]:
                 sample = os.path.join(subdirectory, file)
                 index_list.append(sample)
                 classes_sparse.append(c)
         # Parse sparse categorical annotations to One-Hot Encoding
         class_n = len(class_names)
-        class_ohe = pd.get_dummies(classes_sparse).to_numpy()
+        if sparse_labels:
+            classes, codes = np.unique(classes_sparse, return_inverse=True)
+            class_ohe = codes_to_ohe(codes, len(classes), sparse_labels=True)
+        else : class_ohe = pd.get_dummies(classes_sparse).to_numpy()
         # Return parsing
         return index_list, class_ohe, class_n, class_names, image_format
     # Format - excluding class annotations -> only testing images
     else:
         # Iterate over all images
-        for file in sorted(os.listdir(path_imagedir)):
+        for file, _ in tree["."]:
             # Identify image format by peaking first image
             if image_format is None:
                 format = file.split(".")[-1]
@@ -126,3 +150,82 @@ def directory_loader(path_imagedir, allowed_image_formats, training=True):
             raise Exception("Unknown image format.", path_imagedir)
         # Return parsing
         return index_list, None, None, None, image_format
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for scanning the image directory and the class subdirectories
+# Returns a dictionary with the sorted (name, is_dir) entries of each directory ("." for the image directory)
+def __scan_tree__(path_imagedir, training, manifest, workers):
+    stats = manifest is not None
+    # Load manifest of the previous scan
+    if stats:
+        path_manifest = __manifest_path__(manifest, path_imagedir)
+        cached = __read_manifest__(path_manifest, path_imagedir)
+    else : cached = {}
+    # Scan image directory if modified
+    directories = {".": __scan_cached__(path_imagedir, cached.get("."), stats)}
+    # Scan class subdirectories if modified (in parallel)
+    if training:
+        subdirectories = [e[0] for e in directories["."]["entries"] if e[1]]
+        params = [(os.path.join(path_imagedir, sd), cached.get(sd), stats) \
+                  for sd in subdirectories]
+        if workers > 1 and len(params) > 1:
+            with ThreadPool(min(workers, len(params))) as pool:
+                scans = pool.starmap(__scan_cached__, params)
+        else : scans = [__scan_cached__(*p) for p in params]
+        directories.update(zip(subdirectories, scans))
+    # Persist manifest if the scan changed
+    if stats and any(cached.get(d) is not directories[d] for d in directories):
+        # Keep cached entries of existing class subdirectories
+        subdirectories = {e[0] for e in directories["."]["entries"] if e[1]}
+        for sd, entry in cached.items():
+            if sd not in directories and sd in subdirectories:
+                directories[sd] = entry
+        __write_manifest__(path_manifest, path_imagedir, directories)
+    # Return sorted entries of each directory
+    return {d: [(e[0], e[1]) for e in directories[d]["entries"]] \
+            for d in directories}
+
+# Internal function for reusing the cached scan of a directory or rescanning it if its modification time changed
+def __scan_cached__(path_dir, cached, stats):
+    mtime = os.stat(path_dir).st_mtime_ns
+    if cached is not None and cached["mtime_ns"] == mtime : return cached
+    # Avoid trusting a modification time within the timestamp resolution of the file system
+    if time.time_ns() - mtime < 2 * 10**9 : mtime = None
+    # Scan directory via a single listing
+    entries = []
+    with os.scandir(path_dir) as scan:
+        for entry in scan:
+            if stats:
+                stat = entry.stat()
+                entries.append([entry.name, entry.is_dir(), stat.st_size,
+                                stat.st_mtime_ns])
+            else : entries.append([entry.name, entry.is_dir()])
+    entries.sort()
+    return {"mtime_ns": mtime, "entries": entries}
+
+# Internal function for obtaining the manifest file (a cache directory contains a manifest per image directory)
+def __manifest_path__(manifest, path_imagedir):
+    if not os.path.isdir(manifest) : return manifest
+    path_abs = os.path.abspath(path_imagedir)
+    tag = hashlib.sha256(path_abs.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(manifest, "aucmedi.manifest." + tag + ".json")
+
+# Internal function for reading a manifest (empty if missing, invalid or created for another directory)
+def __read_manifest__(path_manifest, path_imagedir):
+    try:
+        with open(path_manifest, "r") as reader:
+            content = json.load(reader)
+    except (OSError, ValueError) : return {}
+    if content.get("path") != os.path.abspath(path_imagedir) : return {}
+    return content.get("directories", {})
+
+# Internal function for atomically writing a manifest
+def __write_manifest__(path_manifest, path_imagedir, directories):
+    content = {"path": os.path.abspath(path_imagedir),
+               "directories": directories}
+    path_tmp = path_manifest + ".tmp." + str(os.getpid())
+    with open(path_tmp, "w") as writer:
+        json.dump(content, writer)
+    os.replace(path_tmp, path_manifest)
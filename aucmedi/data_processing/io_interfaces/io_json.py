@@ -20,16 +20,20 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
-import os
+from scipy import sparse
 import numpy as np
-import json
-import pandas as pd
+# Internal libraries
+from aucmedi.data_processing.io_interfaces.validation import \
+                                    detect_image_format, validate_samples
+from aucmedi.data_processing.io_interfaces.parsing import SparseEncoder, \
+                                                          compact_ohe, \
+                                                          iterate_json_object
 
 #-----------------------------------------------------#
 #         Data Loader Interface based on JSON         #
 #-----------------------------------------------------#
 def json_loader(path_data, path_imagedir, allowed_image_formats, training=True,
-                ohe=True):
+                ohe=True, validate=True, sparse_labels=False):
     """ Data Input Interface for loading a dataset via a JSON and an image directory.
 
     This **internal** function allows simple parsing of class annotations encoded in a JSON.
@@ -60,95 +64,90 @@ def json_loader(path_data, path_imagedir, allowed_image_formats, training=True,
         allowed_image_formats (list of str):    List of allowed imaging formats. (provided by IO_Interface)
         training (bool):                        Boolean option whether annotation data is available.
         ohe (bool):                             Boolean option whether annotation data is sparse categorical or one-hot encoded.
+        validate (bool):                        Boolean option whether the existence of all images should be verified.
+                                                If `False`, missing images are detected at load time by the IO_loader.
+        sparse_labels (bool):                   Boolean option whether the class annotations should be returned as
+                                                scipy.sparse CSR matrix instead of a dense NumPy matrix.
 
     Returns:
         index_list (list of str):               List of sample/index encoded as Strings. Required in DataGenerator as `samples`.
-        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding. Required in DataGenerator as `labels`.
+        class_ohe (numpy.ndarray):              Classification list as One-Hot encoding (or CSR matrix). Required in DataGenerator as `labels`.
         class_n (int):                          Number of classes. Required in NeuralNetwork for Architecture design as `n_labels`.
         class_names (list of str):              List of names for corresponding classes. Used for later prediction storage or evaluation.
         image_format (str):                     Image format to add at the end of the sample index for image loading. Required in DataGenerator.
     """
-    # Load JSON file
-    with open(path_data, "r") as json_reader:
-        dt_json = json.load(json_reader)
+    # Parse JSON file as stream with compact annotation storage
+    parsed = __parse_annotations__(iterate_json_object(path_data), training,
+                                   ohe, sparse_labels)
+    # Parse JSON file with duplicate samples like json.load
+    # (last annotation at the position of the first occurrence)
+    if parsed is None:
+        pairs = dict(iterate_json_object(path_data)).items()
+        parsed = __parse_annotations__(pairs, training, ohe, sparse_labels)
+    index_list, class_names, encoder, class_chunks = parsed
     # Identify image format by peaking first image
-    image_format = None
-    for file in os.listdir(path_imagedir):
-        format = file.split(".")[-1]
-        if format.lower() in allowed_image_formats or \
-           format.upper() in allowed_image_formats:
-           image_format = format
-           break
-    # Raise Exception if image format is unknown
-    if image_format is None:
-        raise Exception("Unknown image format.", path_imagedir)
-
+    image_format = detect_image_format(path_imagedir, allowed_image_formats)
+    # Check if image ending is already in sample name by peaking first one
+    if len(index_list) > 0 and index_list[0].endswith("." + image_format):
+        image_format = None
     # Verify if all images are existing
-    lever = True
-    for sample in dt_json:
-        if sample == "legend" : continue
-        # Check if image ending is already in sample name by peaking first one
-        if lever:
-            lever = False
-            if sample.endswith("." + image_format) : image_format = None
-        # Obtain image file path
-        if image_format : img_file = sample + "." + image_format
-        else : img_file = sample
-        path_img = os.path.join(path_imagedir, img_file)
-        # Check existance
-        if not os.path.exists(path_img):
-            raise Exception("Image does not exist / not accessible!",
-                            'Sample: "' + sample + '"', path_img)
+    if validate : validate_samples(index_list, path_imagedir, image_format)
 
-    # If JSON is for inference (no annotation data)
-    if not training:
-        # Ensure index list to contain strings
-        if "legend" in dt_json : del dt_json["legend"]
-        index_list = [str(x) for x in dt_json]
-        # -> return parsing
-        return index_list, None, None, None, image_format
+    # If JSON is for inference (no annotation data) -> return parsing
+    if not training : return index_list, None, None, None, image_format
 
-    # Try parsing with a sparse categorical class format
+    # Build One-Hot encoding from sparse categorical format
     if not ohe:
-        # Parse class name information
-        if "legend" in dt_json:
-            class_names = dt_json["legend"]
-            del dt_json["legend"]
-        else : class_names = None
-        # Obtain class information and index list
-        index_list = []
-        classes_sparse = []
-        for sample in dt_json:
-            index_list.append(str(sample))
-            classes_sparse.append(dt_json[sample])
-        if class_names is None : class_names = np.unique(classes_sparse).tolist()
+        sparse_names, class_ohe = encoder.encode(sparse_labels=sparse_labels)
+        if class_names is None : class_names = sparse_names
         class_n = len(class_names)
-        # Parse sparse categorical annotations to One-Hot Encoding
-        class_ohe = pd.get_dummies(classes_sparse).to_numpy()
-    # Try parsing one-hot encoded format
+    # Concatenate one-hot encoded format
     else:
-        # Parse information
-        if "legend" in dt_json:
-            class_names = dt_json["legend"]
-            del dt_json["legend"]
-            class_n = len(class_names)
-        else:
-            class_names = None
-            class_n = None
-        # Obtain class information and index list
-        index_list = []
-        class_data = []
-        for sample in dt_json:
-            index_list.append(str(sample))
-            class_data.append(dt_json[sample])
-        class_ohe = np.array(class_data)
+        if len(class_chunks) == 0:
+            class_ohe = compact_ohe(np.zeros((0, 0)), sparse_labels)
+        elif sparse_labels : class_ohe = sparse.vstack(class_chunks, "csr")
+        else : class_ohe = np.concatenate(class_chunks)
         # Verify number of class annotation
-        if class_n is None : class_ohe.shape[1]
+        if class_names is not None : class_n = len(class_names)
+        else : class_n = class_ohe.shape[1]
 
     # Validate if number of samples and number of annotations match
-    if len(index_list) != len(class_ohe):
+    if len(index_list) != class_ohe.shape[0]:
         raise Exception("Numbers of samples and annotations do not match!",
-                        len(index_list), len(class_ohe))
+                        len(index_list), class_ohe.shape[0])
 
     # Return parsed JSON data
     return index_list, class_ohe, class_n, class_names, image_format
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for parsing the (sample, annotation) pairs of a JSON object into compact form
+# (returns None if a sample occurs multiple times)
+def __parse_annotations__(pairs, training, ohe, sparse_labels):
+    index_list = []
+    samples = set()
+    class_names = None
+    encoder = SparseEncoder()
+    class_chunks = []
+    buffer = []
+    for sample, annotation in pairs:
+        # Parse class name information
+        if sample == "legend":
+            class_names = annotation
+            continue
+        # Obtain index list
+        if sample in samples : return None
+        samples.add(sample)
+        index_list.append(str(sample))
+        if not training : continue
+        # Flush buffered annotations into compact form
+        buffer.append(annotation)
+        if len(buffer) >= 65536:
+            if not ohe : encoder.add(buffer)
+            else : class_chunks.append(compact_ohe(buffer, sparse_labels))
+            buffer = []
+    if training and len(buffer) > 0:
+        if not ohe : encoder.add(buffer)
+        else : class_chunks.append(compact_ohe(buffer, sparse_labels))
+    return index_list, class_names, encoder, class_chunks
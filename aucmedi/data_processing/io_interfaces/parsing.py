@@ -0,0 +1,197 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from scipy import sparse
+import numpy as np
+import pandas as pd
+import json
+import re
+
+#-----------------------------------------------------#
+#           Compact Sparse Categorical Encoder        #
+#-----------------------------------------------------#
+class SparseEncoder:
+    """ Internal class for building a compact One-Hot encoding from streamed sparse categorical annotations.
+
+    Annotations are added in chunks and stored as integer codes. The One-Hot encoding is created once
+    in its final uint8 form, with classes in sorted order (like `pd.get_dummies`).
+    """
+    def __init__(self):
+        """ Initialization function for creating an empty SparseEncoder. """
+        self.mapping = {}
+        self.codes = []
+
+    def add(self, values):
+        """ Add a chunk of sparse categorical annotations.
+
+        Args:
+            values (list or numpy.ndarray):     Class annotations of the chunk. Missing values (NaN) are not encoded.
+        """
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        lookup = np.array([self.mapping.setdefault(u, len(self.mapping)) \
+                           for u in uniques] + [-1], dtype=np.int32)
+        self.codes.append(lookup[codes])
+
+    def encode(self, numeric=False, sparse_labels=False):
+        """ Create the One-Hot encoding of all added annotations.
+
+        Args:
+            numeric (bool):                     Option whether class names should be converted to numbers
+                                                if all of them are numeric (e.g. for classes parsed as strings).
+            sparse_labels (bool):               Option whether the One-Hot encoding should be returned as
+                                                scipy.sparse CSR matrix.
+
+        Returns:
+            class_names (list):                 Sorted list of class names.
+            class_ohe (numpy.ndarray):          One-Hot encoding with dtype uint8 (or a CSR matrix).
+        """
+        names = list(self.mapping.keys())
+        # Convert class names to numbers if possible
+        if numeric:
+            try : names = pd.to_numeric(pd.Series(names, dtype=object)).tolist()
+            except (ValueError, TypeError) : pass
+        # Sort classes and compute rank of each code
+        order = np.argsort(np.asarray(names, dtype=object), kind="stable")
+        rank = np.empty(len(names) + 1, dtype=np.int32)
+        rank[order] = np.arange(len(names))
+        rank[-1] = -1
+        # Build One-Hot encoding in its final compact form
+        if len(self.codes) > 0 : codes = rank[np.concatenate(self.codes)]
+        else : codes = np.zeros(0, dtype=np.int32)
+        class_ohe = codes_to_ohe(codes, len(names), sparse_labels)
+        return [names[i] for i in order], class_ohe
+
+#-----------------------------------------------------#
+#        One-Hot Encoding of Categorical Codes        #
+#-----------------------------------------------------#
+def codes_to_ohe(codes, n_classes, sparse_labels=False):
+    """ Create a uint8 One-Hot encoding from integer class codes.
+
+    Args:
+        codes (numpy.ndarray):              Class code of each sample. Negative codes (missing values) are not encoded.
+        n_classes (int):                    Number of classes.
+        sparse_labels (bool):               Option whether the One-Hot encoding should be returned as
+                                            scipy.sparse CSR matrix.
+
+    Returns:
+        class_ohe (numpy.ndarray):          One-Hot encoding with shape (n_samples, n_classes) (or a CSR matrix).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    valid = np.flatnonzero(codes >= 0)
+    # Build CSR matrix directly from the codes
+    if sparse_labels:
+        return sparse.csr_matrix((np.ones(len(valid), dtype=np.uint8),
+                                  (valid, codes[valid])),
+                                 shape=(len(codes), n_classes))
+    # Build dense One-Hot encoding
+    class_ohe = np.zeros((len(codes), n_classes), dtype=np.uint8)
+    class_ohe[valid, codes[valid]] = 1
+    return class_ohe
+
+#-----------------------------------------------------#
+#              Compact One-Hot Encoding               #
+#-----------------------------------------------------#
+def compact_ohe(values, sparse_labels=False):
+    """ Convert a chunk of One-Hot encoded annotations into a compact dtype.
+
+    Binary annotations are stored as uint8 and other numeric annotations (e.g. soft labels) as float32.
+
+    Args:
+        values (list or numpy.ndarray):     One-Hot encoded annotations of the chunk.
+        sparse_labels (bool):               Option whether the chunk should be returned as scipy.sparse CSR matrix.
+
+    Returns:
+        class_ohe (numpy.ndarray):          Annotations with compact dtype (or a CSR matrix).
+    """
+    values = np.asarray(values)
+    if sparse_labels : return sparse.csr_matrix(compact_ohe(values))
+    if values.dtype == bool : return values.astype(np.uint8)
+    if not np.issubdtype(values.dtype, np.number) : return values
+    if np.all((values == 0) | (values == 1)) : return values.astype(np.uint8)
+    return values.astype(np.float32)
+
+#-----------------------------------------------------#
+#                 Streaming JSON Parser               #
+#-----------------------------------------------------#
+def iterate_json_object(path_json, chunk_size=2**20):
+    """ Iterate over the key-value pairs of a JSON object without loading the complete file.
+
+    The file is read in chunks into a growing buffer. Each key and value is decoded by a single
+    `json.JSONDecoder.raw_decode()` call. If a value reaches the end of the buffer, it might be
+    incomplete and the next chunk is read before decoding it again.
+
+    Args:
+        path_json (str):                    Path to a JSON file containing a single object.
+        chunk_size (int):                   Number of characters per read call.
+
+    Returns:
+        pairs (generator):                  Generator of (key, value) tuples in file order.
+    """
+    decoder = json.JSONDecoder()
+    # Delimiters of the object including the surrounding whitespace
+    whitespace = r"[ \t\n\r]*"
+    object_start = re.compile(whitespace + r"\{" + whitespace + r"(\}?)")
+    key_end = re.compile(whitespace + r"(:)" + whitespace)
+    value_end = re.compile(whitespace + r"([,}])" + whitespace)
+    with open(path_json, "r") as reader:
+        buffer, pos, eof = "", 0, False
+        # Read next chunk into the buffer and drop consumed characters
+        def read():
+            nonlocal buffer, pos, eof
+            chunk = reader.read(chunk_size)
+            if not chunk : eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        # Consume next delimiter (delimiters are complete if followed by another character)
+        def delimiter(pattern, expected):
+            nonlocal pos
+            while True:
+                match = pattern.match(buffer, pos)
+                if match is not None and (match.end() < len(buffer) or eof):
+                    pos = match.end()
+                    return match.group(1)
+                if eof or (match is None and buffer[pos:].strip(" \t\n\r")):
+                    raise ValueError("Invalid JSON object, expected " + \
+                                     expected + ":", path_json)
+                read()
+        # Decode next JSON value (values are complete if followed by another character)
+        def decode():
+            nonlocal pos
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        pos = end
+                        return obj
+                except json.JSONDecodeError:
+                    if eof : raise
+                read()
+
+        # Iterate over key-value pairs of the object
+        if delimiter(object_start, "{") == "}" : return
+        while True:
+            key = decode()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON object, expected key:",
+                                 path_json)
+            delimiter(key_end, ":")
+            yield key, decode()
+            if delimiter(value_end, ",}") == "}" : return
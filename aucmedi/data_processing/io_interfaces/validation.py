@@ -0,0 +1,90 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from multiprocessing.pool import ThreadPool
+import os
+
+#-----------------------------------------------------#
+#               Image Format Detection                #
+#-----------------------------------------------------#
+def detect_image_format(path_imagedir, allowed_image_formats):
+    """ Identify the image format of a dataset by peeking the first image in the image directory.
+
+    The directory is streamed and scanning stops after the first file with an allowed format.
+
+    Args:
+        path_imagedir (str):                    Path to the directory containing the images.
+        allowed_image_formats (list of str):    List of allowed imaging formats.
+
+    Returns:
+        image_format (str):                     Image format of the first matching file.
+    """
+    with os.scandir(path_imagedir) as entries:
+        for entry in entries:
+            format = entry.name.split(".")[-1]
+            if format.lower() in allowed_image_formats or \
+               format.upper() in allowed_image_formats:
+                return format
+    # Raise Exception if image format is unknown
+    raise Exception("Unknown image format.", path_imagedir)
+
+#-----------------------------------------------------#
+#                 Sample Validation                   #
+#-----------------------------------------------------#
+def validate_samples(index_list, path_imagedir, image_format, workers=16):
+    """ Verify that the image files of all samples exist.
+
+    Instead of checking each file separately, the image directory is listed once and the expected
+    file names are compared against the listing. Only samples located in subdirectories
+    (or missing in the listing) are checked separately via parallel file status calls.
+
+    Args:
+        index_list (list of str):               List of sample/index encoded as Strings.
+        path_imagedir (str):                    Path to the directory containing the images.
+        image_format (str):                     Image format to add at the end of the sample index.
+        workers (int):                          Number of threads for checking files separately.
+
+    Raises:
+        Exception:                              If an image does not exist or is not accessible.
+    """
+    # Obtain image file names
+    if image_format:
+        img_files = [sample + "." + image_format for sample in index_list]
+    else : img_files = index_list
+    # List image directory once
+    with os.scandir(path_imagedir) as entries:
+        listing = {entry.name for entry in entries}
+    # Identify files which are not in the listing (e.g. nested paths)
+    unlisted = [file for file in set(img_files) if file not in listing]
+    # Check existence of unlisted files separately
+    paths = [os.path.join(path_imagedir, file) for file in unlisted]
+    if len(paths) > 1 and workers > 1:
+        with ThreadPool(min(workers, len(paths))) as pool:
+            exists = pool.map(os.path.exists, paths)
+    else : exists = [os.path.exists(path) for path in paths]
+    missing = {file for file, e in zip(unlisted, exists) if not e}
+    if len(missing) == 0 : return
+    # Raise Exception for the first missing image
+    for sample, file in zip(index_list, img_files):
+        if file in missing:
+            raise Exception("Image does not exist / not accessible!",
+                            'Sample: "' + sample + '"',
+                            os.path.join(path_imagedir, file))
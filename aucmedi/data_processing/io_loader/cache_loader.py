@@ -20,6 +20,7 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
+from collections.abc import Mapping
 import numpy as np
 
 #-----------------------------------------------------#
@@ -41,6 +42,10 @@ def cache_loader(sample, path_imagedir=None, image_format=None,
     Dictionary structure: key=index as String; value=Image as NumPy array <br>
     e.g. cache = {"my_index_001": my_image}
 
+    For multi-processing (e.g. worker processes or ensembles), the dictionary can be packed into a
+    [SharedCache][aucmedi.data_processing.io_cache.shared_cache.SharedCache], which is shared between processes
+    without copying and whose image shapes are already verified.
+
     ???+ example
         ```python
         # Import required libraries
@@ -68,14 +73,16 @@ def cache_loader(sample, path_imagedir=None, image_format=None,
         image_format (str):         Image format to add at the end of the sample index for image loading.
         grayscale (bool):           Boolean, whether images are grayscale or RGB.
         two_dim (bool):             Boolean, whether image is 2D or 3D.
-        cache (dict):               A Python dictionary containing one or multiple images.
+        cache (dict or SharedCache):A Python dictionary (or SharedCache) containing one or multiple images.
         **kwargs (dict):            Additional parameters for the sample loader.
     """
     # Verify if a cache is provided
-    if cache is None or type(cache) is not dict:
+    if cache is None or not isinstance(cache, Mapping):
         raise TypeError("No dictionary was provided to cache_loader()!")
     # Obtain image from cache
     img = cache[sample]
+    # Skip verification for caches with already verified image shapes
+    if getattr(cache, "verified", None) == (grayscale, two_dim) : return img
     # Verify image shape for grayscale & 2D
     if grayscale and two_dim:
         # Add channel axis and return image
@@ -21,15 +21,17 @@
 #-----------------------------------------------------#
 # External libraries
 import os
+import tempfile
 import numpy as np
 from PIL import Image
 import itk
+import cv2
 
 #-----------------------------------------------------#
 #             Image Loader for AUCMEDI IO             #
 #-----------------------------------------------------#
 def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
-                 **kwargs):
+                 resize=None, backend="pil", **kwargs):
     """ Image Loader for image loading within the AUCMEDI pipeline.
 
     The Image Loader is an IO_loader function, which have to be passed to the
@@ -39,6 +41,19 @@ def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
         The Image Loader utilizes Pillow for image loading: <br>
         https://github.com/python-pillow/Pillow
 
+    ???+ info "Reduced-resolution decoding"
+        If a target shape is provided via `resize`, images are decoded at the smallest resolution
+        which is at or above the target shape (decoder-level downscaling by a factor of 2, 4 or 8).
+        The image is not resized to the exact target shape, which is still performed by the
+        [Resize][aucmedi.data_processing.subfunctions.resize] Subfunction of the DataGenerator.
+
+        | Backend             | Description                                                   |
+        | ------------------- | ------------------------------------------------------------- |
+        | `"pil"`             | Pillow `draft()` with DCT scaling (only JPEG, other formats are decoded at full resolution). |
+        | `"opencv"`          | OpenCV `IMREAD_REDUCED_*` flags (JPEG scaling via libjpeg, other formats are downscaled after decoding). |
+
+        The DataGenerator passes its resize shape to the loader with `loader_resize=True`.
+
     ???+ example
         ```python
         # Import required libraries
@@ -67,8 +82,14 @@ def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
         path_imagedir (str):        Path to the directory containing the images.
         image_format (str):         Image format to add at the end of the sample index for image loading.
         grayscale (bool):           Boolean, whether images are grayscale or RGB.
+        resize (tuple of int):      Target shape for reduced-resolution decoding. If `None`, images are decoded at full resolution.
+        backend (str):              Library for decoding 2D images (`"pil"` or `"opencv"`).
         **kwargs (dict):            Additional parameters for the sample loader.
     """
+    # Verify backend
+    if backend not in ["pil", "opencv"]:
+        raise ValueError("Unknown backend for image_loader:", backend,
+                         "Possible backends are: ['pil', 'opencv']")
     # Get image path
     if image_format : img_file = sample + "." + image_format
     else : img_file = sample
@@ -76,9 +97,19 @@ def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
     # Get format
     base, ext = os.path.splitext(path_img)
     # Load image
+    return __decode_image__(path_img, ext, grayscale, resize, backend)
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for decoding an image from a file path or an in-memory file object
+def __decode_image__(source, ext, grayscale, resize, backend):
     if ext in [".nii", ".gz", ".mha"]:
+        # ITK requires a file path, thus in-memory files are staged temporarily
+        if not isinstance(source, str):
+            return __decode_staged__(source, ext, grayscale, resize, backend)
         # Load image via the itk package
-        itk_img = itk.imread(path_img, itk.UC)
+        itk_img = itk.imread(source, itk.UC)
         # Convert image to NumPy
         itk_raw = np.asarray(itk_img, itk.UC)
         # Convert to PIL image + grayscale or rgb
@@ -86,9 +117,16 @@ def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
             img_converted = Image.fromarray(itk_raw, "LA")
         else:
             img_converted = Image.fromarray(itk_raw, "RGB")
+    elif ext in [".jpeg", ".jpg", ".tif", ".tiff", ".png", ".bmp"] and \
+            backend == "opencv":
+        # Load image via the OpenCV package and return it directly
+        return __load_opencv__(source, grayscale, resize)
     elif ext in [".jpeg", ".jpg", ".tif", ".tiff", ".png", ".bmp", ".gif", ".npy"]:
         # Load image via the PIL package
-        img_raw = Image.open(path_img)
+        img_raw = Image.open(source)
+        # Decode JPEG images at reduced resolution via DCT scaling
+        if resize is not None and len(resize) == 2:
+            img_raw.draft("L" if grayscale else "RGB", (resize[1], resize[0]))
         # Convert image to grayscale or rgb
         if grayscale:
             img_converted = img_raw.convert('LA')
@@ -107,3 +145,42 @@ def image_loader(sample, path_imagedir, image_format=None, grayscale=False,
         img = np.reshape(img, img.shape + (1,))
     # Return image
     return img
+
+# Internal function for decoding an in-memory file via a temporary file
+def __decode_staged__(source, ext, grayscale, resize, backend):
+    # Compressed NIfTI files are identified by their full extension
+    if ext == ".gz" : suffix = ".nii.gz"
+    else : suffix = ext
+    fd, path_tmp = tempfile.mkstemp(prefix="aucmedi.", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(source.getbuffer())
+        return __decode_image__(path_tmp, ext, grayscale, resize, backend)
+    finally : os.remove(path_tmp)
+
+# Internal function for loading an image via OpenCV at reduced resolution
+def __load_opencv__(source, grayscale, resize):
+    # Identify reduction factor based on image header
+    factor = 1
+    if resize is not None and len(resize) == 2:
+        with Image.open(source) as img_header:
+            width, height = img_header.size
+        for f in [8, 4, 2]:
+            if height // f >= resize[0] and width // f >= resize[1]:
+                factor = f
+                break
+    # Identify OpenCV decoding flag
+    if grayscale : mode = "GRAYSCALE"
+    else : mode = "COLOR"
+    if factor == 1 : flag = getattr(cv2, "IMREAD_" + mode)
+    else : flag = getattr(cv2, "IMREAD_REDUCED_" + mode + "_" + str(factor))
+    # Load image from file path or in-memory file
+    if isinstance(source, str) : img = cv2.imread(source, flag)
+    else : img = cv2.imdecode(np.frombuffer(source.getbuffer(), np.uint8),
+                              flag)
+    if img is None : raise ValueError("Image could not be decoded:", source)
+    # Convert to RGB or add single channel axis
+    if grayscale : img = np.reshape(img, img.shape + (1,))
+    else : img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    # Return image
+    return img
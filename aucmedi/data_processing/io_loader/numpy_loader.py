@@ -21,13 +21,16 @@
 #-----------------------------------------------------#
 # External libraries
 import os
+import zipfile
+import threading
 import numpy as np
 
 #-----------------------------------------------------#
 #             Numpy Loader for AUCMEDI IO             #
 #-----------------------------------------------------#
 def numpy_loader(sample, path_imagedir, image_format=None, grayscale=False,
-                 two_dim=True, **kwargs):
+                 two_dim=True, mmap_mode=None, allow_pickle=True, archive=None,
+                 **kwargs):
     """ NumPy Loader for image loading within the AUCMEDI pipeline.
 
     The NumPy Loader is an IO_loader function, which have to be passed to the
@@ -35,6 +38,22 @@ def numpy_loader(sample, path_imagedir, image_format=None, grayscale=False,
 
     The NumPy load function `np.load(path_img, allow_pickle=True)` is used.
 
+    ???+ info "Memory-mapping"
+        By passing `mmap_mode="r"`, a read-only memory map is returned instead of reading the whole
+        array into memory. Subsequent cropping only reads the required window from disk.
+
+        Memory-mapping requires non-pickled arrays. With `allow_pickle=False`, pickled object
+        arrays are rejected (strict mode).
+
+    ???+ info "Archive layout"
+        Instead of one `.npy` file per sample, multiple arrays can be stored in `.npz` archives
+        (e.g. via `np.savez(path, **{sample: array})`). The parameter 'archive' defines a single archive or a list
+        of archives (shards), in which samples are identified by their name (keys of the archive).
+        Paths are relative to 'path_imagedir' if not absolute.
+
+        Uncompressed archives (`np.savez`) support read-only memory-mapping (`"r"` or `"c"`), whereas
+        compressed archives (`np.savez_compressed`) are always read into memory.
+
     ???+ example
         ```python
         # Import required libraries
@@ -61,14 +80,36 @@ def numpy_loader(sample, path_imagedir, image_format=None, grayscale=False,
         image_format (str):         Image format to add at the end of the sample index for image loading.
         grayscale (bool):           Boolean, whether images are grayscale or RGB.
         two_dim (bool):             Boolean, whether image is 2D or 3D.
+        mmap_mode (str):            Memory-map mode for `np.load` (e.g. `"r"`). If `None`, the array is read into memory.
+        allow_pickle (bool):        Boolean, whether pickled object arrays are allowed.
+        archive (str or list of str):Path to a `.npz` archive or list of paths to `.npz` shards containing the samples.
+                                    If `None`, samples are loaded from single `.npy` files.
         **kwargs (dict):            Additional parameters for the sample loader.
     """
-    # Get image path
-    if image_format : img_file = sample + "." + image_format
-    else : img_file = sample
-    path_img = os.path.join(path_imagedir, img_file)
+    # Load image from archive
+    if archive is not None:
+        img = __load_archive__(sample, path_imagedir, archive, mmap_mode,
+                               allow_pickle)
     # Load image via the NumPy package
-    img = np.load(path_img, allow_pickle=True)
+    else:
+        # Get image path
+        if image_format : img_file = sample + "." + image_format
+        else : img_file = sample
+        path_img = os.path.join(path_imagedir, img_file)
+        img = np.load(path_img, mmap_mode=mmap_mode,
+                      allow_pickle=allow_pickle)
+    # Verify image shape and return image
+    return __verify_shape__(img, grayscale, two_dim)
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Cache of archive indices ((path, mtime, size) of archives -> sample -> member location)
+archive_index = {}
+archive_lock = threading.Lock()
+
+# Internal function for verifying the channel axis of a loaded array
+def __verify_shape__(img, grayscale, two_dim):
     # Verify image shape for grayscale & 2D
     if grayscale and two_dim:
         # Add channel axis and return image
@@ -115,3 +156,63 @@ def numpy_loader(sample, path_imagedir, image_format=None, grayscale=False,
             raise ValueError("Parameter 3D & RGB: Expected 4D array " + \
                              "including a single channel axis, but got:",
                              img.shape, len(img.shape))
+
+# Internal function for loading a sample from a list of npz archives
+def __load_archive__(sample, path_imagedir, archive, mmap_mode, allow_pickle):
+    # Verify memory-mapping mode (archives are never modified)
+    if mmap_mode not in [None, "r", "c"]:
+        raise ValueError("Archives only support the mmap_mode None, 'r' " + \
+                         "or 'c', but got:", mmap_mode)
+    # Identify archive versions by their modification time and size
+    if isinstance(archive, str) : archive = [archive]
+    paths = tuple(a if path_imagedir is None else \
+                  os.path.join(path_imagedir, a) for a in archive)
+    stats = [os.stat(path) for path in paths]
+    key = tuple((path, st.st_mtime_ns, st.st_size) \
+                for path, st in zip(paths, stats))
+    # Obtain index of archives
+    with archive_lock:
+        if key not in archive_index:
+            # Drop outdated index of modified archives
+            for outdated in [k for k in archive_index \
+                             if tuple(e[0] for e in k) == paths]:
+                del archive_index[outdated]
+            archive_index[key] = __index_archives__(paths)
+        index = archive_index[key]
+    # Identify member of sample
+    if sample not in index:
+        raise ValueError("Sample is not contained in the archive:", sample)
+    path, member, offset = index[sample]
+    # Memory-map uncompressed member
+    if mmap_mode is not None and offset is not None:
+        with open(path, "rb") as fd:
+            fd.seek(offset)
+            version = np.lib.format.read_magic(fd)
+            shape, fortran, dtype = np.lib.format._read_array_header(fd,
+                                                                     version)
+            data_offset = fd.tell()
+        if not dtype.hasobject:
+            return np.memmap(path, dtype=dtype, shape=shape, offset=data_offset,
+                             order="F" if fortran else "C",
+                             mode="c" if mmap_mode == "c" else "r")
+    # Read member into memory
+    with zipfile.ZipFile(path) as zf:
+        with zf.open(member) as fd:
+            return np.lib.format.read_array(fd, allow_pickle=allow_pickle)
+
+# Internal function for indexing samples in npz archives via their zip headers
+def __index_archives__(paths):
+    index = {}
+    for path in paths:
+        with zipfile.ZipFile(path) as zf, open(path, "rb") as fd:
+            for info in zf.infolist():
+                if not info.filename.endswith(".npy") : continue
+                sample = info.filename[:-4]
+                # Compute data offset of uncompressed members from local header
+                offset = None
+                if info.compress_type == zipfile.ZIP_STORED:
+                    fd.seek(info.header_offset + 26)
+                    lengths = np.frombuffer(fd.read(4), dtype="<u2")
+                    offset = info.header_offset + 30 + int(lengths.sum())
+                index[sample] = (path, info.filename, offset)
+    return index
@@ -0,0 +1,214 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import os
+import io
+import json
+import mmap
+import threading
+import numpy as np
+# Internal libraries
+from aucmedi.data_processing.io_loader.image_loader import __decode_image__
+from aucmedi.data_processing.io_loader.numpy_loader import __verify_shape__
+
+#-----------------------------------------------------#
+#                   Static Variables                  #
+#-----------------------------------------------------#
+SHARD_INDEX = "index.json"
+""" File name of the offset index inside a shard directory. """
+
+#-----------------------------------------------------#
+#             Shard Loader for AUCMEDI IO             #
+#-----------------------------------------------------#
+def shard_loader(sample, path_imagedir, image_format=None, grayscale=False,
+                 resize=None, two_dim=True, backend="pil", allow_pickle=True,
+                 **kwargs):
+    """ Shard Loader for loading samples from packed dataset shards within the AUCMEDI pipeline.
+
+    The Shard Loader is an IO_loader function, which have to be passed to the
+    [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    Shards are large append-only container files holding the encoded file bytes (mode `"encoded"`)
+    or the raw array bytes (mode `"raw"`) of many samples, which are created via
+    [build_shards()][aucmedi.data_processing.io_shards.build_shards].
+    An offset index (`index.json`) maps each sample to its shard, offset and length.
+    Thus, loading a sample requires a single positional read (`os.pread`) on an already opened
+    shard instead of opening a single file per sample.
+
+    ???+ info "Shard modes"
+        | Mode                | Description                                                   |
+        | ------------------- | ------------------------------------------------------------- |
+        | `"encoded"`         | Original file bytes, which are decoded like the [image_loader()][aucmedi.data_processing.io_loader.image_loader] (2D images) or the [numpy_loader()][aucmedi.data_processing.io_loader.numpy_loader] (`.npy`). |
+        | `"raw"`             | Loaded arrays, which are returned as read-only views on a memory map without decoding. |
+
+    ???+ example
+        ```python
+        # Import required libraries
+        from aucmedi import *
+        from aucmedi.data_processing.io_shards import build_shards
+        from aucmedi.data_processing.io_loader import shard_loader
+
+        # Initialize input data reader
+        ds = input_interface(interface="csv",
+                             path_imagedir="dataset/images/",
+                             path_data="dataset/annotations.csv",
+                             ohe=False, col_sample="ID", col_class="diagnosis")
+        (samples, class_ohe, nclasses, class_names, image_format) = ds
+
+        # Pack images into shards
+        build_shards(samples, "dataset/images/", "dataset/shards/",
+                     image_format=image_format)
+
+        # Initialize DataGenerator with shard_loader
+        data_gen = DataGenerator(samples, "dataset/shards/", labels=class_ohe,
+                                 image_format=image_format, resize=None,
+                                 loader=shard_loader)
+        ```
+
+    Args:
+        sample (str):               Sample name/index of an image.
+        path_imagedir (str):        Path to the directory containing the shards and the offset index.
+        image_format (str):         Image format of the samples (not required, as the format is stored in the index).
+        grayscale (bool):           Boolean, whether images are grayscale or RGB.
+        resize (tuple of int):      Target shape for reduced-resolution JPEG decoding (mode `"encoded"`). If `None`, images are decoded at full resolution.
+        two_dim (bool):             Boolean, whether `.npy` arrays are 2D (mode `"encoded"`, see [numpy_loader()][aucmedi.data_processing.io_loader.numpy_loader]).
+        backend (str):              Decoding backend for images (mode `"encoded"`, see [image_loader()][aucmedi.data_processing.io_loader.image_loader]).
+        allow_pickle (bool):        Boolean, whether pickled object arrays are allowed (mode `"encoded"`).
+        **kwargs (dict):            Additional parameters for the sample loader.
+    """
+    # Obtain opened shards and location of sample
+    shards, entry = __locate_sample__(path_imagedir, sample)
+    # Return raw array as read-only view on the shard
+    if shards["index"]["mode"] == "raw":
+        buffer = __shard_mmap__(shards, entry["shard"])
+        img = np.frombuffer(buffer, dtype=np.dtype(entry["dtype"]),
+                            count=int(np.prod(entry["shape"])),
+                            offset=entry["offset"])
+        return np.reshape(img, entry["shape"])
+    # Read encoded file bytes via positional read
+    data = __shard_read__(shards, entry["shard"], entry["offset"],
+                          entry["length"])
+    # Decode NumPy arrays like the numpy_loader
+    if entry["ext"] == ".npy":
+        img = np.load(io.BytesIO(data), allow_pickle=allow_pickle)
+        return __verify_shape__(img, grayscale, two_dim)
+    # Decode images like the image_loader
+    return __decode_image__(io.BytesIO(data), entry["ext"], grayscale, resize,
+                            backend)
+
+#-----------------------------------------------------#
+#                 Shard Index Handling                #
+#-----------------------------------------------------#
+def read_shard_index(path_shards):
+    """ Read the offset index of a shard directory.
+
+    Args:
+        path_shards (str):          Path to the directory containing the shards.
+
+    Returns:
+        index (dict):               Offset index with the keys `"mode"`, `"shards"` and `"samples"`
+                                    (or `None` if no index exists).
+    """
+    path_index = os.path.join(path_shards, SHARD_INDEX)
+    if not os.path.exists(path_index) : return None
+    with open(path_index, "r") as fd:
+        return json.load(fd)
+
+def shard_entry(path_shards, sample):
+    """ Obtain the index entry of a sample in a shard directory.
+
+    As shards are append-only, the entry (shard, offset & length) identifies the stored bytes of the sample.
+
+    Args:
+        path_shards (str):          Path to the directory containing the shards.
+        sample (str):               Sample name/index of an image.
+
+    Returns:
+        entry (dict):               Index entry of the sample.
+    """
+    return __locate_sample__(path_shards, sample)[1]
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Cache of opened shard directories (path -> index, file descriptors, memory maps)
+opened_shards = {}
+opened_lock = threading.Lock()
+
+# Internal function for obtaining the index and opened shards of a directory
+# (the index is read once and only reloaded on request)
+def __open_shards__(path_shards, reload=False):
+    with opened_lock:
+        shards = opened_shards.get(path_shards, None)
+        # Reload index if it was extended (shards are append-only, thus opened shards remain valid)
+        if shards is None or reload:
+            fds = shards["fds"] if shards is not None else {}
+            index = read_shard_index(path_shards)
+            if index is None:
+                raise FileNotFoundError("Shard index is missing:",
+                                        os.path.join(path_shards, SHARD_INDEX))
+            shards = {"path": path_shards, "index": index,
+                      "fds": fds, "mmaps": {}}
+            opened_shards[path_shards] = shards
+    return shards
+
+# Internal function for obtaining the opened shards and the index entry of a sample
+def __locate_sample__(path_shards, sample):
+    shards = __open_shards__(path_shards)
+    # Reload index for samples, which were appended after opening the shards
+    if sample not in shards["index"]["samples"]:
+        shards = __open_shards__(path_shards, reload=True)
+    # Identify location of sample
+    if sample not in shards["index"]["samples"]:
+        raise ValueError("Sample is not contained in the shards:", sample)
+    return shards, shards["index"]["samples"][sample]
+
+# Internal function for obtaining the file descriptor of a shard
+def __shard_fd__(shards, shard_id):
+    fd = shards["fds"].get(shard_id, None)
+    if fd is None:
+        with opened_lock:
+            fd = shards["fds"].get(shard_id, None)
+            if fd is None:
+                path = os.path.join(shards["path"],
+                                    shards["index"]["shards"][shard_id])
+                fd = os.open(path, os.O_RDONLY)
+                shards["fds"][shard_id] = fd
+    return fd
+
+# Internal function for reading bytes of a shard via positional read
+def __shard_read__(shards, shard_id, offset, length):
+    fd = __shard_fd__(shards, shard_id)
+    # Positional read is thread-safe and independent of the file position
+    if hasattr(os, "pread") : return os.pread(fd, length, offset)
+    path = os.path.join(shards["path"], shards["index"]["shards"][shard_id])
+    with open(path, "rb") as fd_fallback:
+        fd_fallback.seek(offset)
+        return fd_fallback.read(length)
+
+# Internal function for obtaining a read-only memory map of a shard
+def __shard_mmap__(shards, shard_id):
+    buffer = shards["mmaps"].get(shard_id, None)
+    if buffer is None:
+        fd = __shard_fd__(shards, shard_id)
+        buffer = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        shards["mmaps"][shard_id] = buffer
+    return buffer
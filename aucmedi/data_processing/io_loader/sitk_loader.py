@@ -28,7 +28,8 @@ import SimpleITK as sitk
 #              SITK Loader for AUCMEDI IO             #
 #-----------------------------------------------------#
 def sitk_loader(sample, path_imagedir, image_format=None, grayscale=True,
-                resampling=(1.0, 1.0, 1.0), outside_value=0, **kwargs):
+                resampling=(1.0, 1.0, 1.0), outside_value=0, roi=None,
+                roi_mode="center", resize=None, threads=None, **kwargs):
     """ SimpleITK Loader for loading of CT/MRI scans in NIfTI (nii) or Metafile (mha) format within the AUCMEDI pipeline.
 
     The SimpleITK Loader is an IO_loader function, which have to be passed to the
@@ -43,6 +44,27 @@ def sitk_loader(sample, path_imagedir, image_format=None, grayscale=True,
         The SimpleITK Loader utilizes SimpleITK for sample loading: <br>
         https://simpleitk.readthedocs.io/en/master/IO.html
 
+    ???+ info "Region of interest"
+        By passing a shape as parameter 'roi', only a sub-volume of this shape (in voxels after resampling) is returned.
+        The loader reads the image header first and loads as well as resamples only the region of the volume
+        which is required for the sub-volume. This replaces a subsequent
+        [Crop][aucmedi.data_processing.subfunctions.crop] Subfunction with mode `"center"` or `"random"` (parameter 'roi_mode').
+
+        If the sub-volume is larger than the resampled volume, the missing region is filled with the 'outside_value'
+        (without resampling, the sub-volume is truncated to the volume instead).
+
+    ???+ info "Single-pass resizing"
+        By passing a target shape as parameter 'resize', the voxel spacing normalization and the resizing
+        to the target shape are combined into a single multithreaded resampling (the voxel spacing is scaled
+        to cover the physical extent of the resampled volume or region of interest).
+
+        The DataGenerator passes its resize shape to the loader with `loader_resize=True` and skips
+        its own [Resize][aucmedi.data_processing.subfunctions.resize] Subfunction for volumes,
+        which already have the target shape.
+        Shape changing Subfunctions like Padding or Crop would operate on the resampled volume and require a second
+        interpolation by the Resize, thus `loader_resize=True` is rejected for them. Cropping can be performed
+        by the 'roi' parameter of the loader instead.
+
     ???+ example
         ```python
         # Import required libraries
@@ -70,42 +92,144 @@ def sitk_loader(sample, path_imagedir, image_format=None, grayscale=True,
         grayscale (bool):           Boolean, whether images are grayscale or RGB.
         resampling (tuple of float):Tuple of 3x floats with z,y,x mapping encoding voxel spacing.
                                     If passing `None`, no normalization will be performed.
+        outside_value (int):        Intensity value for voxels outside of the volume during resampling.
+        roi (tuple of int):         Shape of the region of interest (z,y,x mapping) which is loaded. If `None`, the whole volume is loaded.
+        roi_mode (str):             Mode for selecting the region of interest (`"center"` or `"random"`).
+        resize (tuple of int):      Target shape (z,y,x mapping) for single-pass resampling. If `None`, the shape results from the voxel spacing.
+        threads (int):              Number of threads for resampling. If `None`, the SimpleITK default is used.
         **kwargs (dict):            Additional parameters for the sample loader.
     """
     # Get image path
     if image_format : img_file = sample + "." + image_format
     else : img_file = sample
     path_img = os.path.join(path_imagedir, img_file)
+    # Use target shape only for 3D volumes
+    if resize is not None and len(resize) != 3 : resize = None
+    # Load only region of interest if provided
+    if roi is not None:
+        if roi_mode not in ["center", "random"]:
+            raise ValueError("Unknown roi_mode for sitk_loader:", roi_mode,
+                             "Possible modes are: ['center', 'random']")
+        sample_itk_resampled = __read_roi__(path_img, resampling, roi,
+                                            roi_mode, outside_value, resize,
+                                            threads)
+        return __to_numpy__(sample_itk_resampled)
     # Load image via the SimpleITK package
     sample_itk = sitk.ReadImage(path_img)
     # Perform resampling
-    if resampling is not None:
+    if resampling is not None or resize is not None:
         # Extract information from sample
         shape = sample_itk.GetSize()
         spacing = sample_itk.GetSpacing()
         # Reverse resampling spacing to sITK mapping (z,y,x -> x,y,z)
-        new_spacing = resampling[::-1]
+        if resampling is not None : new_spacing = resampling[::-1]
+        else : new_spacing = spacing
         # Estimate output shape after resampling
         output_shape = []
         for t in zip(shape, spacing, new_spacing):
             s = int(t[0] * t[1] / t[2])
             output_shape.append(s)
         output_shape = tuple(output_shape)
+        # Combine voxel spacing and target shape into a single resampling
+        if resize is not None:
+            new_spacing, output_shape = __scale_to_shape__(new_spacing,
+                                                           output_shape,
+                                                           resize)
         # Perform resampling via sITK
-        sample_itk_resampled = sitk.Resample(sample_itk,
-                                             output_shape,
-                                             sitk.Transform(),
-                                             sitk.sitkLinear,
-                                             sample_itk.GetOrigin(),
-                                             new_spacing,
-                                             sample_itk.GetDirection(),
-                                             outside_value,
-                                             sitk.sitkFloat32)
+        sample_itk_resampled = __resample__(sample_itk, output_shape,
+                                            sample_itk.GetOrigin(),
+                                            new_spacing,
+                                            sample_itk.GetDirection(),
+                                            outside_value, threads)
     # Skip resampling if None
     else : sample_itk_resampled = sample_itk
+    # Convert to NumPy and return image
+    return __to_numpy__(sample_itk_resampled)
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for converting a SimpleITK image to NumPy with channel axis
+def __to_numpy__(sample_itk):
     # Convert to NumPy
-    img = sitk.GetArrayFromImage(sample_itk_resampled)
+    img = sitk.GetArrayFromImage(sample_itk)
     # Add single channel axis
     if len(img.shape) == 3 : img = np.expand_dims(img, axis=-1)
     # Return image
     return img
+
+# Internal function for reading and resampling only a region of interest
+def __read_roi__(path_img, resampling, roi, roi_mode, outside_value,
+                 resize=None, threads=None):
+    # Read only header information
+    reader = sitk.ImageFileReader()
+    reader.SetFileName(path_img)
+    reader.ReadImageInformation()
+    shape = reader.GetSize()
+    spacing = reader.GetSpacing()
+    # Reverse spacing and roi to sITK mapping (z,y,x -> x,y,z)
+    if resampling is not None : new_spacing = resampling[::-1]
+    else : new_spacing = spacing
+    roi_size = [int(r) for r in roi[::-1]]
+    # Estimate output shape after resampling
+    output_shape = []
+    for t in zip(shape, spacing, new_spacing):
+        output_shape.append(int(t[0] * t[1] / t[2]))
+    # Identify start of region in output voxel coordinates
+    if roi_mode == "center":
+        start = [(o - r) // 2 for o, r in zip(output_shape, roi_size)]
+    else:
+        start = [np.random.randint(0, max(o - r, 0) + 1) \
+                 for o, r in zip(output_shape, roi_size)]
+    # Identify required region in input voxel coordinates (incl. interpolation neighbors)
+    index = []
+    size = []
+    for i in range(0, len(shape)):
+        scale = new_spacing[i] / spacing[i]
+        lower = max(int(np.floor(start[i] * scale)), 0)
+        upper = int(np.ceil((start[i] + roi_size[i] - 1) * scale)) + 1
+        upper = max(min(upper, shape[i]), lower + 1)
+        index.append(lower)
+        size.append(upper - lower)
+    # Read only region of interest
+    reader.SetExtractIndex(index)
+    reader.SetExtractSize(size)
+    region_itk = reader.Execute()
+    # Return region without resampling if None
+    if resampling is None and resize is None:
+        return region_itk[tuple(slice(max(s, 0) - i, max(s, 0) - i + r) \
+                                for s, i, r in zip(start, index, roi_size))]
+    # Compute physical origin of the region in the resampled volume
+    direction = np.reshape(reader.GetDirection(), (len(shape), len(shape)))
+    origin = np.asarray(reader.GetOrigin()) + \
+             np.matmul(direction, np.asarray(start) * np.asarray(new_spacing))
+    # Combine voxel spacing and target shape into a single resampling
+    if resize is not None:
+        new_spacing, roi_size = __scale_to_shape__(new_spacing, roi_size,
+                                                   resize)
+    # Perform resampling of region via sITK
+    return __resample__(region_itk, roi_size, tuple(origin.tolist()),
+                        new_spacing, reader.GetDirection(), outside_value,
+                        threads)
+
+# Internal function for scaling the voxel spacing to obtain a target shape (z,y,x mapping)
+def __scale_to_shape__(spacing, shape, resize):
+    target_shape = [int(r) for r in resize[::-1]]
+    target_spacing = [sp * sh / t for sp, sh, t in zip(spacing, shape,
+                                                       target_shape)]
+    return tuple(target_spacing), tuple(target_shape)
+
+# Internal function for linear resampling via the multithreaded sITK filter
+def __resample__(sample_itk, shape, origin, spacing, direction, outside_value,
+                 threads=None):
+    resampler = sitk.ResampleImageFilter()
+    resampler.SetSize([int(s) for s in shape])
+    resampler.SetOutputOrigin(origin)
+    resampler.SetOutputSpacing(spacing)
+    resampler.SetOutputDirection(direction)
+    resampler.SetTransform(sitk.Transform())
+    resampler.SetInterpolator(sitk.sitkLinear)
+    resampler.SetDefaultPixelValue(outside_value)
+    resampler.SetOutputPixelType(sitk.sitkFloat32)
+    if threads is not None : resampler.SetNumberOfThreads(threads)
+    return resampler.Execute(sample_itk)
@@ -0,0 +1,159 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import os
+import json
+import numpy as np
+# Internal libraries
+from aucmedi.data_processing.io_loader import image_loader
+from aucmedi.data_processing.io_cache.fingerprint import fingerprint
+from aucmedi.data_processing.io_loader.shard_loader import SHARD_INDEX, \
+                                                           read_shard_index
+
+#-----------------------------------------------------#
+#              Shard Converter for AUCMEDI            #
+#-----------------------------------------------------#
+def build_shards(samples, path_imagedir, path_shards, image_format=None,
+                 mode="encoded", loader=image_loader, shard_size=2**30,
+                 **kwargs):
+    """ Pack the samples of a dataset into large append-only shard files with an offset index.
+
+    The samples can be obtained from any format interface of the
+    [input_interface()][aucmedi.data_processing.io_data.input_interface] (csv, json or directory).
+    The resulting shard directory can be loaded via the
+    [shard_loader()][aucmedi.data_processing.io_loader.shard_loader].
+
+    Samples are appended sequentially to the current shard until it exceeds `shard_size`.
+    Calling the function on an existing shard directory appends only the missing samples.
+    In mode `"raw"`, the index stores a fingerprint of the loader and its parameters. Appending to shards,
+    which were built with another loader or other parameters, raises a ValueError.
+
+    ???+ info "Shard Layout"
+        | File                 | Description                                                        |
+        | -------------------- | ------------------------------------------------------------------ |
+        | `shard.00000.bin`    | Append-only container file with the bytes of multiple samples.     |
+        | `index.json`         | Offset index mapping each sample to its shard, offset and length.  |
+
+    ???+ info "Shard modes"
+        | Mode                | Description                                                   |
+        | ------------------- | ------------------------------------------------------------- |
+        | `"encoded"`         | Stores the original file bytes (2D images and `.npy` files). |
+        | `"raw"`             | Stores the arrays loaded via the `loader` (e.g. resampled 3D volumes via the [sitk_loader()][aucmedi.data_processing.io_loader.sitk_loader]). |
+
+    ???+ example
+        ```python
+        from aucmedi import *
+        from aucmedi.data_processing.io_shards import build_shards
+        from aucmedi.data_processing.io_loader import sitk_loader
+
+        ds = input_interface(interface="directory", path_imagedir="dataset/",
+                             training=True)
+        (samples, class_ohe, nclasses, class_names, image_format) = ds
+
+        # Pack original image files
+        build_shards(samples, "dataset/", "dataset.shards/",
+                     image_format=image_format)
+
+        # Pack resampled volumes as raw arrays
+        build_shards(samples, "dataset/", "dataset.shards/",
+                     image_format=image_format, mode="raw",
+                     loader=sitk_loader, resampling=(1.0, 1.0, 1.0))
+        ```
+
+    Args:
+        samples (list of str):      List of sample names/indices.
+        path_imagedir (str):        Path to the directory containing the images.
+        path_shards (str):          Path to the output directory for the shards and the offset index.
+        image_format (str):         Image format to add at the end of the sample index for image loading.
+        mode (str):                 Shard mode (`"encoded"` or `"raw"`).
+        loader (function):          IO_loader function for loading the arrays in mode `"raw"`.
+        shard_size (int):           Size in bytes after which a new shard is started.
+        **kwargs (dict):            Additional parameters for the sample loader (mode `"raw"`).
+
+    Returns:
+        index (dict):               Offset index of the shard directory.
+    """
+    # Verify mode
+    if mode not in ["encoded", "raw"]:
+        raise ValueError("Unknown mode for build_shards:", mode,
+                         "Possible modes are: ['encoded', 'raw']")
+    # Load existing index or initialize a new one
+    if not os.path.exists(path_shards) : os.makedirs(path_shards)
+    index = read_shard_index(path_shards)
+    if index is None : index = {"mode": mode, "shards": [], "samples": {}}
+    elif index["mode"] != mode:
+        raise ValueError("Existing shards have a different mode:",
+                         index["mode"])
+    # Verify that raw arrays of existing shards were loaded identically
+    if mode == "raw":
+        config = fingerprint(loader, image_format, kwargs)
+        if index.setdefault("loader", config) != config:
+            raise ValueError("Existing shards were built with a different " + \
+                             "loader or loader parameters:", path_shards)
+    # Open last shard for appending
+    shard_fd = None
+    if len(index["shards"]) > 0:
+        shard_fd = open(os.path.join(path_shards, index["shards"][-1]), "ab")
+    try:
+        # Append each missing sample
+        for sample in samples:
+            if sample in index["samples"] : continue
+            # Start a new shard if required
+            if shard_fd is None or shard_fd.tell() >= shard_size:
+                if shard_fd is not None : shard_fd.close()
+                shard_name = "shard." + str(len(index["shards"])).zfill(5) + \
+                             ".bin"
+                index["shards"].append(shard_name)
+                shard_fd = open(os.path.join(path_shards, shard_name), "ab")
+            # Obtain bytes of sample
+            if image_format : img_file = sample + "." + image_format
+            else : img_file = sample
+            if mode == "encoded":
+                with open(os.path.join(path_imagedir, img_file), "rb") as fd:
+                    data = fd.read()
+                entry = {"ext": os.path.splitext(img_file)[1].lower()}
+            else:
+                img = np.ascontiguousarray(loader(sample, path_imagedir,
+                                                  image_format=image_format,
+                                                  **kwargs))
+                data = img.tobytes()
+                entry = {"dtype": img.dtype.str, "shape": list(img.shape)}
+                # Align raw arrays for memory-mapped access
+                padding = -shard_fd.tell() % 64
+                shard_fd.write(b"\0" * padding)
+            # Append sample to shard
+            entry["shard"] = len(index["shards"]) - 1
+            entry["offset"] = shard_fd.tell()
+            entry["length"] = len(data)
+            shard_fd.write(data)
+            index["samples"][sample] = entry
+    finally:
+        # Persist shards before the index referencing them
+        if shard_fd is not None:
+            shard_fd.flush()
+            os.fsync(shard_fd.fileno())
+            shard_fd.close()
+        path_index = os.path.join(path_shards, SHARD_INDEX)
+        with open(path_index + ".tmp", "w") as fd:
+            json.dump(index, fd)
+        os.replace(path_index + ".tmp", path_index)
+    # Return offset index
+    return index
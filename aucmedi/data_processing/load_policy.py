@@ -0,0 +1,288 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from multiprocessing.pool import ThreadPool
+from collections import deque
+import threading
+import queue
+import time
+import os
+from scipy import sparse
+import numpy as np
+
+#-----------------------------------------------------#
+#          Load Policy for Straggling Samples         #
+#-----------------------------------------------------#
+class LoadPolicy:
+    """ A policy for loading samples from slow storage with hedged reads and per-sample deadlines,
+        which can be passed to the `load_policy` parameter of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    On shared file systems, a few samples per epoch can take seconds to load. As the samples of a batch
+    are loaded together, a single straggler stalls the complete batch.
+
+    The LoadPolicy runs the IO_loader function in its own thread pool and records the latency of each load.
+    If a load exceeds the `hedge_percentile` of the recent latencies, a duplicate read is issued and the first
+    finished read is used. If a load exceeds the `timeout` deadline, the `fallback` policy is applied:
+
+    | Fallback       | Description                                                                     |
+    | -------------- | ------------------------------------------------------------------------------- |
+    | `"retry"`      | Load the sample again (up to `retries` times) before failing.                    |
+    | `"substitute"` | Use another sample with identical labels (requires labels in the DataGenerator). |
+    | `"fail"`       | Raise a `TimeoutError`.                                                          |
+
+    The occurrence of stragglers, hedged reads, timeouts, retries and substitutions is counted
+    and can be obtained via `statistics()`.
+
+    ???+ warning
+        Python threads cannot be cancelled. A timed out read occupies an I/O thread until it returns.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.load_policy import LoadPolicy
+
+        # Hedge reads slower than the 95th latency percentile and substitute samples after 5 seconds
+        policy = LoadPolicy(timeout=5.0, hedge_percentile=95, fallback="substitute")
+
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), workers=8, load_policy=policy)
+
+        # Run training and check straggler statistics
+        model.train(datagen, epochs=10)
+        print(policy.statistics())
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, timeout=None, hedge_percentile=95, hedge_min_samples=32,
+                 fallback="retry", retries=1, workers=4, history=1024):
+        """ Initialization function for creating a LoadPolicy.
+
+        Args:
+            timeout (float):            Deadline for loading a sample in seconds. If `None`, loads do not time out.
+            hedge_percentile (float):   Latency percentile after which a duplicate read is issued.
+                                        If `None`, no hedged reads are performed.
+            hedge_min_samples (int):    Number of recorded latencies required before hedged reads are issued.
+            fallback (str):             Policy for timed out samples. Options: `"retry"`, `"substitute"`, `"fail"`.
+            retries (int):              Number of additional attempts for the `"retry"` fallback.
+            workers (int):              Number of I/O threads.
+            history (int):              Number of recent latencies on which the hedging percentile is computed.
+        """
+        # Verify parameters
+        if fallback not in ["retry", "substitute", "fail"]:
+            raise ValueError("Unknown fallback policy for LoadPolicy:", fallback)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("LoadPolicy requires a positive timeout:", timeout)
+        if workers < 1:
+            raise ValueError("LoadPolicy requires at least one worker:", workers)
+        # Cache class variables
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.fallback = fallback
+        self.retries = retries
+        self.workers = workers
+        self.history = history
+        self.__init_state__()
+
+    #---------------------------------------------#
+    #                 Sample Loading              #
+    #---------------------------------------------#
+    def load(self, loader, *args, **kwargs):
+        """ Load a sample with hedged reads under the deadline of the policy.
+
+        Args:
+            loader (io_loader function):    Function for loading samples/images from disk.
+            *args, **kwargs:                Parameters passed to the IO_loader function.
+
+        Returns:
+            image (numpy.ndarray):          Loaded image.
+
+        Raises:
+            TimeoutError:                   If all attempts exceeded the deadline.
+        """
+        if self.pid != os.getpid() : self.__init_state__()
+        if self.fallback == "retry" : attempts = 1 + self.retries
+        else : attempts = 1
+        for attempt in range(0, attempts):
+            if attempt > 0 : self._count("retries")
+            finished, img = self._attempt(loader, args, kwargs)
+            if finished : return img
+            self._count("timeouts")
+        raise TimeoutError("Loading of sample exceeded the deadline of " + \
+                           "the LoadPolicy:", self.timeout, args[:1])
+
+    def substitute(self, index, labels):
+        """ Select another sample with identical labels for a timed out sample.
+
+        Args:
+            index (int):                    Index of the timed out sample.
+            labels (numpy.ndarray):         Classification list with One-Hot Encoding of the DataGenerator.
+
+        Returns:
+            index (int):                    Index of the substitute or `None` if no substitute is available.
+        """
+        if self.fallback != "substitute" or labels is None : return None
+        # Identify samples with an identical label set in sparse annotations
+        if sparse.issparse(labels):
+            labels = sparse.csr_matrix(labels, dtype=bool).astype(np.int32)
+            target = labels[index]
+            overlap = (labels @ target.T).toarray().ravel()
+            candidates = np.flatnonzero((overlap == target.nnz) & \
+                                        (labels.getnnz(axis=1) == target.nnz))
+        # Identify samples with identical labels
+        else:
+            labels = labels.reshape(len(labels), -1)
+            candidates = np.flatnonzero((labels == labels[index]).all(axis=1))
+        candidates = candidates[candidates != index]
+        if len(candidates) == 0 : return None
+        self._count("substitutions")
+        return int(np.random.choice(candidates))
+
+    def threshold(self):
+        """ Compute the current latency threshold for hedged reads.
+
+        Returns:
+            threshold (float):              Latency in seconds or `None` if hedging is not active (yet).
+        """
+        if self.hedge_percentile is None : return None
+        with self.lock:
+            if len(self.latencies) < max(self.hedge_min_samples, 1):
+                return None
+            latencies = np.asarray(self.latencies)
+        return float(np.percentile(latencies, self.hedge_percentile))
+
+    def statistics(self):
+        """ Obtain the straggler counters of the policy.
+
+        Returns:
+            stats (dict):                   Dictionary with the keys `"loads"`, `"stragglers"`, `"hedges"`, `"hedge_wins"`,
+                                            `"timeouts"`, `"retries"`, `"substitutions"` and `"threshold"` (in seconds).
+        """
+        threshold = self.threshold()
+        with self.lock:
+            stats = dict(self.counters)
+        stats["threshold"] = threshold
+        return stats
+
+    def close(self):
+        """ Stop the I/O threads of the policy. """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Internal function for (re)initializing the I/O threads, latencies and counters.
+
+    The I/O threads are bound to the process which created them.
+    """
+    def __init_state__(self):
+        self.pool = None
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=self.history)
+        self.counters = {"loads": 0, "stragglers": 0, "hedges": 0,
+                         "hedge_wins": 0, "timeouts": 0, "retries": 0,
+                         "substitutions": 0}
+
+    """ Internal function for incrementing a counter. """
+    def _count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    """ Internal function for a single load attempt with an optional hedged read.
+
+    Returns a tuple (finished, image). Errors of the IO_loader are raised if all reads failed.
+    """
+    def _attempt(self, loader, args, kwargs):
+        with self.lock:
+            if self.pool is None : self.pool = ThreadPool(self.workers)
+            self.counters["loads"] += 1
+        # Finished reads pass their position to the queue
+        finished = queue.Queue()
+        reads = []
+        def submit():
+            notify = lambda _, i=len(reads): finished.put(i)
+            reads.append(self.pool.apply_async(loader, args, kwargs,
+                                               callback=notify,
+                                               error_callback=notify))
+        # Issue primary read
+        start = time.perf_counter()
+        submit()
+        failed = 0
+        threshold = self.threshold()
+        hedged = threshold is None
+        while True:
+            # Wait until a read finishes, the hedging threshold or the deadline is reached
+            elapsed = time.perf_counter() - start
+            waits = []
+            if not hedged : waits.append(threshold - elapsed)
+            if self.timeout is not None : waits.append(self.timeout - elapsed)
+            try : i = finished.get(timeout=max(min(waits), 0) if waits else None)
+            except queue.Empty : i = None
+            if i is not None:
+                # Callbacks run before the result is marked as ready
+                reads[i].wait()
+                # Return first successful read
+                if reads[i].successful():
+                    self._record(time.perf_counter() - start)
+                    if i > 0 : self._count("hedge_wins")
+                    return True, reads[i].get()
+                # Raise error of the IO_loader if all reads failed
+                failed += 1
+                if failed == len(reads) : reads[i].get()
+            # Stop attempt if deadline is exceeded
+            elapsed = time.perf_counter() - start
+            if self.timeout is not None and elapsed >= self.timeout:
+                if threshold is None or not hedged : self._count("stragglers")
+                return False, None
+            # Issue hedged read if latency exceeds the threshold
+            if not hedged and elapsed >= threshold:
+                reads.append(submit())
+                hedged = True
+                with self.lock:
+                    self.counters["stragglers"] += 1
+                    self.counters["hedges"] += 1
+
+    """ Internal function for recording the latency of a successful load. """
+    def _record(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+
+    """ Pickling support: Only the configuration is transferred and other processes start without recorded latencies. """
+    def __getstate__(self):
+        return {"timeout": self.timeout,
+                "hedge_percentile": self.hedge_percentile,
+                "hedge_min_samples": self.hedge_min_samples,
+                "fallback": self.fallback, "retries": self.retries,
+                "workers": self.workers, "history": self.history}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    """ Clean shutdown of the I/O threads on garbage collection (skipped at interpreter shutdown). """
+    def __del__(self):
+        if getattr(self, "pid", None) != os.getpid() : return
+        try : self.close()
+        except Exception : pass
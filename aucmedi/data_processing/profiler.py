@@ -0,0 +1,149 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+import pandas as pd
+import threading
+
+#-----------------------------------------------------#
+#               Data Processing Profiler              #
+#-----------------------------------------------------#
+class Profiler:
+    """ A Profiler for recording the runtime of each preprocessing stage of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    For each stage, the wall time, the number of calls and the bytes of the produced output are aggregated.
+    The Profiler is thread-safe and, thus, aggregates the stages of all worker threads.
+
+    ???+ info "Recorded Stages"
+        | Stage                         | Description                                                       |
+        | ----------------------------- | ----------------------------------------------------------------- |
+        | `"read_ahead"`                | Waiting for the raw file fetched by the ReadAhead.                |
+        | `"loader"`                    | Image loading via the IO_loader function.                         |
+        | `"subfunction.<Name>"`        | Each Subfunction (e.g. `"subfunction.Padding"`).                  |
+        | `"resize"`                    | Resizing via the integrated Resize Subfunction.                   |
+        | `"augmentation"`              | Data augmentation.                                                |
+        | `"augmentation_batch"`        | Vectorized data augmentation of a complete batch (batch mode).    |
+        | `"standardize"`               | Standardization via the integrated Standardize Subfunction.       |
+        | `"prepared_read"`             | Reading a beforehand prepared image.                              |
+        | `"memory_cache"`              | Lookup in the MemoryCache.                                        |
+        | `"disk_cache"`                | Lookup in the DiskCache.                                          |
+        | `"batch_assembly"`            | Writing preprocessed samples into the batch.                      |
+        | `"batch"`                     | Complete generation of a batch.                                   |
+
+    ???+ warning
+        Stages executed in worker processes (`multiprocessing=True`) are not recorded.
+
+    ???+ example
+        ```python
+        # Activate profiling in the DataGenerator
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), profiling=True)
+
+        # Run training with logging of the stage runtimes after each epoch
+        from aucmedi.utils.callbacks import ProfilerLogger
+        model.train(datagen, epochs=10, callbacks=[ProfilerLogger(datagen.profiler)])
+
+        # Obtain summary of the complete training
+        print(datagen.profiler.to_dataframe())
+        ```
+    """
+    def __init__(self):
+        """ Initialization function for creating an empty Profiler. """
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    #---------------------------------------------#
+    #                  Recording                  #
+    #---------------------------------------------#
+    def record(self, stage, seconds, output=None):
+        """ Record a single call of a stage.
+
+        Args:
+            stage (str):                Name of the stage.
+            seconds (float):            Wall time of the call in seconds.
+            output (numpy.ndarray):     Output of the call for computing the produced bytes.
+                                        Lists and tuples of NumPy arrays are supported, as well.
+        """
+        nbytes = __nbytes__(output)
+        with self.lock:
+            if stage not in self.stages : self.stages[stage] = [0.0, 0, 0]
+            entry = self.stages[stage]
+            entry[0] += seconds
+            entry[1] += 1
+            entry[2] += nbytes
+
+    def reset(self):
+        """ Remove all recorded stages. """
+        with self.lock:
+            self.stages = {}
+
+    #---------------------------------------------#
+    #                   Summary                   #
+    #---------------------------------------------#
+    def summary(self):
+        """ Obtain a summary of all recorded stages.
+
+        Returns:
+            summary (dict):             Dictionary with the stage names as keys and a dictionary with the keys
+                                        `"time"` (in seconds), `"calls"` and `"bytes"` as values.
+        """
+        with self.lock:
+            return {stage: {"time": entry[0], "calls": entry[1],
+                            "bytes": entry[2]} \
+                    for stage, entry in self.stages.items()}
+
+    def to_dataframe(self):
+        """ Obtain a summary of all recorded stages as pandas DataFrame.
+
+        Additionally to the summary, the mean time per call (`"time_per_call"`) is computed.
+
+        Returns:
+            summary (pandas.DataFrame):  DataFrame with one row per stage sorted by the total wall time.
+        """
+        df = pd.DataFrame.from_dict(self.summary(), orient="index",
+                                    columns=["time", "calls", "bytes"])
+        df.index.name = "stage"
+        df["time_per_call"] = df["time"] / np.maximum(df["calls"], 1)
+        return df.sort_values("time", ascending=False)
+
+    #---------------------------------------------#
+    #              Internal Functions             #
+    #---------------------------------------------#
+    """ Pickling support: The lock is not transferred to other processes. """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for computing the bytes of a stage output
+def __nbytes__(output):
+    if isinstance(output, np.ndarray) : return output.nbytes
+    elif isinstance(output, (list, tuple)):
+        return sum(__nbytes__(o) for o in output)
+    else : return 0
@@ -0,0 +1,243 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+from collections.abc import Sequence
+import numpy as np
+
+#-----------------------------------------------------#
+#                Compact Sample Table                 #
+#-----------------------------------------------------#
+class SampleTable(Sequence):
+    """ A compact and immutable table of sample indices, which can be passed as `samples` to the
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator], the sampling functions
+        and the ensemble classes instead of a list of strings.
+
+    The sample indices are stored in a single contiguous UTF-8 buffer with an offset array.
+    Compared to a list of strings, this avoids the object overhead of each string, which
+    accumulates for multi-million sample datasets with every copy of the list.
+
+    Slicing and indexing with an index array or a boolean mask return views sharing the same buffer
+    (zero-copy). Accessing a single element returns the sample index as string.
+    For pickling (e.g. for worker processes or ensemble processes), only the referenced bytes are transferred.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.sample_table import SampleTable
+
+        # Obtain sample indices directly as SampleTable
+        ds = input_interface(interface="csv", path_imagedir="dataset/images/",
+                             path_data="dataset/annotations.csv", ohe=False,
+                             sample_table=True)
+        (samples, class_ohe, nclasses, class_names, image_format) = ds
+
+        # Or convert a list of sample indices
+        samples = SampleTable(["sample_a", "sample_b", "sample_c"])
+
+        # Zero-copy views
+        subset = samples[:100]
+        subset = samples[np.array([4, 2, 0])]
+        print(samples[0])       # -> "sample_a"
+
+        # Pass SampleTable to the DataGenerator
+        datagen = DataGenerator(subset, "images_dir/", labels=class_ohe[:100])
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, samples):
+        """ Initialization function for creating a SampleTable from a list of sample indices.
+
+        Args:
+            samples (list of str):      List of sample/index encoded as Strings or another SampleTable.
+        """
+        # Share buffer of another SampleTable
+        if isinstance(samples, SampleTable):
+            self.buffer = samples.buffer
+            self.offsets = samples.offsets
+            self.index = samples.index
+            return
+        # Encode sample indices into a single buffer
+        encoded = [str(sample).encode("utf-8") for sample in samples]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64,
+                              count=len(encoded))
+        self.buffer = b"".join(encoded)
+        self.offsets = __offsets__(lengths, len(self.buffer))
+        self.index = None
+
+    """ Internal function for creating a view on a buffer.
+
+    A sample at position i of the view is located in the buffer between `offsets[p]` and `offsets[p+1]`
+    with p = `index[i]` (or p = i, if the index is `None`).
+    """
+    @classmethod
+    def _from_buffer(cls, buffer, offsets, index=None):
+        table = cls.__new__(cls)
+        table.buffer = buffer
+        table.offsets = offsets
+        table.index = index
+        if offsets.flags.writeable : offsets.flags.writeable = False
+        if index is not None and index.flags.writeable:
+            index.flags.writeable = False
+        return table
+
+    #---------------------------------------------#
+    #                Sequence Access              #
+    #---------------------------------------------#
+    def __len__(self):
+        if self.index is not None : return len(self.index)
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        # Obtain a single sample index as string
+        if isinstance(key, (int, np.integer)):
+            n = len(self)
+            if key < 0 : key += n
+            if key < 0 or key >= n:
+                raise IndexError("SampleTable index out of range", key, n)
+            if self.index is not None : key = self.index[key]
+            start, end = self.offsets[key], self.offsets[key+1]
+            return self.buffer[start:end].decode("utf-8")
+        # Create a view for a slice
+        if isinstance(key, slice):
+            if self.index is not None:
+                return self._from_buffer(self.buffer, self.offsets,
+                                         self.index[key])
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                stop = max(start, stop)
+                return self._from_buffer(self.buffer,
+                                         self.offsets[start:stop+1])
+            return self._from_buffer(self.buffer, self.offsets,
+                                     np.arange(start, stop, step))
+        # Create a view for an index array or boolean mask
+        key = np.asarray(key)
+        if key.dtype == bool:
+            if key.shape != (len(self),):
+                raise IndexError("Boolean mask does not match SampleTable " + \
+                                 "size", key.shape, len(self))
+            key = np.flatnonzero(key)
+        elif key.size == 0 : key = key.astype(np.int64)
+        elif not np.issubdtype(key.dtype, np.integer):
+            raise IndexError("SampleTable can only be indexed by integers, " + \
+                             "slices, index arrays or boolean masks", key.dtype)
+        if self.index is not None : index = self.index[key]
+        else:
+            n = len(self)
+            index = np.where(key < 0, key + n, key).astype(np.int64)
+            if index.size > 0 and (index.min() < 0 or index.max() >= n):
+                raise IndexError("SampleTable index out of range", n)
+        return self._from_buffer(self.buffer, self.offsets, index)
+
+    def __iter__(self):
+        buffer = self.buffer
+        # Obtain start and end of each sample in the buffer
+        if self.index is None:
+            offsets = self.offsets.tolist()
+            bounds = zip(offsets[:-1], offsets[1:])
+        else:
+            bounds = zip(self.offsets[self.index].tolist(),
+                         self.offsets[self.index + 1].tolist())
+        for start, end in bounds:
+            yield buffer[start:end].decode("utf-8")
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.tolist(), dtype=dtype)
+
+    def __repr__(self):
+        return "SampleTable(" + str(len(self)) + " samples)"
+
+    #---------------------------------------------#
+    #                   Pickling                  #
+    #---------------------------------------------#
+    def __reduce__(self):
+        # Transfer only the referenced bytes of a view
+        table = self.compact()
+        return (SampleTable._from_buffer, (table.buffer, table.offsets,
+                                           table.index))
+
+    #---------------------------------------------#
+    #                   Utilities                 #
+    #---------------------------------------------#
+    def tolist(self):
+        """ Obtain the sample indices as list of strings.
+
+        Returns:
+            samples (list of str):      List of sample/index encoded as Strings.
+        """
+        return list(self)
+
+    def repeat(self, repeats):
+        """ Create a view in which each sample index is repeated (like `np.repeat`).
+
+        Args:
+            repeats (int):              Number of repetitions for each sample.
+
+        Returns:
+            table (SampleTable):        View on the repeated sample indices.
+        """
+        if self.index is not None : positions = self.index
+        else : positions = np.arange(len(self))
+        return self._from_buffer(self.buffer, self.offsets,
+                                 np.repeat(positions, repeats))
+
+    def compact(self):
+        """ Create a SampleTable which only contains the bytes referenced by this view.
+
+        If the view already references less bytes than a compacted copy would require
+        (e.g. for repeated samples), the view itself is returned.
+
+        Returns:
+            table (SampleTable):        SampleTable with a contiguous buffer.
+        """
+        # Contiguous views only need a slice of the buffer
+        if self.index is None:
+            start, end = self.offsets[0], self.offsets[-1]
+            if start == 0 and end == len(self.buffer) : return self
+            return self._from_buffer(self.buffer[start:end],
+                                     self.offsets - start)
+        # Gather referenced samples of the buffer
+        starts = self.offsets[self.index]
+        ends = self.offsets[self.index + 1]
+        lengths = ends - starts
+        if lengths.sum() >= len(self.buffer) : return self
+        buffer = b"".join([self.buffer[s:e] for s, e in zip(starts.tolist(),
+                                                            ends.tolist())])
+        offsets = __offsets__(lengths, len(buffer))
+        return self._from_buffer(buffer, offsets)
+
+    @property
+    def nbytes(self):
+        """ Memory in bytes, which is occupied by the buffer, the offsets and the index of the SampleTable. """
+        nbytes = len(self.buffer) + self.offsets.nbytes
+        if self.index is not None : nbytes += self.index.nbytes
+        return nbytes
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for computing read-only offsets with the smallest sufficient dtype
+def __offsets__(lengths, size):
+    dtype = np.int32 if size < 2**31 else np.int64
+    offsets = np.zeros(len(lengths) + 1, dtype=dtype)
+    np.cumsum(lengths, out=offsets[1:])
+    offsets.flags.writeable = False
+    return offsets
@@ -0,0 +1,144 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+# Internal libraries
+from aucmedi.data_processing.io_loader.shard_loader import read_shard_index
+
+#-----------------------------------------------------#
+#             Locality-aware Block Shuffle            #
+#-----------------------------------------------------#
+class BlockShuffle:
+    """ A locality-aware shuffling strategy, which can be passed to the `shuffle` parameter of a
+        [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+    A global shuffle reads samples in random order, which destroys the read locality of
+    large packed files (e.g. [shards][aucmedi.data_processing.io_loader.shard_loader] or memory-mapped arrays)
+    on spinning disks or network storage.
+
+    The BlockShuffle orders the samples by their storage location and splits them into blocks
+    of consecutive samples. For each epoch, the order of the blocks is shuffled and the resulting
+    sample stream is shuffled within a bounded buffer (like `tf.data.Dataset.shuffle`).
+    Thus, reads are mostly sequential within a window of `buffer_size` samples,
+    while the statistical quality stays close to a global shuffle.
+
+    The randomness is drawn from the NumPy random state and, thus, reproducible via the
+    `seed` parameter of the DataGenerator.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.shuffling import BlockShuffle
+
+        # Samples are stored in sample list order (e.g. memory-mapped arrays)
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                shuffle=BlockShuffle(block_size=64, buffer_size=512),
+                                seed=0)
+
+        # Samples are stored in shards
+        shuffle = BlockShuffle.from_shards(samples, "dataset/shards/")
+        datagen = DataGenerator(samples, "dataset/shards/", labels=class_ohe,
+                                loader=shard_loader, shuffle=shuffle)
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, block_size=64, buffer_size=1024, locality=None):
+        """ Initialization function for creating a BlockShuffle.
+
+        Args:
+            block_size (int):               Number of consecutively stored samples in a block.
+            buffer_size (int):              Number of samples in the shuffle buffer.
+            locality (list of float):       Storage location of each sample, by which the samples are ordered.
+                                            If `None`, samples are stored in sample list order.
+        """
+        # Verify parameters
+        if block_size < 1 or buffer_size < 1:
+            raise ValueError("BlockShuffle requires a positive block_size " + \
+                             "and buffer_size:", block_size, buffer_size)
+        # Cache class variables
+        self.block_size = int(block_size)
+        self.buffer_size = int(buffer_size)
+        # Identify storage order of the samples
+        if locality is None : self.order = None
+        else : self.order = np.argsort(np.asarray(locality), kind="stable")
+
+    @classmethod
+    def from_shards(cls, samples, path_shards, block_size=64,
+                    buffer_size=1024):
+        """ Create a BlockShuffle based on the storage location of the samples in shards.
+
+        Args:
+            samples (list of str):          List of sample names/indices of the DataGenerator.
+            path_shards (str):              Path to the directory containing the shards.
+            block_size (int):               Number of consecutively stored samples in a block.
+            buffer_size (int):              Number of samples in the shuffle buffer.
+
+        Returns:
+            shuffle (BlockShuffle):         BlockShuffle with the shard locality of the samples.
+        """
+        index = read_shard_index(path_shards)
+        if index is None : raise FileNotFoundError(path_shards)
+        # Order samples by shard and offset
+        entries = [index["samples"][s] for s in samples]
+        locality = [(e["shard"], e["offset"]) for e in entries]
+        rank = {loc: i for i, loc in enumerate(sorted(locality))}
+        return cls(block_size=block_size, buffer_size=buffer_size,
+                   locality=[rank[loc] for loc in locality])
+
+    #---------------------------------------------#
+    #                 Permutation                 #
+    #---------------------------------------------#
+    def permutation(self, n, random_state=None):
+        """ Compute the sample order for an epoch.
+
+        Args:
+            n (int):                        Number of samples.
+            random_state (RandomState):     NumPy random state. If `None`, the global NumPy random state is used.
+
+        Returns:
+            index_array (numpy.ndarray):    Permutation of the sample indices.
+        """
+        if random_state is None : random_state = np.random
+        # Obtain storage order of the samples
+        if self.order is None : order = np.arange(n)
+        elif len(self.order) != n:
+            raise ValueError("Locality of BlockShuffle does not match " + \
+                             "the number of samples:", len(self.order), n)
+        else : order = self.order
+        # Shuffle order of the blocks
+        n_blocks = (n + self.block_size - 1) // self.block_size
+        blocks = random_state.permutation(n_blocks)
+        stream = np.concatenate([order[b*self.block_size:(b+1)*self.block_size]
+                                 for b in blocks]) if n > 0 else order
+        # Shuffle stream within a bounded buffer
+        buffer_size = min(self.buffer_size, n)
+        draws = random_state.randint(0, max(buffer_size, 1),
+                                     size=n - buffer_size).tolist()
+        stream = stream.tolist()
+        buffer = stream[:buffer_size]
+        index_array = []
+        for i, j in enumerate(draws):
+            index_array.append(buffer[j])
+            buffer[j] = stream[buffer_size + i]
+        # Drain remaining buffer in random order
+        index_array.extend(random_state.permutation(buffer).tolist())
+        return np.asarray(index_array, dtype=np.int64)
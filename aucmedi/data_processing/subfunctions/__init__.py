@@ -55,6 +55,9 @@
                                   subfunctions=sf_list)            # Pass desired Subfunctions
         ```
 
+    Compatible Subfunctions (e.g. padding followed by center cropping) can be fused into a single operation
+    by packing them into a [SubfunctionPipeline][aucmedi.data_processing.subfunctions.subfunction_pipeline].
+
     Subfunctions are based on the abstract base class [Subfunction_Base][aucmedi.data_processing.subfunctions.sf_base.Subfunction_Base],
     which allow simple integration of custom preprocessing methods.
 """
@@ -68,3 +71,4 @@ from aucmedi.data_processing.subfunctions.crop import Crop
 from aucmedi.data_processing.subfunctions.color_constancy import ColorConstancy
 from aucmedi.data_processing.subfunctions.clip import Clip
 from aucmedi.data_processing.subfunctions.chromer import Chromer
+from aucmedi.data_processing.subfunctions.subfunction_pipeline import SubfunctionPipeline
@@ -55,6 +55,8 @@ class Chromer(Subfunction_Base):
     Typical use case is converting a grayscale to RGB in order to utilize
     transfer learning weights based on ImageNet.
     """
+    shape_preserving = True
+
     #---------------------------------------------#
     #                Initialization               #
     #---------------------------------------------#
@@ -34,6 +34,8 @@ class Clip(Subfunction_Base):
     Typical use case is clipping Hounsfield Units (HU) in CT scans for focusing
     on tissue types of interest.
     """
+    shape_preserving = True
+
     #---------------------------------------------#
     #                Initialization               #
     #---------------------------------------------#
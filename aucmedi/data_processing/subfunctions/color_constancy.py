@@ -50,6 +50,8 @@ class ColorConstancy(Subfunction_Base):
         <br>
         https://ieeexplore.ieee.org/abstract/document/6866131
     """
+    shape_preserving = True
+
     #---------------------------------------------#
     #                Initialization               #
     #---------------------------------------------#
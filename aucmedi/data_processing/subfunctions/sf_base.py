@@ -53,7 +53,15 @@ class Subfunction_Base(ABC):
         | `__init__()`        | Object creation function.                  |
         | `transform()`       | Transform the image.                       |
 
+    ???+ info "Shape preservation"
+        Subfunctions which keep the spatial shape of the image (e.g. intensity transformations) should set the
+        class attribute `shape_preserving = True`. Only these Subfunctions can be combined with resizing in the
+        IO_loader (`loader_resize=True` of the [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator]).
+        By default, Subfunctions are assumed to change the spatial shape of the image (e.g. Crop or Padding).
+
     """
+    shape_preserving = False
+
     #---------------------------------------------#
     #                Initialization               #
     #---------------------------------------------#
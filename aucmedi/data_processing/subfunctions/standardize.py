@@ -54,6 +54,8 @@ class Standardize(Subfunction_Base):
 
         https://www.tensorflow.org/api_docs/python/tf/keras/applications/imagenet_utils/preprocess_input
     """
+    shape_preserving = True
+
     #---------------------------------------------#
     #                Initialization               #
     #---------------------------------------------#
@@ -107,6 +109,8 @@ class Standardize(Subfunction_Base):
                     "Ensure that all images are normalized to [0,255] before using the following modes:",
                     "['tf', 'caffe', 'torch']")
             # Perform architecture standardization
+            # Keras preprocess_input() modifies float images in-place
+            if not image.flags.writeable : image = image.copy()
             image_norm = imagenet_utils.preprocess_input(image, mode=self.mode)
         # Return standardized image
         return image_norm
@@ -0,0 +1,235 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import numpy as np
+# Internal libraries/scripts
+from aucmedi.data_processing.subfunctions.sf_base import Subfunction_Base
+from aucmedi.data_processing.subfunctions.padding import Padding
+from aucmedi.data_processing.subfunctions.crop import Crop
+from aucmedi.data_processing.subfunctions.clip import Clip
+from aucmedi.data_processing.subfunctions.standardize import Standardize
+
+#-----------------------------------------------------#
+#        Subfunction class: SubfunctionPipeline       #
+#-----------------------------------------------------#
+class SubfunctionPipeline(Subfunction_Base):
+    """ A Subfunction class which applies a list of Subfunctions and fuses compatible steps
+        in order to avoid the allocation of intermediate images.
+
+    The list of Subfunctions is analysed once during initialization. The output is numerically
+    identical to applying the Subfunctions one after another.
+
+    ???+ info "Fused steps"
+        | Subfunctions                          | Fused operation                                         |
+        | ------------------------------------- | ------------------------------------------------------- |
+        | `Padding` + `Crop(mode="center")`     | Single windowed copy (Padding modes `"square"`, `"edge"`, `"constant"`). |
+        | `Crop(mode="center")`                 | NumPy view of the center window.                        |
+        | `Clip` + `Standardize`                | One pass with in-place float operations (modes `"z-score"`, `"minmax"`, `"grayscale"`). |
+
+    All other Subfunctions (including random cropping) are applied unchanged.
+
+    ???+ example
+        ```python
+        from aucmedi.data_processing.subfunctions import *
+
+        # Pack Subfunctions into a fused pipeline
+        sf_pipeline = SubfunctionPipeline([Padding(mode="constant", shape=(64, 64, 64)),
+                                           Crop(shape=(64, 64, 64), mode="center"),
+                                           Clip(min=-1000, max=1000),
+                                           Standardize(mode="z-score")])
+
+        # Pass the pipeline to the DataGenerator
+        datagen = DataGenerator(samples=index_list,
+                                path_imagedir="my_images/",
+                                subfunctions=[sf_pipeline])
+        ```
+    """
+    #---------------------------------------------#
+    #                Initialization               #
+    #---------------------------------------------#
+    def __init__(self, subfunctions):
+        """ Initialization function for creating a SubfunctionPipeline which can be passed to a
+            [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+
+        Args:
+            subfunctions (list of Subfunction):     List of Subfunctions, which will be applied in provided list order.
+        """
+        self.subfunctions = list(subfunctions)
+        # Pipeline only keeps the spatial shape if all Subfunctions keep it
+        self.shape_preserving = all(getattr(sf, "shape_preserving", False) \
+                                    for sf in self.subfunctions)
+        # Analyse Subfunction chain and create execution plan
+        self.plan = []
+        i = 0
+        while i < len(self.subfunctions):
+            sf = self.subfunctions[i]
+            sf_next = self.subfunctions[i+1] if i+1 < len(self.subfunctions) \
+                      else None
+            # Fuse padding and center cropping into a windowed copy
+            if isinstance(sf, Padding) and self.__center_crop__(sf_next) and \
+                    sf.mode in ["square", "edge", "constant"]:
+                self.plan.append(("pad_crop", sf, sf_next))
+                i += 2
+            # Fuse clipping and standardization into a single in-place pass
+            elif isinstance(sf, Clip) and isinstance(sf_next, Standardize) \
+                    and sf_next.mode in ["z-score", "minmax", "grayscale"]:
+                self.plan.append(("clip_standardize", sf, sf_next))
+                i += 2
+            # Replace center cropping by a view
+            elif self.__center_crop__(sf):
+                self.plan.append(("crop", sf))
+                i += 1
+            # Apply all other Subfunctions unchanged
+            else:
+                self.plan.append(("transform", sf))
+                i += 1
+
+    #---------------------------------------------#
+    #                Transformation               #
+    #---------------------------------------------#
+    def transform(self, image):
+        # Execute plan step by step
+        for step in self.plan:
+            if step[0] == "pad_crop" : image = self.pad_crop(image, *step[1:])
+            elif step[0] == "clip_standardize":
+                image = self.clip_standardize(image, *step[1:])
+            elif step[0] == "crop" : image = self.crop(image, step[1])
+            else : image = step[1].transform(image)
+        # Return transformed image
+        return image
+
+    #---------------------------------------------#
+    #                Fused Operations             #
+    #---------------------------------------------#
+    def pad_crop(self, image, sf_pad, sf_crop):
+        """ Internal function for fused padding and center cropping.
+
+        Only the part of the padded image which remains after cropping is created.
+
+        Args:
+            image (numpy.ndarray):      Image encoded as NumPy matrix.
+            sf_pad (Padding):           Padding Subfunction.
+            sf_crop (Crop):             Crop Subfunction with center mode.
+
+        Returns:
+            image (numpy.ndarray):      Padded and cropped image.
+        """
+        shape = image.shape[:-1]
+        # Identify padded shape like Padding
+        if sf_pad.mode == "square" : padded = [max(shape)] * len(shape)
+        else : padded = [max(sf_pad.shape[i], shape[i]) \
+                         for i in range(0, len(shape))]
+        # Apply Subfunctions sequentially if crop does not fit (raises error)
+        if len(sf_crop.shape) != len(shape) or \
+                any(sf_crop.shape[i] > padded[i] for i in range(len(shape))):
+            return sf_crop.transform(sf_pad.transform(image))
+        # Compute window in padded and original image coordinates
+        slices = []
+        pad_width = []
+        for i in range(0, len(shape)):
+            pad_below = (padded[i] - shape[i]) // 2
+            start = (padded[i] - sf_crop.shape[i]) // 2
+            end = start + sf_crop.shape[i]
+            slices.append(slice(max(start - pad_below, 0),
+                                min(end - pad_below, shape[i])))
+            pad_width.append([max(pad_below - start, 0),
+                              max(end - pad_below - shape[i], 0)])
+        pad_width.append([0, 0])
+        # Pad only the window
+        pad_mode = "edge" if sf_pad.mode == "square" else sf_pad.mode
+        image_window = np.pad(image[tuple(slices)], pad_width, mode=pad_mode)
+        # Cast to float32 like volumentations for 3D cropping
+        if len(sf_crop.shape) == 3:
+            image_window = image_window.astype(np.float32, copy=False)
+        return image_window
+
+    def crop(self, image, sf_crop):
+        """ Internal function for center cropping via a NumPy view.
+
+        For 3D volumes, only the window is copied into a float32 array (like volumentations).
+
+        Args:
+            image (numpy.ndarray):      Image encoded as NumPy matrix.
+            sf_crop (Crop):             Crop Subfunction with center mode.
+
+        Returns:
+            image (numpy.ndarray):      View on the center window of the image.
+        """
+        shape = image.shape[:-1]
+        # Apply Subfunction if crop does not fit (raises error)
+        if len(sf_crop.shape) != len(shape) or \
+                any(sf_crop.shape[i] > shape[i] for i in range(len(shape))):
+            return sf_crop.transform(image)
+        # Compute center window
+        slices = []
+        for i in range(0, len(shape)):
+            start = (shape[i] - sf_crop.shape[i]) // 2
+            slices.append(slice(start, start + sf_crop.shape[i]))
+        # Cast to contiguous float32 copy like volumentations for 3D cropping
+        if len(sf_crop.shape) == 3:
+            return np.ascontiguousarray(image[tuple(slices)],
+                                        dtype=np.float32)
+        return image[tuple(slices)]
+
+    def clip_standardize(self, image, sf_clip, sf_std):
+        """ Internal function for fused clipping and standardization.
+
+        The clipped image is standardized in-place instead of allocating an array for each operation.
+
+        Args:
+            image (numpy.ndarray):      Image encoded as NumPy matrix.
+            sf_clip (Clip):             Clip Subfunction.
+            sf_std (Standardize):       Standardize Subfunction (modes: z-score, minmax, grayscale).
+
+        Returns:
+            image (numpy.ndarray):      Clipped and standardized image.
+        """
+        # Perform clipping
+        img = np.clip(image, a_min=sf_clip.min, a_max=sf_clip.max)
+        # Compute statistics and shift/scale factors like Standardize
+        if sf_std.mode == "z-score":
+            shift = np.mean(img)
+            scale = np.std(img) + sf_std.e
+        else:
+            max_value = np.max(img)
+            shift = np.min(img)
+            scale = max_value - shift + sf_std.e
+        # Obtain floating output array (clipped array is reused if possible)
+        dtype = np.result_type(img, shift, sf_std.e)
+        if img.dtype != dtype : img = img.astype(dtype)
+        # Perform scaling in-place
+        img -= shift
+        img += sf_std.e
+        img /= scale
+        if sf_std.mode == "grayscale":
+            img *= 255
+            np.around(img, decimals=0, out=img)
+        # Return standardized image
+        return img
+
+    #---------------------------------------------#
+    #                 Subroutines                 #
+    #---------------------------------------------#
+    # Internal function for identifying a center cropping Subfunction
+    def __center_crop__(self, sf):
+        if not isinstance(sf, Crop) : return False
+        return any(type(t).__name__ == "CenterCrop" \
+                   for t in sf.aug_transform.transforms)
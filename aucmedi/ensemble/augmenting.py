@@ -25,6 +25,7 @@ import numpy as np
 from aucmedi import ImageAugmentation, VolumeAugmentation, DataGenerator
 from aucmedi.ensemble.aggregate import aggregate_dict
 from aucmedi.data_processing.io_loader import image_loader
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #       Ensemble Learning: Inference Augmenting       #
@@ -67,7 +68,9 @@ def predict_augmenting(model, prediction_generator, n_cycles=10, aggregate="mean
 
     ???+ warning
         The passed DataGenerator will be re-initialized!
-        This can result in redundant image preparation if `prepare_images=True`.
+        If `prepare_images=True`, the memory-mapped PreparedStore of the passed DataGenerator is reused
+        (only without `resize`, this can result in redundant image preparation).
+        A [DiskCache][aucmedi.data_processing.io_cache.disk_cache.DiskCache] of the passed DataGenerator is shared with all re-initialized DataGenerators.
 
     ??? reference "Reference for Ensemble Learning Techniques"
         Dominik Müller, Iñaki Soto-Rey and Frank Kramer. (2022).
@@ -104,7 +107,9 @@ def predict_augmenting(model, prediction_generator, n_cycles=10, aggregate="mean
                                       elastic_transform=False)
     else : data_aug = prediction_generator.data_aug
     # Multiply sample list for prediction according to number of cycles
-    samples_aug = np.repeat(prediction_generator.samples, n_cycles)
+    if isinstance(prediction_generator.samples, SampleTable):
+        samples_aug = prediction_generator.samples.repeat(n_cycles)
+    else : samples_aug = np.repeat(prediction_generator.samples, n_cycles)
 
     # Re-initialize DataGenerator for inference
     aug_gen = DataGenerator(samples_aug,
@@ -120,6 +125,12 @@ def predict_augmenting(model, prediction_generator, n_cycles=10, aggregate="mean
                             resize=prediction_generator.resize,
                             grayscale=prediction_generator.grayscale,
                             prepare_images=prediction_generator.prepare_images,
+                            prepared_store=prediction_generator.prepared_store,
+                            disk_cache=prediction_generator.disk_cache,
+                            memory_cache=prediction_generator.memory_cache,
+                            loader_resize=prediction_generator.loader_resize,
+                            read_ahead=prediction_generator.read_ahead,
+                            load_policy=prediction_generator.load_policy,
                             sample_weights=None,
                             image_format=prediction_generator.image_format,
                             loader=prediction_generator.sample_loader,
@@ -77,7 +77,9 @@ class Bagging:
     ??? warning "DataGenerator re-initialization"
         The passed DataGenerator for the train() and predict() function of the Bagging class will be re-initialized!
 
-        This can result in redundant image preparation if `prepare_images=True`.
+        If `prepare_images=True`, the memory-mapped PreparedStore of the passed DataGenerator is reused
+        (only without `resize`, this can result in redundant image preparation).
+        A [DiskCache][aucmedi.data_processing.io_cache.disk_cache.DiskCache] of the passed DataGenerator is shared with all re-initialized DataGenerators.
 
     ??? warning "NeuralNetwork re-initialization"
         The passed NeuralNetwork for the train() and predict() function of the Composite class will be re-initialized!
@@ -200,6 +202,12 @@ class Bagging:
                              "resize": temp_dg.resize,
                              "grayscale": temp_dg.grayscale,
                              "prepare_images": temp_dg.prepare_images,
+                             "prepared_store": temp_dg.prepared_store,
+                             "disk_cache": temp_dg.disk_cache,
+                             "memory_cache": temp_dg.memory_cache,
+                             "loader_resize": temp_dg.loader_resize,
+                             "read_ahead": temp_dg.read_ahead,
+                             "load_policy": temp_dg.load_policy,
                              "sample_weights": temp_dg.sample_weights,
                              "image_format": temp_dg.image_format,
                              "loader": temp_dg.sample_loader,
@@ -291,6 +299,12 @@ class Bagging:
                          "resize": temp_dg.resize,
                          "grayscale": temp_dg.grayscale,
                          "prepare_images": temp_dg.prepare_images,
+                         "prepared_store": temp_dg.prepared_store,
+                         "disk_cache": temp_dg.disk_cache,
+                         "memory_cache": temp_dg.memory_cache,
+                         "loader_resize": temp_dg.loader_resize,
+                         "read_ahead": temp_dg.read_ahead,
+                         "load_policy": temp_dg.load_policy,
                          "sample_weights": temp_dg.sample_weights,
                          "image_format": temp_dg.image_format,
                          "loader": temp_dg.sample_loader,
@@ -414,6 +428,12 @@ def __training_process__(queue, model_paras, data, datagen_paras, train_paras):
                                  resize=datagen_paras["resize"],
                                  grayscale=datagen_paras["grayscale"],
                                  prepare_images=datagen_paras["prepare_images"],
+                                 prepared_store=datagen_paras["prepared_store"],
+                                 disk_cache=datagen_paras["disk_cache"],
+                                 memory_cache=datagen_paras["memory_cache"],
+                                 loader_resize=datagen_paras["loader_resize"],
+                                 read_ahead=datagen_paras["read_ahead"],
+                                 load_policy=datagen_paras["load_policy"],
                                  sample_weights=datagen_paras["sample_weights"],
                                  image_format=datagen_paras["image_format"],
                                  loader=datagen_paras["loader"],
@@ -433,6 +453,12 @@ def __training_process__(queue, model_paras, data, datagen_paras, train_paras):
                                resize=datagen_paras["resize"],
                                grayscale=datagen_paras["grayscale"],
                                prepare_images=datagen_paras["prepare_images"],
+                               prepared_store=datagen_paras["prepared_store"],
+                               disk_cache=datagen_paras["disk_cache"],
+                               memory_cache=datagen_paras["memory_cache"],
+                               loader_resize=datagen_paras["loader_resize"],
+                               read_ahead=datagen_paras["read_ahead"],
+                               load_policy=datagen_paras["load_policy"],
                                sample_weights=datagen_paras["sample_weights"],
                                image_format=datagen_paras["image_format"],
                                loader=datagen_paras["loader"],
@@ -461,6 +487,12 @@ def __prediction_process__(queue, model_paras, path_model, datagen_paras):
                                 resize=datagen_paras["resize"],
                                 grayscale=datagen_paras["grayscale"],
                                 prepare_images=datagen_paras["prepare_images"],
+                                prepared_store=datagen_paras["prepared_store"],
+                                disk_cache=datagen_paras["disk_cache"],
+                                memory_cache=datagen_paras["memory_cache"],
+                                loader_resize=datagen_paras["loader_resize"],
+                                read_ahead=datagen_paras["read_ahead"],
+                                load_policy=datagen_paras["load_policy"],
                                 sample_weights=datagen_paras["sample_weights"],
                                 image_format=datagen_paras["image_format"],
                                 loader=datagen_paras["loader"],
@@ -24,6 +24,7 @@ import os
 import tempfile
 from tensorflow.keras.callbacks import ModelCheckpoint, CSVLogger
 from pathos.helpers import mp   # instead of 'import multiprocessing as mp'
+from scipy import sparse
 import numpy as np
 import shutil
 # Internal libraries
@@ -33,6 +34,7 @@ from aucmedi.ensemble.aggregate import aggregate_dict
 from aucmedi.ensemble.metalearner import metalearner_dict
 from aucmedi.ensemble.metalearner.ml_base import Metalearner_Base
 from aucmedi.ensemble.aggregate.agg_base import Aggregate_Base
+from aucmedi.ensemble.preparation import __prepared_store__
 
 #-----------------------------------------------------#
 #            Ensemble Learning: Composite             #
@@ -82,7 +84,10 @@ class Composite:
     ??? warning "DataGenerator re-initialization"
         The passed DataGenerator for the train() and predict() function of the Composite class will be re-initialized!
 
-        This can result in redundant image preparation if `prepare_images=True`.
+        If `prepare_images=True`, the memory-mapped PreparedStore of the passed DataGenerator is reused
+        (only without `resize`, this can result in redundant image preparation).
+        For models with another input shape (`model.meta_input`), the images are prepared once for each input shape.
+        A [DiskCache][aucmedi.data_processing.io_cache.disk_cache.DiskCache] of the passed DataGenerator is shared with all re-initialized DataGenerators.
 
         Furthermore, the parameters `resize` and `standardize_mode` are automatically re-initialized with
         NeuralNetwork model specific values (`model.meta_standardize` for `standardize_mode` and
@@ -216,6 +221,7 @@ class Composite:
         }
 
         # Sequentially iterate over model list
+        prepared = {}                   # PreparedStores for each input shape
         for i in range(len(self.model_list)):
             # Pack data into a tuple
             fold = cv_sampling[i]
@@ -265,6 +271,14 @@ class Composite:
                              "resize": self.model_list[i].meta_input,
                              "grayscale": temp_dg.grayscale,
                              "prepare_images": temp_dg.prepare_images,
+                             "prepared_store": __prepared_store__(temp_dg,
+                                        self.model_list[i].meta_input,
+                                        prepared),
+                             "disk_cache": temp_dg.disk_cache,
+                             "memory_cache": temp_dg.memory_cache,
+                             "loader_resize": temp_dg.loader_resize,
+                             "read_ahead": temp_dg.read_ahead,
+                             "load_policy": temp_dg.load_policy,
                              "sample_weights": temp_dg.sample_weights,
                              "image_format": temp_dg.image_format,
                              "loader": temp_dg.sample_loader,
@@ -334,6 +348,7 @@ class Composite:
         else : path_model_dir = self.cache_dir
 
         # Sequentially iterate over model list
+        prepared = {}                   # PreparedStores for each input shape
         for i in range(len(self.model_list)):
             # Extend Callback list
             path_model = os.path.join(path_model_dir,
@@ -368,6 +383,14 @@ class Composite:
                              "resize": self.model_list[i].meta_input,
                              "grayscale": temp_dg.grayscale,
                              "prepare_images": temp_dg.prepare_images,
+                             "prepared_store": __prepared_store__(temp_dg,
+                                        self.model_list[i].meta_input,
+                                        prepared),
+                             "disk_cache": temp_dg.disk_cache,
+                             "memory_cache": temp_dg.memory_cache,
+                             "loader_resize": temp_dg.loader_resize,
+                             "read_ahead": temp_dg.read_ahead,
+                             "load_policy": temp_dg.load_policy,
                              "sample_weights": temp_dg.sample_weights,
                              "image_format": temp_dg.image_format,
                              "loader": temp_dg.sample_loader,
@@ -399,6 +422,7 @@ class Composite:
         # Start training of stacked metalearner
         if isinstance(self.ml_model, Metalearner_Base):
             (_, y_stack, _) = data_ensemble
+            if sparse.issparse(y_stack) : y_stack = y_stack.toarray()
             self.ml_model.train(x_stack, y_stack)
             # Store metalearner model to disk
             path_metalearner = os.path.join(path_model_dir,
@@ -449,6 +473,7 @@ class Composite:
         else : path_model_dir = self.cache_dir
 
         # Sequentially iterate over model list
+        prepared = {}                   # PreparedStores for each input shape
         for i in range(len(self.model_list)):
             path_model = os.path.join(path_model_dir,
                                       "cv_" + str(i) + ".model.hdf5")
@@ -482,6 +507,14 @@ class Composite:
                              "resize": self.model_list[i].meta_input,
                              "grayscale": temp_dg.grayscale,
                              "prepare_images": temp_dg.prepare_images,
+                             "prepared_store": __prepared_store__(temp_dg,
+                                        self.model_list[i].meta_input,
+                                        prepared),
+                             "disk_cache": temp_dg.disk_cache,
+                             "memory_cache": temp_dg.memory_cache,
+                             "loader_resize": temp_dg.loader_resize,
+                             "read_ahead": temp_dg.read_ahead,
+                             "load_policy": temp_dg.load_policy,
                              "sample_weights": temp_dg.sample_weights,
                              "image_format": temp_dg.image_format,
                              "loader": temp_dg.sample_loader,
@@ -598,6 +631,12 @@ def __training_process__(queue, data, model_paras, datagen_paras, train_paras):
                                  resize=datagen_paras["resize"],
                                  grayscale=datagen_paras["grayscale"],
                                  prepare_images=datagen_paras["prepare_images"],
+                                 prepared_store=datagen_paras["prepared_store"],
+                                 disk_cache=datagen_paras["disk_cache"],
+                                 memory_cache=datagen_paras["memory_cache"],
+                                 loader_resize=datagen_paras["loader_resize"],
+                                 read_ahead=datagen_paras["read_ahead"],
+                                 load_policy=datagen_paras["load_policy"],
                                  sample_weights=datagen_paras["sample_weights"],
                                  image_format=datagen_paras["image_format"],
                                  loader=datagen_paras["loader"],
@@ -617,6 +656,12 @@ def __training_process__(queue, data, model_paras, datagen_paras, train_paras):
                                resize=datagen_paras["resize"],
                                grayscale=datagen_paras["grayscale"],
                                prepare_images=datagen_paras["prepare_images"],
+                               prepared_store=datagen_paras["prepared_store"],
+                               disk_cache=datagen_paras["disk_cache"],
+                               memory_cache=datagen_paras["memory_cache"],
+                               loader_resize=datagen_paras["loader_resize"],
+                               read_ahead=datagen_paras["read_ahead"],
+                               load_policy=datagen_paras["load_policy"],
                                sample_weights=datagen_paras["sample_weights"],
                                image_format=datagen_paras["image_format"],
                                loader=datagen_paras["loader"],
@@ -648,6 +693,12 @@ def __prediction_process__(queue, model_paras, path_model, data_test,
                                 resize=datagen_paras["resize"],
                                 grayscale=datagen_paras["grayscale"],
                                 prepare_images=datagen_paras["prepare_images"],
+                                prepared_store=datagen_paras["prepared_store"],
+                                disk_cache=datagen_paras["disk_cache"],
+                                memory_cache=datagen_paras["memory_cache"],
+                                loader_resize=datagen_paras["loader_resize"],
+                                read_ahead=datagen_paras["read_ahead"],
+                                load_policy=datagen_paras["load_policy"],
                                 sample_weights=datagen_paras["sample_weights"],
                                 image_format=datagen_paras["image_format"],
                                 loader=datagen_paras["loader"],
@@ -0,0 +1,55 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#==============================================================================#
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# Internal libraries
+from aucmedi import DataGenerator
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for obtaining a PreparedStore of the samples at the input shape of a model
+def __prepared_store__(datagen, resize, prepared):
+    if not datagen.prepare_images : return None
+    # Reuse the PreparedStore of the passed DataGenerator if the input shape fits
+    if datagen.prepared_store is not None and \
+            datagen.prepared_store.fits(resize):
+        return datagen.prepared_store
+    # Otherwise prepare the samples only once for each input shape
+    key = tuple(resize)
+    if key not in prepared:
+        prepared[key] = DataGenerator(datagen.samples,
+                                      path_imagedir=datagen.path_imagedir,
+                                      subfunctions=datagen.subfunctions,
+                                      resize=resize,
+                                      standardize_mode=None,
+                                      grayscale=datagen.grayscale,
+                                      prepare_images=True,
+                                      prepare_dtype=datagen.prepare_dtype,
+                                      disk_cache=datagen.disk_cache,
+                                      memory_cache=datagen.memory_cache,
+                                      loader_resize=datagen.loader_resize,
+                                      read_ahead=datagen.read_ahead,
+                                      load_policy=datagen.load_policy,
+                                      image_format=datagen.image_format,
+                                      loader=datagen.sample_loader,
+                                      workers=datagen.workers,
+                                      **datagen.kwargs)
+    return prepared[key].prepared_store
@@ -22,6 +22,7 @@
 # External Libraries
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.metrics import roc_curve, roc_auc_score
 
 #-----------------------------------------------------#
@@ -37,7 +38,7 @@ def compute_metrics(preds, labels, n_labels, threshold=None):
     Args:
         preds (numpy.ndarray):          A NumPy array of predictions formatted with shape (n_samples, n_labels). Provided by
                                         [NeuralNetwork][aucmedi.neural_network.model].
-        labels (numpy.ndarray):         Classification list with One-Hot Encoding. Provided by
+        labels (numpy.ndarray):         Classification list with One-Hot Encoding (or a scipy.sparse matrix). Provided by
                                         [input_interface][aucmedi.data_processing.io_data.input_interface].
         n_labels (int):                 Number of classes. Provided by [input_interface][aucmedi.data_processing.io_data.input_interface].
         threshold (float):              Only required for multi_label data. Threshold value if prediction is positive.
@@ -46,12 +47,14 @@ def compute_metrics(preds, labels, n_labels, threshold=None):
         metrics (pandas.DataFrame):     Dataframe containing all computed metrics (except ROC).
     """
     df_list = []
+    # Access columns of sparse annotations efficiently
+    if sparse.issparse(labels) : labels = labels.tocsc()
     for c in range(0, n_labels):
         # Initialize variables
         data_dict = {}
 
         # Identify truth and prediction for class c
-        truth = labels[:, c]
+        truth = __column__(labels, c)
         if threshold is None:
             pred_argmax = np.argmax(preds, axis=-1)
             pred = (pred_argmax == c).astype(np.int)
@@ -107,7 +110,7 @@ def compute_confusion_matrix(preds, labels, n_labels):
     Args:
         preds (numpy.ndarray):          A NumPy array of predictions formatted with shape (n_samples, n_labels). Provided by
                                         [NeuralNetwork][aucmedi.neural_network.model].
-        labels (numpy.ndarray):         Classification list with One-Hot Encoding. Provided by
+        labels (numpy.ndarray):         Classification list with One-Hot Encoding (or a scipy.sparse matrix). Provided by
                                         [input_interface][aucmedi.data_processing.io_data.input_interface].
         n_labels (int):                 Number of classes. Provided by [input_interface][aucmedi.data_processing.io_data.input_interface].
 
@@ -115,7 +118,9 @@ def compute_confusion_matrix(preds, labels, n_labels):
         rawcm (numpy.ndarray):          NumPy matrix with shape (n_labels, n_labels).
     """
     preds_argmax = np.argmax(preds, axis=-1)
-    labels_argmax = np.argmax(labels, axis=-1)
+    if sparse.issparse(labels):
+        labels_argmax = np.asarray(labels.argmax(axis=1)).ravel()
+    else : labels_argmax = np.argmax(labels, axis=-1)
     rawcm = np.zeros((n_labels, n_labels))
     for i in range(0, labels.shape[0]):
         rawcm[labels_argmax[i]][preds_argmax[i]] += 1
@@ -130,7 +135,7 @@ def compute_roc(preds, labels, n_labels):
     Args:
         preds (numpy.ndarray):          A NumPy array of predictions formatted with shape (n_samples, n_labels). Provided by
                                         [NeuralNetwork][aucmedi.neural_network.model].
-        labels (numpy.ndarray):         Classification list with One-Hot Encoding. Provided by
+        labels (numpy.ndarray):         Classification list with One-Hot Encoding (or a scipy.sparse matrix). Provided by
                                         [input_interface][aucmedi.data_processing.io_data.input_interface].
         n_labels (int):                 Number of classes. Provided by [input_interface][aucmedi.data_processing.io_data.input_interface].
     Returns:
@@ -139,8 +144,9 @@ def compute_roc(preds, labels, n_labels):
     """
     fpr_list = []
     tpr_list = []
+    if sparse.issparse(labels) : labels = labels.tocsc()
     for i in range(0, n_labels):
-        truth_class = labels[:, i].astype(int)
+        truth_class = __column__(labels, i).astype(int)
         pdprob_class = preds[:, i]
         fpr, tpr, _ = roc_curve(truth_class, pdprob_class)
         fpr_list.append(fpr)
@@ -150,6 +156,11 @@ def compute_roc(preds, labels, n_labels):
 #-----------------------------------------------------#
 #                     Subroutines                     #
 #-----------------------------------------------------#
+# Obtain a dense column of a (sparse) label matrix
+def __column__(labels, c):
+    if sparse.issparse(labels) : return labels[:, [c]].toarray().ravel()
+    return labels[:, c]
+
 # Compute confusion matrix
 def compute_CM(gt, pd):
     tp = 0
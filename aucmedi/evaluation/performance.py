@@ -97,7 +97,7 @@ def evaluate_performance(preds,
     Args:
         preds (numpy.ndarray):          A NumPy array of predictions formatted with shape (n_samples, n_labels). Provided by
                                         [NeuralNetwork][aucmedi.neural_network.model].
-        labels (numpy.ndarray):         Classification list with One-Hot Encoding. Provided by
+        labels (numpy.ndarray):         Classification list with One-Hot Encoding (or a scipy.sparse matrix). Provided by
                                         [input_interface][aucmedi.data_processing.io_data.input_interface].
         out_path (str):                 Path to directory in which plotted figures are stored.
         show (bool):                    Option, whether to also display the generated charts.
@@ -22,8 +22,11 @@
 # External libraries
 from tensorflow.keras.models import load_model
 from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.preprocessing.image import Iterator
+import tensorflow as tf
 import numpy as np
 # Internal libraries/scripts
+from aucmedi.data_processing.data_generator import DataGenerator
 from aucmedi.neural_network.architectures import architecture_dict, \
                                                  supported_standardize_mode, \
                                                  Classifier
@@ -171,6 +174,9 @@ class NeuralNetwork:
             batch_queue_size (int):                 The batch queue size is the number of previously prepared batches in the cache during runtime.
             workers (int):                          Number of workers/threads which preprocess batches during runtime.
             multiprocessing (bool):                 Option whether to utilize multi-processing for workers instead of threading .
+                                                    For a [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator] with
+                                                    `workers > 1`, the multi-processing is delegated to the process-based preprocessing
+                                                    backend of the DataGenerator.
             verbose (int):                          Option (0/1) how much information should be written to stdout.
 
         ???+ danger
@@ -259,6 +265,9 @@ class NeuralNetwork:
         If an optional validation [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator]
         is provided, a validation set is analyzed regularly during the training process (after each epoch).
 
+        Instead of DataGenerators, TensorFlow datasets can be passed, which are created via
+        [as_tf_dataset()][aucmedi.data_processing.data_generator.DataGenerator.as_tf_dataset].
+
         The transfer learning training runs two fitting processes.
         The first one with frozen base model layers and a high learning rate,
         whereas the second one with unfrozen layers and a small learning rate.
@@ -276,8 +285,8 @@ class NeuralNetwork:
             ```
 
         Args:
-            training_generator (DataGenerator):     A data generator which will be used for training.
-            validation_generator (DataGenerator):   A data generator which will be used for validation.
+            training_generator (DataGenerator or tf.data.Dataset):     A data generator which will be used for training.
+            validation_generator (DataGenerator or tf.data.Dataset):   A data generator which will be used for validation.
             epochs (int):                           Number of epochs. A single epoch is defined as one iteration through
                                                     the complete data set.
             iterations (int):                       Number of iterations (batches) in a single epoch.
@@ -288,68 +297,80 @@ class NeuralNetwork:
         Returns:
             history (dict):                   A history dictionary from a Keras history object which contains several logs.
         """
-        # Running a standard training process
-        if not transfer_learning:
-            # Run training process with the Keras fit function
-            history = self.model.fit(training_generator,
-                                     validation_data=validation_generator,
-                                     callbacks=callbacks, epochs=epochs,
-                                     steps_per_epoch=iterations,
-                                     class_weight=class_weights,
-                                     workers=self.workers,
-                                     use_multiprocessing=self.multiprocessing,
-                                     max_queue_size=self.batch_queue_size,
-                                     verbose=self.verbose)
-            # Return logged history object
-            return history.history
-
-        # Running a transfer learning training process
-        else:
-            # Freeze all base model layers (all layers after "avg_pool")
-            lever = False
-            for layer in reversed(self.model.layers):
-                if not lever and layer.name == "avg_pool" : lever = True
-                elif lever : layer.trainable = False
-            # Compile model with high learning rate
-            self.model.compile(optimizer=Adam(learning_rate=self.tf_lr_start),
-                               loss=self.loss, metrics=self.metrics)
-            # Run first training with frozen layers
-            history_start = self.model.fit(training_generator,
-                                           validation_data=validation_generator,
-                                           callbacks=callbacks,
-                                           epochs=self.tf_epochs,
-                                           steps_per_epoch=iterations,
-                                           class_weight=class_weights,
-                                           workers=self.workers,
-                                           use_multiprocessing=self.multiprocessing,
-                                           max_queue_size=self.batch_queue_size,
-                                           verbose=self.verbose)
-            # Unfreeze base model layers again
-            for layer in self.model.layers:
-                layer.trainable = True
-            # Compile model with lower learning rate
-            self.model.compile(optimizer=Adam(learning_rate=self.tf_lr_end),
-                               loss=self.loss, metrics=self.metrics)
-            # Reset data generators
-            training_generator.reset()
-            if validation_generator is not None : validation_generator.reset()
-            # Run second training with unfrozed layers
-            history_end = self.model.fit(training_generator,
+        # Delegate multi-processing to the DataGenerators if possible
+        use_mp, delegated = self._delegate_multiprocessing(training_generator,
+                                                           validation_generator)
+        try:
+            # Repeat TensorFlow datasets for a fixed number of iterations per epoch
+            if iterations is not None and \
+                    isinstance(training_generator, tf.data.Dataset):
+                training_generator = training_generator.repeat()
+            # Running a standard training process
+            if not transfer_learning:
+                # Run training process with the Keras fit function
+                history = self.model.fit(training_generator,
                                          validation_data=validation_generator,
                                          callbacks=callbacks, epochs=epochs,
-                                         initial_epoch=self.tf_epochs,
                                          steps_per_epoch=iterations,
                                          class_weight=class_weights,
                                          workers=self.workers,
-                                         use_multiprocessing=self.multiprocessing,
+                                         use_multiprocessing=use_mp,
                                          max_queue_size=self.batch_queue_size,
                                          verbose=self.verbose)
-            # Combine logged history objects
-            hs = {"tl_" + k: v for k, v in history_start.history.items()}       # prefix : tl for transfer learning
-            he = {"ft_" + k: v for k, v in history_end.history.items()}         # prefix : ft for fine tuning
-            history = {**hs, **he}
-            # Return combined history objects
-            return history
+                # Return logged history object
+                return history.history
+
+            # Running a transfer learning training process
+            else:
+                # Freeze all base model layers (all layers after "avg_pool")
+                lever = False
+                for layer in reversed(self.model.layers):
+                    if not lever and layer.name == "avg_pool" : lever = True
+                    elif lever : layer.trainable = False
+                # Compile model with high learning rate
+                self.model.compile(optimizer=Adam(learning_rate=self.tf_lr_start),
+                                   loss=self.loss, metrics=self.metrics)
+                # Run first training with frozen layers
+                history_start = self.model.fit(training_generator,
+                                               validation_data=validation_generator,
+                                               callbacks=callbacks,
+                                               epochs=self.tf_epochs,
+                                               steps_per_epoch=iterations,
+                                               class_weight=class_weights,
+                                               workers=self.workers,
+                                               use_multiprocessing=use_mp,
+                                               max_queue_size=self.batch_queue_size,
+                                               verbose=self.verbose)
+                # Unfreeze base model layers again
+                for layer in self.model.layers:
+                    layer.trainable = True
+                # Compile model with lower learning rate
+                self.model.compile(optimizer=Adam(learning_rate=self.tf_lr_end),
+                                   loss=self.loss, metrics=self.metrics)
+                # Reset data generators (tf.data datasets restart on their own)
+                if isinstance(training_generator, Iterator):
+                    training_generator.reset()
+                if isinstance(validation_generator, Iterator):
+                    validation_generator.reset()
+                # Run second training with unfrozed layers
+                history_end = self.model.fit(training_generator,
+                                             validation_data=validation_generator,
+                                             callbacks=callbacks, epochs=epochs,
+                                             initial_epoch=self.tf_epochs,
+                                             steps_per_epoch=iterations,
+                                             class_weight=class_weights,
+                                             workers=self.workers,
+                                             use_multiprocessing=use_mp,
+                                             max_queue_size=self.batch_queue_size,
+                                             verbose=self.verbose)
+                # Combine logged history objects
+                hs = {"tl_" + k: v for k, v in history_start.history.items()}       # prefix : tl for transfer learning
+                he = {"ft_" + k: v for k, v in history_end.history.items()}         # prefix : ft for fine tuning
+                history = {**hs, **he}
+                # Return combined history objects
+                return history
+        # Restore multi-processing option of the DataGenerators
+        finally : self._restore_multiprocessing(delegated)
 
     #---------------------------------------------#
     #                 Prediction                  #
@@ -357,22 +378,66 @@ class NeuralNetwork:
     def predict(self, prediction_generator):
         """ Prediction function for the Neural Network model.
 
-        The fitted model will predict classifications for the provided [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
+        The fitted model will predict classifications for the provided [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator]
+        or TensorFlow dataset created via [as_tf_dataset()][aucmedi.data_processing.data_generator.DataGenerator.as_tf_dataset].
 
         Args:
-            prediction_generator (DataGenerator):   A data generator which will be used for inference.
+            prediction_generator (DataGenerator or tf.data.Dataset):   A data generator which will be used for inference.
 
         Returns:
             preds (numpy.ndarray):                  A NumPy array of predictions formatted with shape (n_samples, n_labels).
         """
+        # Delegate multi-processing to the DataGenerator if possible
+        use_mp, delegated = self._delegate_multiprocessing(prediction_generator)
         # Run inference process with the Keras predict function
-        preds = self.model.predict(prediction_generator, workers=self.workers,
-                                   max_queue_size=self.batch_queue_size,
-                                   use_multiprocessing=self.multiprocessing,
-                                   verbose=self.verbose)
+        try:
+            preds = self.model.predict(prediction_generator,
+                                       workers=self.workers,
+                                       max_queue_size=self.batch_queue_size,
+                                       use_multiprocessing=use_mp,
+                                       verbose=self.verbose)
+        # Restore multi-processing option of the DataGenerator
+        finally : self._restore_multiprocessing(delegated)
         # Output predictions results
         return preds
 
+    #---------------------------------------------#
+    #          Multi-Processing Delegation        #
+    #---------------------------------------------#
+    def _delegate_multiprocessing(self, *generators):
+        """ Internal function for delegating multi-processing to the process-based backend of DataGenerators.
+
+        AUCMEDI DataGenerators with multiple workers preprocess their samples in worker processes and
+        write them into shared memory, instead of being forked and pickled by Keras.
+        The option is only activated for a single call and has to be restored via `_restore_multiprocessing()`.
+
+        Returns:
+            use_multiprocessing (bool):     Option whether Keras still has to utilize multi-processing.
+            delegated (list of tuple):      DataGenerators with their previous multi-processing option.
+        """
+        # Skip delegation if multi-processing is not activated
+        if not self.multiprocessing : return False, []
+        # Activate process-based backend for DataGenerators with multiple workers
+        delegated = []
+        use_mp = False
+        for gen in generators:
+            if gen is None : continue
+            if isinstance(gen, DataGenerator) and gen.workers > 1:
+                delegated.append((gen, gen.multiprocessing))
+                gen.multiprocessing = True
+            else : use_mp = True
+        # Keras multi-processing is only required for non-delegated generators
+        return use_mp, delegated
+
+    def _restore_multiprocessing(self, delegated):
+        """ Internal function for restoring the multi-processing option of delegated DataGenerators.
+
+        Args:
+            delegated (list of tuple):      DataGenerators with their previous multi-processing option.
+        """
+        for gen, multiprocessing in delegated:
+            gen.multiprocessing = multiprocessing
+
     #---------------------------------------------#
     #               Model Management              #
     #---------------------------------------------#
@@ -49,6 +49,7 @@ with the parameter `iterative=True`.
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
+from scipy import sparse
 import numpy as np
 from sklearn.utils import check_random_state
 from sklearn.utils.validation import _num_samples, check_array
@@ -79,15 +80,26 @@ def IterativeStratification(labels, r, random_state):
     # Calculate the desired number of examples at each subset
     c_folds = r * n_samples
 
+    # For sparse labels, access rows and columns via the CSR and CSC structure
+    # and update the number of remaining examples of each label incrementally
+    is_sparse = sparse.issparse(labels)
+    if is_sparse:
+        labels_csr = sparse.csr_matrix(labels, dtype=bool)
+        labels_csr.eliminate_zeros()
+        labels_csc = labels_csr.tocsc()
+        num_labels_remaining = np.asarray(labels_csr.sum(axis=0)).ravel()
+
     # Calculate the desired number of examples of each label at each subset
-    c_folds_labels = np.outer(r, labels.sum(axis=0))
+    if is_sparse : c_folds_labels = np.outer(r, num_labels_remaining)
+    else : c_folds_labels = np.outer(r, labels.sum(axis=0))
 
     labels_not_processed_mask = np.ones(n_samples, dtype=bool)
 
     while np.any(labels_not_processed_mask):
         # Find the label with the fewest (but at least one) remaining examples,
         # breaking ties randomly
-        num_labels = labels[labels_not_processed_mask].sum(axis=0)
+        if is_sparse : num_labels = num_labels_remaining
+        else : num_labels = labels[labels_not_processed_mask].sum(axis=0)
 
         # Handle case where only all-zero labels are left by distributing
         # across all folds as evenly as possible (not in original algorithm but
@@ -113,7 +125,13 @@ def IterativeStratification(labels, r, random_state):
         if label_idx.shape[0] > 1:
             label_idx = label_idx[random_state.choice(label_idx.shape[0])]
 
-        sample_idxs = np.where(np.logical_and(labels[:, label_idx].flatten(), labels_not_processed_mask))[0]
+        if is_sparse:
+            column = int(np.ravel(label_idx)[0])
+            rows = labels_csc.indices[labels_csc.indptr[column]:
+                                      labels_csc.indptr[column+1]]
+            sample_idxs = np.sort(rows[labels_not_processed_mask[rows]])
+        else:
+            sample_idxs = np.where(np.logical_and(labels[:, label_idx].flatten(), labels_not_processed_mask))[0]
 
         for sample_idx in sample_idxs:
             # Find the subset(s) with the largest number of desired examples
@@ -134,7 +152,12 @@ def IterativeStratification(labels, r, random_state):
             labels_not_processed_mask[sample_idx] = False
 
             # Update desired number of examples
-            c_folds_labels[fold_idx, labels[sample_idx]] -= 1
+            if is_sparse:
+                row = labels_csr.indices[labels_csr.indptr[sample_idx]:
+                                         labels_csr.indptr[sample_idx+1]]
+                c_folds_labels[fold_idx, row] -= 1
+                num_labels_remaining[row] -= 1
+            else : c_folds_labels[fold_idx, labels[sample_idx]] -= 1
             c_folds[fold_idx] -= 1
 
     return test_folds
@@ -196,7 +219,8 @@ class MultilabelStratifiedKFold(_BaseKFold):
         super(MultilabelStratifiedKFold, self).__init__(n_splits=n_splits, shuffle=shuffle, random_state=random_state)
 
     def _make_test_folds(self, X, y):
-        y = np.asarray(y, dtype=bool)
+        if sparse.issparse(y) : y = sparse.csr_matrix(y, dtype=bool)
+        else : y = np.asarray(y, dtype=bool)
         type_of_target_y = type_of_target(y)
 
         if type_of_target_y != 'multilabel-indicator':
@@ -245,7 +269,7 @@ class MultilabelStratifiedKFold(_BaseKFold):
           train (numpy.ndarray):        The training set indices for that split.
           test (numpy.ndarray):         The testing set indices for that split.
         """
-        y = check_array(y, ensure_2d=False, dtype=None)
+        y = check_array(y, ensure_2d=False, dtype=None, accept_sparse="csr")
         return super(MultilabelStratifiedKFold, self).split(X, y, groups)
 
 #-----------------------------------------------------#
@@ -318,8 +342,10 @@ class MultilabelStratifiedShuffleSplit(BaseShuffleSplit):
 
     def _iter_indices(self, X, y, groups=None):
         n_samples = _num_samples(X)
-        y = check_array(y, ensure_2d=False, dtype=None)
-        y = np.asarray(y, dtype=bool)
+        if sparse.issparse(y) : y = sparse.csr_matrix(y, dtype=bool)
+        else:
+            y = check_array(y, ensure_2d=False, dtype=None)
+            y = np.asarray(y, dtype=bool)
         type_of_target_y = type_of_target(y)
 
         if type_of_target_y != 'multilabel-indicator':
@@ -372,5 +398,5 @@ class MultilabelStratifiedShuffleSplit(BaseShuffleSplit):
             train (numpy.ndarray):        The training set indices for that split.
             test (numpy.ndarray):         The testing set indices for that split.
         """
-        y = check_array(y, ensure_2d=False, dtype=None)
+        y = check_array(y, ensure_2d=False, dtype=None, accept_sparse="csr")
         return super(MultilabelStratifiedShuffleSplit, self).split(X, y, groups)
@@ -20,10 +20,12 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
+from scipy import sparse
 import numpy as np
 from sklearn.model_selection import StratifiedKFold, KFold
 # Internal libraries
 from aucmedi.sampling.iterative import MultilabelStratifiedKFold
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #    Function: Sampling via k-fold cross-validation   #
@@ -62,8 +64,9 @@ def sampling_kfold(samples, labels, metadata=None, n_splits=3,
         ```
 
     Args:
-        samples (list of str):      List of sample/index encoded as Strings.
-        labels (numpy.ndarray):     NumPy matrix containing the ohe encoded classification.
+        samples (list of str):      List of sample/index encoded as Strings or a
+                                    [SampleTable][aucmedi.data_processing.sample_table.SampleTable].
+        labels (numpy.ndarray):     NumPy matrix containing the ohe encoded classification (or a scipy.sparse matrix).
         metadata (numpy.ndarray):   NumPy matrix with additional metadata. Have to be shape (n_samples, meta_variables).
         n_splits (int):             Number of folds (k). Must be at least 2.
         stratified (bool):          Option whether to use stratified sampling based on provided labels.
@@ -84,15 +87,19 @@ def sampling_kfold(samples, labels, metadata=None, n_splits=3,
     elif stratified and not iterative:
         sampler = StratifiedKFold(n_splits=n_splits, shuffle=True,
                                   random_state=seed)
-        wk_labels = np.argmax(wk_labels, axis=-1)
+        if sparse.issparse(wk_labels):
+            wk_labels = np.asarray(wk_labels.argmax(axis=1)).ravel()
+        else : wk_labels = np.argmax(wk_labels, axis=-1)
     # Initialize iterative stratified sampler
     else:
         sampler = MultilabelStratifiedKFold(n_splits=n_splits, shuffle=True,
                                             random_state=seed)
 
     # Preprocess data
-    x = np.asarray(samples)
-    y = np.asarray(labels)
+    if isinstance(samples, SampleTable) : x = samples
+    else : x = np.asarray(samples)
+    if sparse.issparse(labels) : y = labels.tocsr()
+    else : y = np.asarray(labels)
     if metadata is not None : m = np.asarray(metadata)
 
     # Apply sampling and generate folds
@@ -20,10 +20,12 @@
 #                   Library imports                   #
 #-----------------------------------------------------#
 # External libraries
+from scipy import sparse
 import numpy as np
 from sklearn.model_selection import StratifiedShuffleSplit, ShuffleSplit
 # Internal libraries
 from aucmedi.sampling.iterative import MultilabelStratifiedShuffleSplit
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #       Function: Sampling via Percentage Split       #
@@ -61,8 +63,10 @@ def sampling_split(samples, labels, metadata=None, sampling=[0.8, 0.2],
         ```
 
     Args:
-        samples (list of str):          List of sample/index encoded as Strings.
-        labels (numpy.ndarray):         NumPy matrix containing the ohe encoded classification.
+        samples (list of str):          List of sample/index encoded as Strings or a
+                                        [SampleTable][aucmedi.data_processing.sample_table.SampleTable].
+        labels (numpy.ndarray):         NumPy matrix containing the ohe encoded classification (or a scipy.sparse matrix).
+                                        For sparse labels, stratified sampling is based on the class with the highest value.
         metadata (numpy.ndarray):       NumPy matrix with additional metadata. Have to be shape (n_samples, meta_variables).
         sampling (list of float):       List of percentage values with split sizes.
         stratified (bool):              Option whether to use stratified sampling based on provided labels.
@@ -78,8 +82,10 @@ def sampling_split(samples, labels, metadata=None, sampling=[0.8, 0.2],
         raise ValueError("Sum of Percentage split ratios as sampling do not" + \
                          " equal 1", sampling, np.sum(sampling))
     # Initialize leftover with the complete dataset
-    leftover_samples = np.asarray(samples)
-    leftover_labels = np.asarray(labels)
+    if isinstance(samples, SampleTable) : leftover_samples = samples
+    else : leftover_samples = np.asarray(samples)
+    if sparse.issparse(labels) : leftover_labels = labels.tocsr()
+    else : leftover_labels = np.asarray(labels)
     if metadata is not None : leftover_meta = np.asarray(metadata)
     leftover_p = 0.0
     # Initialize result list
@@ -112,7 +118,10 @@ def sampling_split(samples, labels, metadata=None, sampling=[0.8, 0.2],
                             random_state=seed, train_size=(1.0-p), test_size=p)
 
         # Apply sampling
-        subset_generator = sampler.split(X=leftover_samples, y=leftover_labels)
+        if sparse.issparse(leftover_labels) and not iterative:
+            wk_labels = np.asarray(leftover_labels.argmax(axis=1)).ravel()
+        else : wk_labels = leftover_labels
+        subset_generator = sampler.split(X=leftover_samples, y=wk_labels)
         subsets = next(subset_generator)
         # Generate split
         if metadata is None:
@@ -19,8 +19,9 @@
 #-----------------------------------------------------#
 #                   Library imports                   #
 #-----------------------------------------------------#
-from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.callbacks import EarlyStopping, Callback
 import pandas as pd
+import os
 
 #-----------------------------------------------------#
 #                   Custom Callbacks                  #
@@ -69,6 +70,56 @@ class MinEpochEarlyStopping(EarlyStopping):
         if epoch > self.start_epoch:
             super(MinEpochEarlyStopping, self).on_epoch_end(epoch, logs)
 
+class ProfilerLogger(Callback):
+    """ Logging of the preprocessing stage runtimes recorded by a
+    [Profiler][aucmedi.data_processing.profiler.Profiler] after each epoch.
+
+    The summary of each epoch is printed (if `verbose=1`), stored in the `history` list
+    and optionally appended to a CSV file.
+
+    ???+ example
+        ```python
+        from aucmedi.utils.callbacks import ProfilerLogger
+
+        datagen = DataGenerator(samples, "images_dir/", labels=class_ohe,
+                                resize=(224, 224), profiling=True)
+        cb_profiler = ProfilerLogger(datagen.profiler, path="profiling.csv")
+        model.train(datagen, epochs=10, callbacks=[cb_profiler])
+        ```
+    """
+    def __init__(self, profiler, path=None, reset=True, verbose=1):
+        """ Initialization function for creating a ProfilerLogger Callback.
+
+        Args:
+            profiler (Profiler):        Profiler of a DataGenerator (e.g. `datagen.profiler`).
+            path (str):                 Path to a CSV file in which the summary of each epoch is appended.
+            reset (bool):               Option whether the Profiler should be reset after each epoch.
+                                        Otherwise, the summaries are cumulative.
+            verbose (int):              Option (0/1) whether the summary should be printed to stdout.
+        """
+        super(ProfilerLogger, self).__init__()
+        self.profiler = profiler
+        self.path = path
+        self.reset = reset
+        self.verbose = verbose
+        self.history = []
+
+    def on_epoch_end(self, epoch, logs=None):
+        # Obtain summary of the epoch
+        df = self.profiler.to_dataframe()
+        df.insert(0, "epoch", epoch)
+        self.history.append(df)
+        # Print summary
+        if self.verbose > 0:
+            print("\nPreprocessing profile of epoch " + str(epoch) + ":")
+            print(df.drop(columns="epoch").to_string())
+        # Append summary to CSV file
+        if self.path is not None:
+            df.to_csv(self.path, mode="a",
+                      header=not os.path.exists(self.path))
+        # Reset profiler for next epoch
+        if self.reset : self.profiler.reset()
+
 #-----------------------------------------------------#
 #                    Callback Utils                   #
 #-----------------------------------------------------#
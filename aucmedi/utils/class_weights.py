@@ -21,6 +21,7 @@
 #-----------------------------------------------------#
 # External libraries
 from sklearn.utils.class_weight import compute_class_weight, compute_sample_weight
+from scipy import sparse
 import numpy as np
 
 #-----------------------------------------------------#
@@ -51,7 +52,7 @@ def compute_class_weights(ohe_array, method="balanced"):
         https://scikit-learn.org/stable/modules/generated/sklearn.utils.class_weight.compute_class_weight.html  <br>
 
     Args:
-        ohe_array (numpy.ndarray):  NumPy matrix containing the ohe encoded classification.
+        ohe_array (numpy.ndarray):  NumPy matrix containing the ohe encoded classification (or a scipy.sparse matrix).
         method (str):               Dictionary or modus, how class weights should be computed.
 
     Returns:
@@ -61,7 +62,9 @@ def compute_class_weights(ohe_array, method="balanced"):
                                                 or keras.model.fit().
     """
     # Obtain sparse categorical array and number of classes
-    class_array = np.argmax(ohe_array, axis=-1)
+    if sparse.issparse(ohe_array):
+        class_array = np.asarray(ohe_array.argmax(axis=1)).ravel()
+    else : class_array = np.argmax(ohe_array, axis=-1)
     n_classes = np.unique(class_array)
     # Compute class weights with scikit learn
     class_weights_list = compute_class_weight(class_weight=method,
@@ -88,20 +91,32 @@ def compute_multilabel_weights(ohe_array, method="balanced"):
         https://scikit-learn.org/stable/modules/generated/sklearn.utils.class_weight.compute_class_weight.html  <br>
 
     Args:
-        ohe_array (numpy.ndarray):      NumPy matrix containing the ohe encoded classification.
+        ohe_array (numpy.ndarray):      NumPy matrix containing the ohe encoded classification (or a scipy.sparse matrix).
         method (str):                   Dictionary or modus, how class weights should be computed.
 
     Returns:
         class_weights (numpy.ndarray):      Class weight list which can be fed to a loss function.
     """
+    # Compute balanced weights directly from the label counts of sparse annotations
+    if sparse.issparse(ohe_array) and method == "balanced":
+        n_samples, n_classes = ohe_array.shape
+        n_positive = __count_positives__(ohe_array)
+        if np.any(n_positive == 0) or np.any(n_positive == n_samples):
+            raise ValueError("classes should have valid labels that are in y")
+        return n_samples / (2 * n_positive)
+    # Access columns of sparse annotations efficiently
+    if sparse.issparse(ohe_array) : ohe_array = ohe_array.tocsc()
     # Identify number of classes
     n_classes = np.shape(ohe_array)[1]
     # Initialize class weight list
     class_weights = np.empty([n_classes])
     # Compute weight for each class individually
     for i in range(0, n_classes):
-        weight = compute_class_weight(class_weight=method, classes=[0,1],
-                                      y=ohe_array[:, i])
+        if sparse.issparse(ohe_array):
+            column = ohe_array[:, [i]].toarray().ravel()
+        else : column = ohe_array[:, i]
+        weight = compute_class_weight(class_weight=method,
+                                      classes=np.array([0,1]), y=column)
         class_weights[i] = weight[1]
     # Return resulting class weight list
     return class_weights
@@ -123,14 +138,46 @@ def compute_sample_weights(ohe_array, method="balanced"):
         https://scikit-learn.org/stable/modules/generated/sklearn.utils.class_weight.compute_sample_weight.html <br>
 
     Args:
-        ohe_array (numpy.ndarray):      NumPy matrix containing the ohe encoded classification.
+        ohe_array (numpy.ndarray):      NumPy matrix containing the ohe encoded classification (or a scipy.sparse matrix).
         method (str):                   Dictionary or modus, how class weights should be computed.
 
     Returns:
         sample_weights (numpy.ndarray):     Sample weight list which can be fed to an AUCMEDI
                                             [DataGenerator][aucmedi.data_processing.data_generator.DataGenerator].
     """
+    # Compute balanced sample weights directly from the label counts of sparse annotations
+    if sparse.issparse(ohe_array) and method == "balanced":
+        sample_weights = __sparse_sample_weights__(ohe_array)
     # Compute sample weights with scikit learn
-    sample_weights = compute_sample_weight(class_weight=method, y=ohe_array)
+    else:
+        if sparse.issparse(ohe_array) : ohe_array = ohe_array.toarray()
+        sample_weights = compute_sample_weight(class_weight=method, y=ohe_array)
     # Return resulting sample weights
     return sample_weights
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for counting the positive annotations of each class in a sparse matrix
+def __count_positives__(ohe_array):
+    ohe_csc = sparse.csc_matrix(ohe_array, dtype=bool)
+    ohe_csc.eliminate_zeros()
+    return np.diff(ohe_csc.indptr).astype(np.float64)
+
+# Internal function for computing balanced multi-output sample weights of a sparse matrix
+# (identical to scikit learn: product of the balanced class weights of each label column)
+def __sparse_sample_weights__(ohe_array):
+    n_samples = ohe_array.shape[0]
+    n_positive = __count_positives__(ohe_array)
+    n_negative = n_samples - n_positive
+    # Columns with a single value obtain a weight of 1
+    constant = (n_positive == 0) | (n_negative == 0)
+    weight_pos = np.where(constant, 1.0,
+                          n_samples / (2 * np.maximum(n_positive, 1)))
+    weight_neg = np.where(constant, 1.0,
+                          n_samples / (2 * np.maximum(n_negative, 1)))
+    # Multiply weights in log space: all negative weights + positive corrections
+    log_ratio = np.log(weight_pos) - np.log(weight_neg)
+    ohe_csr = sparse.csr_matrix(ohe_array, dtype=bool).astype(np.float64)
+    log_weights = np.log(weight_neg).sum() + ohe_csr @ log_ratio
+    return np.exp(log_weights)
@@ -0,0 +1,267 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                    Documentation                    #
+#-----------------------------------------------------#
+""" Benchmark suite for the annotation parsing of the AUCMEDI input_interface.
+
+Synthetic annotation files (CSV and JSON, each with sparse categorical and one-hot encoded classes)
+are generated and parsed via the `input_interface` with the `csv` and `json` interface.
+
+For each configuration, the parsing time, the peak resident memory (RSS) and the memory
+of the resulting `class_ohe` array are measured in a separate process and written into a JSON file,
+which can be compared with the results of another version.
+
+???+ example
+    ```sh
+    # Run benchmark and store results
+    python benchmarks/benchmark_annotations.py --output annotations.json
+
+    # Run a larger benchmark and compare it with previous results
+    python benchmarks/benchmark_annotations.py --samples 5000000 \
+                                               --output new.json --compare annotations.json
+    ```
+"""
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import multiprocessing as mp
+import numpy as np
+import argparse
+import platform
+import resource
+import tempfile
+import json
+import time
+import sys
+import os
+# Internal libraries
+from aucmedi.data_processing.io_data import input_interface
+
+#-----------------------------------------------------#
+#                    Configuration                    #
+#-----------------------------------------------------#
+# Annotation files: name -> (interface, one-hot encoded)
+annotations = {"csv.sparse": ("csv", False),
+               "csv.ohe": ("csv", True),
+               "json.sparse": ("json", False),
+               "json.ohe": ("json", True),
+}
+
+#-----------------------------------------------------#
+#              Annotation File Generation             #
+#-----------------------------------------------------#
+def create_annotation(path, interface, ohe, n_samples, n_classes):
+    """ Generate a synthetic annotation file with random (multi-label) classes.
+
+    Args:
+        path (str):                 Path to the directory in which the annotation file is stored.
+        interface (str):            Format of the annotation file (`"csv"` or `"json"`).
+        ohe (bool):                 Option whether classes are one-hot encoded or sparse categorical.
+        n_samples (int):            Number of samples.
+        n_classes (int):            Number of classes.
+
+    Returns:
+        path_data (str):            Path to the annotation file.
+    """
+    np.random.seed(0)
+    path_data = os.path.join(path, "annotations." + interface)
+    classes = ["class_" + str(c) for c in range(0, n_classes)]
+    chunk_size = 100000
+    with open(path_data, "w") as fd:
+        # Write header
+        if interface == "csv" and ohe:
+            fd.write(",".join(["SAMPLE"] + classes) + "\n")
+        elif interface == "csv" : fd.write("SAMPLE,CLASS\n")
+        else : fd.write("{")
+        # Write annotations in chunks
+        for start in range(0, n_samples, chunk_size):
+            end = min(start + chunk_size, n_samples)
+            if ohe:
+                labels = np.random.randint(0, 2, size=(end-start, n_classes))
+            else : labels = np.random.randint(0, n_classes, size=end-start)
+            lines = []
+            for i, label in zip(range(start, end), labels):
+                index = "sample_" + str(i)
+                if interface == "csv" and ohe:
+                    lines.append(index + "," + ",".join(map(str, label)))
+                elif interface == "csv":
+                    lines.append(index + "," + classes[label])
+                elif ohe : lines.append('"' + index + '": ' + \
+                                        json.dumps(label.tolist()))
+                else : lines.append('"' + index + '": "' + classes[label] + '"')
+            if interface == "csv" : fd.write("\n".join(lines) + "\n")
+            else:
+                if start > 0 : fd.write(", ")
+                fd.write(", ".join(lines))
+        if interface == "json" : fd.write("}")
+    return path_data
+
+#-----------------------------------------------------#
+#                 Benchmark Execution                 #
+#-----------------------------------------------------#
+def run_configuration(config, path_imagedir, path_data, queue):
+    """ Measure parsing time and peak memory of a single configuration (executed in a separate process). """
+    # Reset peak memory of the process (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as fd : fd.write("5")
+    except OSError : pass
+    rss_baseline = __rss__("VmRSS")
+    # Parse annotation file (without image validation)
+    start = time.perf_counter()
+    ds = input_interface(config["interface"], path_imagedir,
+                         path_data=path_data, training=True,
+                         ohe=config["ohe"], validate=False)
+    runtime = time.perf_counter() - start
+    # Return measurements
+    queue.put({"runtime": runtime,
+               "samples_per_second": config["samples"] / runtime,
+               "ohe_dtype": str(ds[1].dtype),
+               "ohe_mb": ds[1].nbytes / 1024**2,
+               "rss_baseline_mb": rss_baseline,
+               "rss_peak_mb": __rss__("VmHWM")})
+
+def run_benchmark(args):
+    """ Run all benchmark configurations and return the results. """
+    results = []
+    ctx = mp.get_context("fork")
+    for name, (interface, ohe) in annotations.items():
+        if name not in args.annotations : continue
+        # Generate annotation file and a single image for format detection
+        tmp_dir = tempfile.TemporaryDirectory(prefix="aucmedi.benchmark.")
+        path_imagedir = os.path.join(tmp_dir.name, "images")
+        os.mkdir(path_imagedir)
+        open(os.path.join(path_imagedir, "sample_0.png"), "w").close()
+        path_data = create_annotation(tmp_dir.name, interface, ohe,
+                                      args.samples, args.classes)
+        config = {"annotation": name, "interface": interface, "ohe": ohe,
+                  "samples": args.samples, "classes": args.classes,
+                  "file_mb": os.path.getsize(path_data) / 1024**2}
+        # Run configuration in a separate process
+        queue = ctx.Queue()
+        process = ctx.Process(target=run_configuration,
+                              args=(config, path_imagedir, path_data, queue))
+        process.start()
+        measurement = queue.get()
+        process.join()
+        results.append({**config, **measurement})
+        if args.verbose:
+            print(__config_key__(results[-1]) + " -> " + \
+                  "%.2f s" % measurement["runtime"] + \
+                  ", class_ohe %.1f MB" % measurement["ohe_mb"] + \
+                  " (" + measurement["ohe_dtype"] + ")" + \
+                  ", peak RSS %.1f MB" % measurement["rss_peak_mb"])
+        tmp_dir.cleanup()
+    return results
+
+#-----------------------------------------------------#
+#                  Result Comparison                  #
+#-----------------------------------------------------#
+def compare_results(results, path_reference, threshold=0.1):
+    """ Compare parsing time and peak memory with the results of a previous benchmark run.
+
+    Args:
+        results (list of dict):     Results of the current benchmark run.
+        path_reference (str):       Path to the JSON file of a previous benchmark run.
+        threshold (float):          Relative increase, which is reported as regression.
+
+    Returns:
+        regressions (list of str):  Configurations with a runtime or memory regression.
+    """
+    with open(path_reference, "r") as fd:
+        reference = {__config_key__(r): r for r in json.load(fd)["results"]}
+    regressions = []
+    for r in results:
+        key = __config_key__(r)
+        if key not in reference : continue
+        ratio_time = r["runtime"] / reference[key]["runtime"]
+        ratio_memory = (r["rss_peak_mb"] - r["rss_baseline_mb"]) / \
+                       max(reference[key]["rss_peak_mb"] - \
+                           reference[key]["rss_baseline_mb"], 1.0)
+        flag = ""
+        if ratio_time > 1.0 + threshold or ratio_memory > 1.0 + threshold:
+            regressions.append(key)
+            flag = "  <- REGRESSION"
+        print(key + " : time %.2fx" % ratio_time + \
+              ", memory %.2fx" % ratio_memory + flag)
+    return regressions
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for reading a memory value (in MB) from /proc/self/status
+def __rss__(field):
+    try:
+        with open("/proc/self/status", "r") as fd:
+            for line in fd:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError : pass
+    # Fallback: peak resident memory via resource (kilobytes on Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Internal function for creating a unique key of a configuration
+def __config_key__(result):
+    return result["annotation"] + "|samples=" + str(result["samples"]) + \
+           "|classes=" + str(result["classes"])
+
+#-----------------------------------------------------#
+#                Main Method - Runner                 #
+#-----------------------------------------------------#
+def main():
+    parser = argparse.ArgumentParser(description="AUCMEDI annotation parsing benchmark")
+    parser.add_argument("--output", type=str, default="benchmark_annotations.json",
+                        help="Path to the JSON file for storing the results")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Path to the JSON file of a previous run for comparison")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative increase, which is reported as regression")
+    parser.add_argument("--annotations", type=str, nargs="+",
+                        default=list(annotations.keys()),
+                        help="Annotation files to parse")
+    parser.add_argument("--samples", type=int, default=500000,
+                        help="Number of samples per annotation file")
+    parser.add_argument("--classes", type=int, default=14,
+                        help="Number of classes")
+    parser.add_argument("--verbose", type=int, default=1,
+                        help="Option (0/1) whether results are printed")
+    args = parser.parse_args()
+
+    # Run benchmark
+    results = run_benchmark(args)
+    # Store results with system information
+    meta = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "arguments": vars(args)}
+    try:
+        from importlib.metadata import version
+        meta["aucmedi"] = version("aucmedi")
+    except Exception : meta["aucmedi"] = None
+    with open(args.output, "w") as fd:
+        json.dump({"meta": meta, "results": results}, fd, indent=2)
+    # Compare with previous results
+    if args.compare is not None:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if len(regressions) > 0 : sys.exit(1)
+
+if __name__ == "__main__":
+    main()
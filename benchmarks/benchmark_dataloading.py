@@ -0,0 +1,341 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                    Documentation                    #
+#-----------------------------------------------------#
+""" Benchmark suite for the data loading throughput of the AUCMEDI DataGenerator.
+
+Synthetic 2D (PNG, JPEG, NPY) and 3D (NIfTI, MHA, NPY) datasets are generated and loaded through
+the DataGenerator with all IO_loader functions (image_loader, numpy_loader, sitk_loader, cache_loader)
+across worker counts, `prepare_images` on/off and augmentation off/sample-wise/batch-wise (2D only).
+
+For each configuration, the throughput (samples/s) and the peak resident memory (RSS) are measured
+in a separate process and written into a JSON file, which can be compared with the results of another version.
+Configurations whose process crashes or exceeds the timeout are recorded with an `"error"` entry.
+
+???+ example
+    ```sh
+    # Run benchmark and store results
+    python benchmarks/benchmark_dataloading.py --output results.json
+
+    # Run a smaller benchmark only for 2D data and compare it with previous results
+    python benchmarks/benchmark_dataloading.py --dimensions 2D --samples 32 \
+                                               --output new.json --compare results.json
+    ```
+"""
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+# External libraries
+import multiprocessing as mp
+import numpy as np
+import SimpleITK as sitk
+from PIL import Image
+from queue import Empty
+import argparse
+import itertools
+import platform
+import resource
+import tempfile
+import json
+import time
+import sys
+import os
+# Internal libraries
+from aucmedi import DataGenerator, ImageAugmentation, VolumeAugmentation
+from aucmedi.data_processing.io_loader import image_loader, numpy_loader, \
+                                              sitk_loader, cache_loader
+
+#-----------------------------------------------------#
+#                    Configuration                    #
+#-----------------------------------------------------#
+# Datasets: name -> (dimension, file format, IO_loader)
+datasets = {"2D.png": ("2D", "png", image_loader),
+            "2D.jpg": ("2D", "jpg", image_loader),
+            "2D.npy": ("2D", "npy", numpy_loader),
+            "2D.cache": ("2D", None, cache_loader),
+            "3D.nii.gz": ("3D", "nii.gz", sitk_loader),
+            "3D.mha": ("3D", "mha", sitk_loader),
+            "3D.npy": ("3D", "npy", numpy_loader),
+            "3D.cache": ("3D", None, cache_loader),
+}
+
+#-----------------------------------------------------#
+#                  Dataset Generation                 #
+#-----------------------------------------------------#
+def create_dataset(path, dimension, image_format, n_samples, shape):
+    """ Generate a synthetic dataset with random RGB (2D) or grayscale (3D) images.
+
+    Args:
+        path (str):                 Path to the directory in which the images are stored.
+        dimension (str):            Dimension of the images (`"2D"` or `"3D"`).
+        image_format (str):         File format of the images. If `None`, the images are returned as cache.
+        n_samples (int):            Number of images.
+        shape (tuple of int):       Shape of the images.
+
+    Returns:
+        samples (list of str):      List of sample indices.
+        cache (dict):               Dictionary with the images for the cache_loader (or `None`).
+    """
+    np.random.seed(0)
+    samples = []
+    cache = {} if image_format is None else None
+    for i in range(0, n_samples):
+        index = "sample_" + str(i)
+        samples.append(index)
+        # Create image
+        if dimension == "2D":
+            img = (np.random.rand(*shape, 3) * 255).astype(np.uint8)
+        else : img = (np.random.rand(*shape, 1) * 255).astype(np.float32)
+        # Store image
+        if image_format is None : cache[index] = img
+        elif image_format == "npy":
+            np.save(os.path.join(path, index + ".npy"), img)
+        elif image_format in ["png", "jpg"]:
+            Image.fromarray(img).save(os.path.join(path,
+                                                   index + "." + image_format))
+        else:
+            sitk_img = sitk.GetImageFromArray(img[..., 0])
+            sitk.WriteImage(sitk_img, os.path.join(path,
+                                                   index + "." + image_format))
+    return samples, cache
+
+#-----------------------------------------------------#
+#                 Benchmark Execution                 #
+#-----------------------------------------------------#
+def run_configuration(config, path, samples, cache, queue):
+    """ Measure throughput and peak memory of a single configuration (executed in a separate process). """
+    dimension, image_format, loader = datasets[config["dataset"]]
+    # Reset peak memory of the process (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as fd : fd.write("5")
+    except OSError : pass
+    rss_baseline = __rss__("VmRSS")
+    # Configure DataGenerator
+    kwargs = {}
+    if loader == cache_loader : kwargs["cache"] = cache
+    if dimension == "3D" : kwargs["two_dim"] = False
+    if not config["augmentation"] : data_aug = None
+    elif dimension == "2D":
+        data_aug = ImageAugmentation(batch_mode=(config["augmentation"] == \
+                                                 "batch"))
+    else : data_aug = VolumeAugmentation()
+    # Initialize DataGenerator (includes image preparation)
+    start = time.perf_counter()
+    datagen = DataGenerator(samples, path, image_format=image_format,
+                            batch_size=config["batch_size"],
+                            resize=config["resize"], data_aug=data_aug,
+                            grayscale=(dimension == "3D"),
+                            workers=config["workers"],
+                            prepare_images=config["prepare_images"],
+                            loader=loader, **kwargs)
+    init_time = time.perf_counter() - start
+    # Iterate over all batches for multiple epochs
+    start = time.perf_counter()
+    for epoch in range(0, config["epochs"]):
+        for i in range(0, len(datagen)) : datagen[i]
+    runtime = time.perf_counter() - start
+    # Return measurements
+    n_processed = len(samples) * config["epochs"]
+    # Peak RSS is read from /proc/self (VmHWM) and thus excludes worker processes
+    # of a multiprocessing DataGenerator
+    queue.put({"init_time": init_time, "runtime": runtime,
+               "samples_per_second": n_processed / runtime,
+               "rss_baseline_mb": rss_baseline,
+               "rss_peak_mb": __rss__("VmHWM")})
+
+def run_benchmark(args):
+    """ Run all benchmark configurations and return the results. """
+    results = []
+    ctx = mp.get_context("fork")
+    for name, (dimension, image_format, loader) in datasets.items():
+        if dimension not in args.dimensions : continue
+        if image_format is not None and image_format not in args.formats \
+                and name.split(".", 1)[1] not in args.formats:
+            continue
+        if image_format is None and "cache" not in args.formats : continue
+        # Generate dataset
+        tmp_dir = tempfile.TemporaryDirectory(prefix="aucmedi.benchmark.")
+        if dimension == "2D" : shape = tuple(args.shape_2d)
+        else : shape = tuple(args.shape_3d)
+        samples, cache = create_dataset(tmp_dir.name, dimension, image_format,
+                                        args.samples, shape)
+        if dimension == "2D" : resize = tuple(args.resize_2d)
+        else : resize = tuple(args.resize_3d)
+        # Run each configuration in a separate process
+        # Batch augmentation is only available for 2D data
+        if dimension == "2D" : aug_modes = [False, True, "batch"]
+        else : aug_modes = [False, True]
+        for workers, prepare, aug in itertools.product(args.workers,
+                                                       [False, True],
+                                                       aug_modes):
+            config = {"dataset": name, "loader": loader.__name__,
+                      "workers": workers, "prepare_images": prepare,
+                      "augmentation": aug, "samples": args.samples,
+                      "shape": shape, "resize": resize,
+                      "batch_size": args.batch_size, "epochs": args.epochs}
+            queue = ctx.Queue()
+            process = ctx.Process(target=run_configuration,
+                                  args=(config, tmp_dir.name, samples, cache,
+                                        queue))
+            process.start()
+            measurement = __receive__(process, queue, args.timeout)
+            results.append({**config, **measurement})
+            if args.verbose and "error" in measurement:
+                print(__config_key__(results[-1]) + " -> " + \
+                      "FAILED (" + measurement["error"] + ")")
+            elif args.verbose:
+                print(__config_key__(results[-1]) + " -> " + \
+                      "%.1f samples/s" % measurement["samples_per_second"] + \
+                      ", peak RSS %.1f MB" % measurement["rss_peak_mb"])
+        tmp_dir.cleanup()
+    return results
+
+#-----------------------------------------------------#
+#                  Result Comparison                  #
+#-----------------------------------------------------#
+def compare_results(results, path_reference, threshold=0.1):
+    """ Compare the throughput with the results of a previous benchmark run.
+
+    Args:
+        results (list of dict):     Results of the current benchmark run.
+        path_reference (str):       Path to the JSON file of a previous benchmark run.
+        threshold (float):          Relative slowdown, which is reported as regression.
+
+    Returns:
+        regressions (list of str):  Configurations with a throughput regression.
+    """
+    with open(path_reference, "r") as fd:
+        reference = {__config_key__(r): r for r in json.load(fd)["results"]}
+    regressions = []
+    for r in results:
+        key = __config_key__(r)
+        if key not in reference or "error" in reference[key] : continue
+        # Failed configurations are reported as regression
+        if "error" in r:
+            regressions.append(key)
+            print(key + " : FAILED (" + r["error"] + ")  <- REGRESSION")
+            continue
+        ratio = r["samples_per_second"] / \
+                reference[key]["samples_per_second"]
+        flag = ""
+        if ratio < 1.0 - threshold:
+            regressions.append(key)
+            flag = "  <- REGRESSION"
+        print(key + " : %.2fx" % ratio + flag)
+    return regressions
+
+#-----------------------------------------------------#
+#                     Subroutines                     #
+#-----------------------------------------------------#
+# Internal function for reading a memory value (in MB) from /proc/self/status
+def __rss__(field):
+    try:
+        with open("/proc/self/status", "r") as fd:
+            for line in fd:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError : pass
+    # Fallback: peak resident memory via resource (kilobytes on Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Internal function for receiving the measurements of a configuration process
+# (polls the queue to detect crashed processes instead of blocking forever)
+def __receive__(process, queue, timeout):
+    start = time.perf_counter()
+    measurement = None
+    while measurement is None:
+        try : measurement = queue.get(timeout=1)
+        except Empty:
+            # Process terminated without measurements
+            if not process.is_alive():
+                process.join()
+                measurement = {"error": "exitcode " + str(process.exitcode)}
+            # Process exceeded the timeout
+            elif time.perf_counter() - start > timeout:
+                process.terminate()
+                measurement = {"error": "timeout after %ds" % timeout}
+    process.join()
+    return measurement
+
+# Internal function for creating a unique key of a configuration
+def __config_key__(result):
+    return result["dataset"] + "|workers=" + str(result["workers"]) + \
+           "|prepare=" + str(result["prepare_images"]) + \
+           "|aug=" + str(result["augmentation"])
+
+#-----------------------------------------------------#
+#                Main Method - Runner                 #
+#-----------------------------------------------------#
+def main():
+    parser = argparse.ArgumentParser(description="AUCMEDI data loading benchmark")
+    parser.add_argument("--output", type=str, default="benchmark_results.json",
+                        help="Path to the JSON file for storing the results")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Path to the JSON file of a previous run for comparison")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown, which is reported as regression")
+    parser.add_argument("--dimensions", type=str, nargs="+",
+                        default=["2D", "3D"], help="Dimensions of the datasets")
+    parser.add_argument("--formats", type=str, nargs="+",
+                        default=["png", "jpg", "npy", "nii.gz", "mha", "cache"],
+                        help="File formats of the datasets")
+    parser.add_argument("--samples", type=int, default=64,
+                        help="Number of samples per dataset")
+    parser.add_argument("--shape_2d", type=int, nargs=2, default=[512, 512],
+                        help="Image shape of the 2D datasets")
+    parser.add_argument("--shape_3d", type=int, nargs=3, default=[96, 96, 96],
+                        help="Image shape of the 3D datasets")
+    parser.add_argument("--resize_2d", type=int, nargs=2, default=[224, 224],
+                        help="Resize shape for 2D datasets")
+    parser.add_argument("--resize_3d", type=int, nargs=3, default=[64, 64, 64],
+                        help="Resize shape for 3D datasets")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4],
+                        help="Worker counts of the DataGenerator")
+    parser.add_argument("--batch_size", type=int, default=8,
+                        help="Batch size of the DataGenerator")
+    parser.add_argument("--epochs", type=int, default=2,
+                        help="Number of epochs per configuration")
+    parser.add_argument("--timeout", type=int, default=3600,
+                        help="Timeout in seconds per configuration")
+    parser.add_argument("--verbose", type=int, default=1,
+                        help="Option (0/1) whether results are printed")
+    args = parser.parse_args()
+
+    # Run benchmark
+    results = run_benchmark(args)
+    # Store results with system information
+    meta = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "arguments": vars(args)}
+    try:
+        from importlib.metadata import version
+        meta["aucmedi"] = version("aucmedi")
+    except Exception : meta["aucmedi"] = None
+    with open(args.output, "w") as fd:
+        json.dump({"meta": meta, "results": results}, fd, indent=2)
+    # Compare with previous results
+    if args.compare is not None:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if len(regressions) > 0 : sys.exit(1)
+
+if __name__ == "__main__":
+    main()
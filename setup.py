@@ -31,6 +31,7 @@ setup(
                       'numpy>=1.23.0',
                       'pillow>=9.3.0',
                       'albumentations>=1.3.0',
+                      'opencv-python-headless>=4.1.1',
                       'pandas>=1.5.0',
                       'scikit-learn>=1.1.0',
                       'scikit-image>=0.19.1',
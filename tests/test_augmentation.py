@@ -100,6 +100,57 @@ class AugmentationTEST(unittest.TestCase):
         data_augRGB = data_aug.apply(self.imgRGB2d)
         self.assertFalse(np.array_equal(data_augRGB, self.imgRGB2d))
 
+    # Batch Mode: Vectorized Augmentation
+    def test_IMAGE_batchmode(self):
+        batch = np.stack([self.imgRGB2d] * 8, axis=0)
+        batch_uint8 = np.uint8(batch)
+        # Check exclusion of vectorized transformations from the operator
+        data_aug = ImageAugmentation(flip=True, rotate=True, brightness=True,
+                     contrast=True, saturation=False, hue=False, scale=True,
+                     gamma=True, batch_mode=True)
+        self.assertEqual(len(data_aug.operator.transforms), 1)
+        # Check identical results for brightness, contrast & gamma changes
+        for uint8 in [False, True]:
+            if uint8 : data = batch_uint8
+            else : data = np.clip(batch / 255, 0, 1).astype(np.float32)
+            aug_list = []
+            for batch_mode in [False, True]:
+                data_aug = ImageAugmentation(flip=False, rotate=False,
+                             brightness=True, contrast=True, saturation=False,
+                             hue=False, scale=False, gamma=True,
+                             batch_mode=batch_mode)
+                data_aug.aug_brightness_limits = (0.05, 0.05)
+                data_aug.aug_contrast_limits = (-0.1, -0.1)
+                data_aug.aug_gamma_limit = (120, 120)
+                data_aug.aug_brightness_p = 1.0
+                data_aug.aug_contrast_p = 1.0
+                data_aug.aug_gamma_p = 1.0
+                data_aug.build()
+                aug_list.append(data_aug)
+            res_sample = np.stack([aug_list[0].apply(img) for img in data])
+            res_batch = aug_list[1].apply_batch(data)
+            self.assertEqual(res_batch.dtype, data.dtype)
+            self.assertTrue(np.allclose(res_sample, res_batch, atol=1e-5))
+        # Check flipping & rotation for square and non-square images
+        for data in [batch_uint8, batch_uint8[:, :, :12]]:
+            data_aug = ImageAugmentation(flip=True, rotate=True,
+                         brightness=False, contrast=False, saturation=False,
+                         hue=False, scale=False, batch_mode=True)
+            data_aug.aug_flip_p = 1.0
+            data_aug.aug_rotate_p = 1.0
+            res_batch = data_aug.apply_batch(data)
+            self.assertEqual(res_batch.shape, data.shape)
+            self.assertFalse(np.array_equal(res_batch, data))
+        # Check that unselected samples are retained
+        data_aug = ImageAugmentation(flip=True, rotate=True, brightness=True,
+                     contrast=True, saturation=False, hue=False, scale=False,
+                     gamma=True, batch_mode=True)
+        for p in ["flip", "rotate", "brightness", "contrast", "gamma"]:
+            setattr(data_aug, "aug_" + p + "_p", 0.0)
+        for data in [batch_uint8, np.float64(batch)]:
+            res_batch = data_aug.apply_batch(data)
+            self.assertTrue(np.array_equal(res_batch, data))
+
     #-------------------------------------------------#
     #               Volume Functionality              #
     #-------------------------------------------------#
@@ -177,6 +177,39 @@ class AutoML_block_train(unittest.TestCase):
         self.assertTrue(os.path.exists(os.path.join(output_dir.name, "meta.training.json")))
         self.assertTrue(os.path.exists(os.path.join(output_dir.name, "plot.fitting_course.png")))
 
+    def test_minimal_shards(self):
+        for three_dim in [False, True]:
+            # Initialize temporary directories
+            output_dir = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                     suffix=".output")
+            shard_dir = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                    suffix=".shards")
+            if three_dim : path_imagedir = self.tmp_data3D.name
+            else : path_imagedir = self.tmp_data2D.name
+            # Define config
+            config = {
+                "interface": "csv",
+                "path_imagedir": path_imagedir,
+                "path_gt": self.tmp_csv.name,
+                "path_modeldir": output_dir.name,
+                "path_shards": shard_dir.name,
+                "analysis": "minimal",
+                "ohe": False,
+                "three_dim": three_dim,
+                "shape_3D": (16, 16, 16),
+                "epochs": 2,
+                "batch_size": 4,
+                "workers": 1,
+                "metalearner": "logistic_regression",
+                "architecture": "Vanilla"
+            }
+            # Run AutoML training block
+            block_train(config)
+
+            self.assertTrue(os.path.exists(os.path.join(output_dir.name, "model.last.hdf5")))
+            self.assertTrue(os.path.exists(os.path.join(shard_dir.name, "index.json")))
+            self.assertTrue(os.path.exists(os.path.join(shard_dir.name, "shard.00000.bin")))
+
     #-------------------------------------------------#
     #                Analysis: Standard               #
     #-------------------------------------------------#
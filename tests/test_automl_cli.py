@@ -116,6 +116,8 @@ class AutoML_CLI(unittest.TestCase):
                       "path_modeldir",
                       "analysis",
                       "ohe",
+                      "path_shards",
+                      "path_manifest",
                       "three_dim",
                       "shape_3D",
                       "epochs",
@@ -168,6 +170,7 @@ class AutoML_CLI(unittest.TestCase):
         config_map = ["path_imagedir",
                       "path_modeldir",
                       "path_pred",
+                      "path_manifest",
                       "xai_method",
                       "xai_directory",
                       "batch_size",
@@ -22,6 +22,7 @@
 #External libraries
 import unittest
 import numpy as np
+from scipy import sparse
 #Internal libraries
 from aucmedi.utils.class_weights import *
 
@@ -77,3 +78,24 @@ class classweightTEST(unittest.TestCase):
         self.assertTrue(isinstance(class_weights[10], float))
         self.assertTrue(isinstance(class_weights[20], float))
         self.assertTrue(isinstance(class_weights[24], float))
+
+    #-------------------------------------------------#
+    #         Weights for sparse annotations          #
+    #-------------------------------------------------#
+    def test_weights_sparse(self):
+        labels_sparse = sparse.csr_matrix(self.labels_ohe)
+        # Check class weights
+        cwl, cwd = compute_class_weights(labels_sparse)
+        self.assertTrue(np.allclose(cwl, compute_class_weights(self.labels_ohe)[0]))
+        # Check multi-label weights
+        class_weights = compute_multilabel_weights(labels_sparse)
+        self.assertTrue(np.allclose(class_weights,
+                                    compute_multilabel_weights(self.labels_ohe)))
+        class_weights = compute_multilabel_weights(labels_sparse,
+                                                   method={0: 1.0, 1: 2.0})
+        self.assertTrue(np.allclose(class_weights, 2.0))
+        # Check sample weights
+        sample_weights = compute_sample_weights(labels_sparse)
+        self.assertTrue(np.allclose(sample_weights,
+                                    compute_sample_weights(self.labels_ohe)))
+        self.assertEqual(len(sample_weights), 25)
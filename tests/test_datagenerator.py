@@ -22,13 +22,29 @@
 #External libraries
 import unittest
 import numpy as np
+from scipy import sparse
 import tempfile
 from PIL import Image
 import os
 import shutil
+import pickle
+import time
+import sys
+import threading
+from multiprocessing.pool import ThreadPool
+import multiprocessing as mp
+import gc
+from tensorflow.keras.preprocessing.image import Iterator
 #Internal libraries
-from aucmedi import DataGenerator
+from aucmedi import DataGenerator, ImageAugmentation, VolumeAugmentation
 from aucmedi.data_processing.io_loader import numpy_loader
+from aucmedi.data_processing.io_cache import DiskCache, ReadAhead
+from aucmedi.data_processing.profiler import Profiler
+from aucmedi.data_processing.subfunctions import Padding
+from aucmedi.data_processing.shuffling import BlockShuffle
+from aucmedi.data_processing.load_policy import LoadPolicy
+from aucmedi.data_processing.sample_table import SampleTable
+from aucmedi.data_processing.io_shards import build_shards
 
 #-----------------------------------------------------#
 #               Unittest: Data Generator              #
@@ -204,6 +220,150 @@ class DataGeneratorTEST(unittest.TestCase):
             self.assertTrue(len(batch), 2)
             self.assertTrue(np.array_equal(batch[1].shape, (5, 4)))
 
+    def test_MP_persistentPool(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe,
+                                 grayscale=False, batch_size=5, workers=5)
+        batch = next(data_gen)
+        pool = data_gen.pool_workers
+        self.assertIsNotNone(pool)
+        for i in range(0, 5):
+            batch = next(data_gen)
+        self.assertIs(data_gen.pool_workers, pool)
+
+    #-------------------------------------------------#
+    #                   Prefetching                   #
+    #-------------------------------------------------#
+    def test_Prefetch_getitem(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, resize=None,
+                                 grayscale=False, batch_size=5)
+        data_gen_pf = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                    labels=self.labels_ohe, resize=None,
+                                    grayscale=False, batch_size=5, prefetch=2)
+        for i in range(0, len(data_gen)):
+            batch = data_gen[i]
+            batch_pf = data_gen_pf[i]
+            self.assertTrue(np.array_equal(batch[0], batch_pf[0]))
+            self.assertTrue(np.array_equal(batch[1], batch_pf[1]))
+            self.assertTrue(len(data_gen_pf.prefetch_queue) <= 2)
+
+    def test_Prefetch_seeded(self):
+        # Keras Iterator which returns the sample indices of a batch
+        class IndexIterator(Iterator):
+            def _get_batches_of_transformed_samples(self, index_array):
+                return index_array
+        # Seeded shuffling is identical to the Keras Sequence access
+        for prefetch, read_ahead in [(0, None), (2, None), (0, 10), (2, 10)]:
+            iterator = IndexIterator(25, 5, shuffle=True, seed=3)
+            data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                     labels=np.arange(25), resize=None,
+                                     grayscale=False, batch_size=5,
+                                     shuffle=True, seed=3, prefetch=prefetch,
+                                     read_ahead=read_ahead)
+            for i in range(0, len(data_gen)):
+                self.assertTrue(np.array_equal(data_gen[i][1], iterator[i]))
+            self.assertTrue(np.array_equal(data_gen.index_array,
+                                           iterator.index_array))
+
+    def test_Prefetch_next(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 resize=None, grayscale=False, batch_size=5)
+        data_gen_pf = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                    resize=None, grayscale=False, batch_size=5,
+                                    workers=2, prefetch=3)
+        for i in range(0, 12):
+            batch = next(data_gen)
+            batch_pf = next(data_gen_pf)
+            self.assertTrue(np.array_equal(batch[0], batch_pf[0]))
+        data_gen_pf.reset()
+        self.assertTrue(len(data_gen_pf.prefetch_queue) == 0)
+        self.assertIsNone(data_gen_pf.pool_prefetch)
+
+    def test_MP_processes(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 resize=None, grayscale=False, batch_size=5)
+        data_gen_mp = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                    resize=None, grayscale=False, batch_size=5,
+                                    workers=3, multiprocessing=True)
+        for i in range(0, len(data_gen)):
+            batch = data_gen[i]
+            batch_mp = data_gen_mp[i]
+            self.assertTrue(np.array_equal(batch[0], batch_mp[0]))
+        self.assertFalse(isinstance(data_gen_mp.pool_workers, ThreadPool))
+        self.assertTrue(len(data_gen_mp.shm_blocks) == 1)
+        data_gen_mp._shutdown_pools()
+        self.assertTrue(len(data_gen_mp.shm_blocks) == 0)
+
+    def test_MP_pool_config(self):
+        # Worker pool is created on initialization
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 resize=None, grayscale=False, batch_size=5,
+                                 workers=2, prefetch=2)
+        self.assertTrue(isinstance(data_gen.pool_workers, ThreadPool))
+        pool_threads = data_gen.pool_workers
+        batch = data_gen[0]
+        # Changing the multi-processing option switches the worker pool
+        data_gen.multiprocessing = True
+        self.assertFalse(isinstance(data_gen.pool_workers, ThreadPool))
+        pool_processes = data_gen.pool_workers
+        self.assertTrue(np.array_equal(data_gen[0][0], batch[0]))
+        # One pool is kept for each option
+        for multiprocessing in [False, True, False]:
+            data_gen.multiprocessing = multiprocessing
+            if multiprocessing : pool = pool_processes
+            else : pool = pool_threads
+            self.assertIs(data_gen.pool_workers, pool)
+        # Changing the number of workers rebuilds the worker pools on access
+        data_gen.workers = 3
+        self.assertTrue(np.array_equal(data_gen[0][0], batch[0]))
+        self.assertEqual(data_gen.pool_workers._processes, 3)
+        self.assertEqual(len(data_gen.pools), 1)
+        data_gen._shutdown_pools()
+
+    def test_MP_pool_cleanup(self):
+        # Worker processes are stopped with the garbage collection of the DataGenerator
+        children = len(mp.active_children())
+        gens = [DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                              resize=None, grayscale=False, batch_size=5,
+                              workers=2, multiprocessing=True) \
+                for i in range(0, 3)]
+        batch = gens[0][0]
+        self.assertEqual(len(mp.active_children()), children + 6)
+        del gens
+        gc.collect()
+        self.assertEqual(len(mp.active_children()), children)
+
+    #-------------------------------------------------#
+    #               Preallocated Batches              #
+    #-------------------------------------------------#
+    def test_Batch_preallocated(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, metadata=self.metadata,
+                                 sample_weights=np.arange(25) / 25,
+                                 grayscale=False, batch_size=5, resize=(8, 8),
+                                 workers=2)
+        batch = data_gen[1]
+        self.assertEqual(data_gen.sample_spec[0], (8, 8, 3))
+        self.assertTrue(np.array_equal(batch[0][0].shape, (5, 8, 8, 3)))
+        self.assertTrue(np.array_equal(batch[0][1], self.metadata[5:10]))
+        self.assertTrue(np.array_equal(batch[1], self.labels_ohe[5:10]))
+        self.assertTrue(np.array_equal(batch[2], np.arange(5, 10) / 25))
+        for i in range(0, 5):
+            img = data_gen.preprocess_image(5 + i)
+            self.assertTrue(np.array_equal(batch[0][0][i], img))
+
+    def test_Batch_varyingShapes(self):
+        sample_list = [self.sampleList_rgb_2D[0], self.sampleList_rgb_3D[0]]
+        data_gen = DataGenerator(sample_list, self.tmp_data.name,
+                                 grayscale=False, batch_size=1, resize=None,
+                                 loader=numpy_loader, two_dim=False)
+        data_gen.sample_loader = lambda sample, *args, **kwargs: \
+            np.zeros((4, 4, 3)) if sample.endswith(".png") \
+            else np.zeros((6, 6, 6, 3))
+        self.assertTrue(np.array_equal(data_gen[0][0].shape, (1, 4, 4, 3)))
+        self.assertTrue(np.array_equal(data_gen[1][0].shape, (1, 6, 6, 6, 3)))
+
     #-------------------------------------------------#
     #             Beforehand Preprocessing            #
     #-------------------------------------------------#
@@ -230,3 +390,482 @@ class DataGeneratorTEST(unittest.TestCase):
             self.assertTrue(len(batch), 2)
             self.assertTrue(np.array_equal(batch[1].shape, (5, 4)))
         shutil.rmtree(data_gen.prepare_dir)
+
+    def test_PrepareImages_MP_processes(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, prepare_images=True,
+                                 grayscale=False, batch_size=5, workers=3,
+                                 multiprocessing=True)
+        precprocessed_images = os.listdir(data_gen.prepare_dir)
+        self.assertTrue(len(precprocessed_images), len(self.sampleList_rgb_2D))
+        for i in range(0, 10):
+            batch = next(data_gen)
+            self.assertTrue(len(batch), 2)
+            self.assertTrue(np.array_equal(batch[1].shape, (5, 4)))
+        shutil.rmtree(data_gen.prepare_dir)
+
+    def test_PrepareImages_store(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 grayscale=False, batch_size=5, resize=(8, 8))
+        data_gen_prep = DataGenerator(self.sampleList_rgb_2D,
+                                      self.tmp_data.name, grayscale=False,
+                                      batch_size=5, resize=(8, 8),
+                                      prepare_images=True)
+        self.assertIsNotNone(data_gen_prep.prepared_store)
+        self.assertEqual(os.listdir(data_gen_prep.prepare_dir), ["store"])
+        for i in range(0, len(data_gen)):
+            self.assertTrue(np.allclose(data_gen[i][0], data_gen_prep[i][0]))
+        # Reuse store for a subset of samples
+        data_gen_sub = DataGenerator(self.sampleList_rgb_2D[5:10],
+                                     self.tmp_data.name, grayscale=False,
+                                     batch_size=5, resize=(8, 8),
+                                     prepared_store=data_gen_prep.prepared_store)
+        self.assertTrue(data_gen_sub.prepare_images)
+        self.assertTrue(np.allclose(data_gen_sub[0][0], data_gen[1][0]))
+        self.assertRaises(ValueError, DataGenerator, self.sampleList_gray_2D,
+                          self.tmp_data.name, resize=(8, 8),
+                          prepared_store=data_gen_prep.prepared_store)
+        # Reject store which was prepared at another resize shape
+        self.assertRaises(ValueError, DataGenerator, self.sampleList_rgb_2D,
+                          self.tmp_data.name, resize=(16, 16),
+                          prepared_store=data_gen_prep.prepared_store)
+
+    def test_PrepareImages_store_dtype(self):
+        data_gen = DataGenerator(self.sampleList_rgb_3D, self.tmp_data.name,
+                                 grayscale=False, batch_size=5,
+                                 resize=(8, 8, 8), loader=numpy_loader,
+                                 two_dim=False, prepare_images=True,
+                                 prepare_dtype="float16", workers=3)
+        self.assertEqual(np.dtype(data_gen.prepared_store.dtype), np.float16)
+        for i in range(0, 5):
+            batch = next(data_gen)
+            self.assertTrue(np.array_equal(batch[0].shape, (5, 8, 8, 8, 3)))
+            self.assertEqual(batch[0].dtype, np.float32)
+
+    #-------------------------------------------------#
+    #              Persistent Disk Cache              #
+    #-------------------------------------------------#
+    def test_DiskCache(self):
+        tmp_cache = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                suffix=".cache")
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 grayscale=False, batch_size=5, resize=(8, 8))
+        data_gen_cache = DataGenerator(self.sampleList_rgb_2D,
+                                       self.tmp_data.name, grayscale=False,
+                                       batch_size=5, resize=(8, 8),
+                                       disk_cache=tmp_cache.name)
+        self.assertTrue(isinstance(data_gen_cache.disk_cache, DiskCache))
+        # First epoch fills the cache, second epoch reads from the cache
+        for epoch in range(0, 2):
+            for i in range(0, len(data_gen)):
+                self.assertTrue(np.allclose(data_gen[i][0],
+                                            data_gen_cache[i][0]))
+        self.assertEqual(len(data_gen_cache.disk_cache._scan_entries()), 25)
+        # Different preprocessing results into new cache entries
+        data_gen_sf = DataGenerator(self.sampleList_rgb_2D[:5],
+                                    self.tmp_data.name, grayscale=False,
+                                    batch_size=5, resize=(8, 8),
+                                    subfunctions=[Padding(shape=(20, 20))],
+                                    disk_cache=data_gen_cache.disk_cache)
+        data_gen_sf[0]
+        self.assertEqual(len(data_gen_cache.disk_cache._scan_entries()), 30)
+
+    #-------------------------------------------------#
+    #               In-Memory LRU Cache               #
+    #-------------------------------------------------#
+    def test_MemoryCache(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 grayscale=False, batch_size=5, resize=(8, 8),
+                                 standardize_mode="torch")
+        data_gen_cache = DataGenerator(self.sampleList_rgb_2D,
+                                       self.tmp_data.name, grayscale=False,
+                                       batch_size=5, resize=(8, 8),
+                                       standardize_mode="torch",
+                                       memory_cache=10*1024**2, workers=2)
+        for epoch in range(0, 2):
+            for i in range(0, len(data_gen)):
+                self.assertTrue(np.allclose(data_gen[i][0],
+                                            data_gen_cache[i][0]))
+        stats = data_gen_cache.memory_cache.statistics()
+        self.assertEqual(stats["misses"], 25)
+        self.assertEqual(stats["hits"], 25)
+        self.assertEqual(stats["evictions"], 0)
+
+    #-------------------------------------------------#
+    #              TensorFlow Dataset Export          #
+    #-------------------------------------------------#
+    def test_ReadAhead(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, resize=None,
+                                 grayscale=False, batch_size=5, shuffle=True,
+                                 seed=0)
+        data_gen_ra = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                    labels=self.labels_ohe, resize=None,
+                                    grayscale=False, batch_size=5, shuffle=True,
+                                    seed=0, read_ahead=10, workers=2)
+        self.assertTrue(isinstance(data_gen_ra.read_ahead, ReadAhead))
+        for i in range(0, len(data_gen)):
+            batch = data_gen[i]
+            batch_ra = data_gen_ra[i]
+            self.assertTrue(np.array_equal(batch[0], batch_ra[0]))
+            self.assertTrue(np.array_equal(batch[1], batch_ra[1]))
+        for i in range(0, len(data_gen)):
+            self.assertTrue(np.array_equal(next(data_gen)[0],
+                                           next(data_gen_ra)[0]))
+        stats = data_gen_ra.read_ahead.statistics()
+        self.assertEqual(stats["hits"] + stats["misses"], 50)
+        self.assertTrue(stats["hits"] > 0)
+
+    def test_ReadAhead_staging(self):
+        tmp_staging = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                  suffix=".staging")
+        read_ahead = ReadAhead(window=8, workers=2,
+                               staging_dir=tmp_staging.name)
+        data_gen = DataGenerator(self.sampleList_rgb_3D, self.tmp_data.name,
+                                 labels=self.labels_ohe, resize=None,
+                                 grayscale=False, batch_size=4, two_dim=False,
+                                 loader=numpy_loader, read_ahead=read_ahead,
+                                 standardize_mode=None, profiling=True)
+        for i in range(0, len(data_gen)):
+            batch = data_gen[i]
+            for j, index in enumerate(data_gen.index_array[i*4:(i+1)*4]):
+                img = np.load(os.path.join(self.tmp_data.name,
+                                       self.sampleList_rgb_3D[index]))
+                self.assertTrue(np.allclose(batch[0][j], img))
+        self.assertTrue(read_ahead.statistics()["hits"] > 0)
+        self.assertEqual(data_gen.profiler.summary()["read_ahead"]["calls"],
+                         25)
+        # Staged files are removed after loading
+        staged = [f for _, _, files in os.walk(read_ahead.staging_root) \
+                  for f in files]
+        self.assertEqual(len(staged), 0)
+        read_ahead.close()
+        self.assertEqual(len(os.listdir(tmp_staging.name)), 0)
+        tmp_staging.cleanup()
+
+    def test_ReadAhead_staging_duplicates(self):
+        tmp_staging = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                  suffix=".staging")
+        read_ahead = ReadAhead(window=8, workers=2,
+                               staging_dir=tmp_staging.name)
+        # Schedule a file again before the previous load released it
+        file = self.sampleList_rgb_3D[0]
+        read_ahead.schedule(self.tmp_data.name, [file])
+        path_first = read_ahead.get(self.tmp_data.name, file)
+        read_ahead.schedule(self.tmp_data.name, [file])
+        read_ahead.release(path_first, file)
+        path_second = read_ahead.get(self.tmp_data.name, file)
+        self.assertEqual(path_first, path_second)
+        img = np.load(os.path.join(path_second, file))
+        read_ahead.release(path_second, file)
+        self.assertFalse(os.path.exists(os.path.join(path_second, file)))
+        # Check duplicated samples within the look-ahead window
+        samples = list(np.repeat(self.sampleList_rgb_3D[:10], 5))
+        labels = np.repeat(self.labels_ohe[:10], 5, axis=0)
+        data_gen = DataGenerator(samples, self.tmp_data.name, labels=labels,
+                                 resize=None, grayscale=False, batch_size=4,
+                                 two_dim=False, loader=numpy_loader,
+                                 read_ahead=read_ahead, shuffle=True, seed=0,
+                                 standardize_mode=None, workers=2)
+        for i in range(0, len(data_gen)):
+            batch = data_gen[i]
+            for j, index in enumerate(data_gen.index_array[i*4:(i+1)*4]):
+                img = np.load(os.path.join(self.tmp_data.name, samples[index]))
+                self.assertTrue(np.allclose(batch[0][j], img))
+        read_ahead.clear()
+        staged = [f for _, _, files in os.walk(read_ahead.staging_root) \
+                  for f in files]
+        self.assertEqual(len(staged), 0)
+        read_ahead.close()
+        tmp_staging.cleanup()
+
+    def test_LoadPolicy_concurrent(self):
+        # Frequent thread switches expose lost wake-ups between the reads
+        policy = LoadPolicy(hedge_percentile=None, workers=4)
+        counts = [0] * 8
+        def run(thread):
+            for i in range(0, 1000):
+                self.assertEqual(policy.load(lambda x: x + 1, i), i + 1)
+                counts[thread] += 1
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=run, args=(t,), daemon=True) \
+                       for t in range(0, 8)]
+            for t in threads : t.start()
+            for t in threads : t.join(timeout=60)
+        finally : sys.setswitchinterval(interval)
+        self.assertEqual(sum(counts), 8000)
+        self.assertEqual(policy.statistics()["loads"], 8000)
+        policy.close()
+
+    def test_LoadPolicy(self):
+        # Simulate a straggling sample on slow storage
+        slow = self.sampleList_rgb_3D[20]
+        calls = []
+        def slow_loader(sample, path_imagedir, transient=False, **kwargs):
+            if sample == slow and not (transient and slow in calls):
+                calls.append(sample)
+                time.sleep(0.5)
+            return numpy_loader(sample, path_imagedir, **kwargs)
+        # Check hedged reads
+        policy = LoadPolicy(hedge_percentile=90, hedge_min_samples=5,
+                            workers=2)
+        data_gen = DataGenerator(self.sampleList_rgb_3D, self.tmp_data.name,
+                                 labels=self.labels_ohe, resize=None,
+                                 grayscale=False, batch_size=5, two_dim=False,
+                                 loader=slow_loader, load_policy=policy,
+                                 transient=True)
+        for i in range(0, len(data_gen)) : data_gen[i]
+        stats = policy.statistics()
+        self.assertTrue(stats["hedges"] >= 1)
+        self.assertTrue(stats["hedge_wins"] >= 1)
+        self.assertEqual(stats["stragglers"], stats["hedges"])
+        self.assertTrue(stats["threshold"] < 0.5)
+        # Check fallback policies after deadline
+        for fallback in ["retry", "fail", "substitute"]:
+            policy = LoadPolicy(timeout=0.1, hedge_percentile=None,
+                                fallback=fallback, retries=2)
+            data_gen = DataGenerator(self.sampleList_rgb_3D, self.tmp_data.name,
+                                     labels=self.labels_ohe, resize=None,
+                                     grayscale=False, batch_size=5,
+                                     two_dim=False, loader=slow_loader,
+                                     load_policy=policy)
+            if fallback == "substitute":
+                batch = data_gen[4]
+                self.assertEqual(batch[0].shape, (5, 16, 16, 16, 3))
+                self.assertEqual(policy.statistics()["substitutions"], 1)
+            else : self.assertRaises(TimeoutError, data_gen.__getitem__, 4)
+            stats = policy.statistics()
+            if fallback == "retry" : self.assertEqual(stats["retries"], 2)
+            if fallback == "retry" : self.assertEqual(stats["timeouts"], 3)
+            else : self.assertEqual(stats["timeouts"], 1)
+        self.assertRaises(ValueError, LoadPolicy, fallback="skip")
+        # Check propagation of IO_loader errors
+        policy = LoadPolicy(timeout=1.0)
+        self.assertRaises(FileNotFoundError, policy.load, numpy_loader,
+                          "missing", self.tmp_data.name)
+
+    def test_SampleTable(self):
+        samples = SampleTable(self.sampleList_rgb_2D)
+        # Check sequence access and zero-copy views
+        self.assertEqual(len(samples), 25)
+        self.assertEqual(samples[3], self.sampleList_rgb_2D[3])
+        self.assertEqual(samples.tolist(), self.sampleList_rgb_2D)
+        view = samples[5:15][np.array([0, 2, -1])]
+        self.assertTrue(view.buffer is samples.buffer)
+        self.assertEqual(list(view), [self.sampleList_rgb_2D[i] \
+                                      for i in [5, 7, 14]])
+        self.assertEqual(list(samples.repeat(2)),
+                         list(np.repeat(self.sampleList_rgb_2D, 2)))
+        # Check pickling of views with only referenced bytes
+        view_pickled = pickle.loads(pickle.dumps(view))
+        self.assertEqual(list(view_pickled), list(view))
+        self.assertTrue(len(view_pickled.buffer) < len(samples.buffer))
+        # Check DataGenerator with SampleTable via threads and processes
+        for workers, mp in [(1, False), (2, False), (2, True)]:
+            data_gen = DataGenerator(samples[:20], self.tmp_data.name,
+                                     labels=self.labels_ohe[:20],
+                                     grayscale=False, batch_size=6,
+                                     resize=(8, 8), shuffle=True, seed=1,
+                                     workers=workers, multiprocessing=mp)
+            data_ref = DataGenerator(self.sampleList_rgb_2D[:20],
+                                     self.tmp_data.name,
+                                     labels=self.labels_ohe[:20],
+                                     grayscale=False, batch_size=6,
+                                     resize=(8, 8), shuffle=True, seed=1)
+            for i in range(0, len(data_gen)):
+                batch, batch_ref = data_gen[i], data_ref[i]
+                self.assertTrue(np.array_equal(batch[0], batch_ref[0]))
+                self.assertTrue(np.array_equal(batch[1], batch_ref[1]))
+
+    def test_SparseLabels(self):
+        labels_sparse = sparse.csr_matrix(self.labels_ohe)
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=labels_sparse, grayscale=False,
+                                 batch_size=6, resize=(8, 8), shuffle=True,
+                                 seed=1)
+        data_ref = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, grayscale=False,
+                                 batch_size=6, resize=(8, 8), shuffle=True,
+                                 seed=1)
+        # Check densified labels of each batch
+        for i in range(0, len(data_gen)):
+            batch, batch_ref = data_gen[i], data_ref[i]
+            self.assertTrue(isinstance(batch[1], np.ndarray))
+            self.assertTrue(np.array_equal(batch[1], batch_ref[1]))
+            self.assertTrue(np.array_equal(batch[0], batch_ref[0]))
+        # Check densified labels in tf.data pipeline
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=labels_sparse, grayscale=False,
+                                 batch_size=6, resize=(8, 8), shuffle=False)
+        for i, batch in enumerate(data_gen.as_tf_dataset()):
+            self.assertEqual(batch[1].shape[1], 4)
+            self.assertTrue(np.array_equal(batch[1].numpy(),
+                                           self.labels_ohe[i*6:(i+1)*6]))
+        # Check substitution of samples with identical sparse labels
+        policy = LoadPolicy(fallback="substitute")
+        substitute = policy.substitute(0, labels_sparse)
+        self.assertTrue(substitute != 0)
+        self.assertTrue(np.array_equal(self.labels_ohe[substitute],
+                                       self.labels_ohe[0]))
+        policy.close()
+
+    def test_TFDataset(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, metadata=self.metadata,
+                                 sample_weights=np.arange(25) / 25,
+                                 grayscale=False, batch_size=6, resize=(8, 8))
+        for cache in [False, True]:
+            dataset = data_gen.as_tf_dataset(cache=cache)
+            n_batches = 0
+            for i, batch in enumerate(dataset):
+                batch_ref = data_gen[i]
+                self.assertTrue(np.allclose(batch[0][0].numpy(),
+                                            batch_ref[0][0]))
+                self.assertTrue(np.array_equal(batch[0][1].numpy(),
+                                               batch_ref[0][1]))
+                self.assertTrue(np.array_equal(batch[1].numpy(), batch_ref[1]))
+                self.assertTrue(np.allclose(batch[2].numpy(), batch_ref[2]))
+                n_batches += 1
+            self.assertEqual(n_batches, len(data_gen))
+
+    def test_TFDataset_augmentation(self):
+        data_gen = DataGenerator(self.sampleList_rgb_3D, self.tmp_data.name,
+                                 grayscale=False, batch_size=10, resize=None,
+                                 loader=numpy_loader, two_dim=False,
+                                 data_aug=VolumeAugmentation(), shuffle=True,
+                                 standardize_mode="minmax")
+        dataset = data_gen.as_tf_dataset(cache=True, prefetch=2,
+                                         num_parallel_calls=2)
+        for epoch in range(0, 2):
+            shapes = [batch[0].shape for batch in dataset]
+            self.assertEqual(len(shapes), 3)
+            self.assertTrue(np.array_equal(shapes[0], (10, 16, 16, 16, 3)))
+
+    def test_AugmentationBatchMode(self):
+        data_aug = ImageAugmentation(saturation=False, hue=False, scale=False,
+                                     gamma=True, batch_mode=True)
+        profiler = Profiler()
+        # Check batch augmentation & standardization for all worker modes
+        for workers, multiprocessing in [(0, False), (2, False), (2, True)]:
+            data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                     grayscale=False, batch_size=10,
+                                     resize=(8, 8), data_aug=data_aug,
+                                     standardize_mode="minmax",
+                                     workers=workers, profiling=profiler,
+                                     multiprocessing=multiprocessing)
+            for i in range(0, len(data_gen)):
+                batch = data_gen[i]
+                self.assertEqual(batch[0].shape[1:], (8, 8, 3))
+                self.assertTrue(np.min(batch[0]) >= 0.0)
+                self.assertTrue(np.max(batch[0]) <= 1.0)
+            data_gen._shutdown_pools()
+        self.assertIn("augmentation_batch", profiler.summary())
+        # Check batch augmentation in tf.data pipeline
+        for cache in [False, True]:
+            dataset = data_gen.as_tf_dataset(cache=cache)
+            shapes = [batch[0].shape for batch in dataset]
+            self.assertEqual(len(shapes), 3)
+            self.assertTrue(np.array_equal(shapes[0], (10, 8, 8, 3)))
+
+    #-------------------------------------------------#
+    #                    Profiling                    #
+    #-------------------------------------------------#
+    def test_BlockShuffle(self):
+        # Check permutation and bounded displacement of the storage order
+        shuffle = BlockShuffle(block_size=10, buffer_size=20)
+        perm = shuffle.permutation(1000, np.random.RandomState(0))
+        self.assertTrue(np.array_equal(np.sort(perm), np.arange(1000)))
+        self.assertFalse(np.array_equal(perm, np.arange(1000)))
+        self.assertTrue(np.array_equal(perm, shuffle.permutation(1000,
+                                            np.random.RandomState(0))))
+        self.assertEqual(len(shuffle.permutation(0)), 0)
+        # Check locality ordering
+        shuffle = BlockShuffle(block_size=5, buffer_size=1,
+                               locality=np.arange(25)[::-1])
+        perm = shuffle.permutation(25, np.random.RandomState(0))
+        for b in range(0, 5):
+            block = perm[b*5:(b+1)*5]
+            self.assertTrue(np.array_equal(block, np.sort(block)[::-1]))
+        self.assertRaises(ValueError, shuffle.permutation, 10)
+        self.assertRaises(ValueError, BlockShuffle, 0)
+        # Check DataGenerator iteration with seed
+        epochs = []
+        for _ in range(0, 2):
+            data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                     labels=self.labels_ohe, resize=None,
+                                     grayscale=False, batch_size=5, seed=1,
+                                     shuffle=BlockShuffle(block_size=5,
+                                                          buffer_size=5))
+            labels = np.concatenate([data_gen[i][1] \
+                                     for i in range(0, len(data_gen))])
+            self.assertTrue(np.array_equal(np.sort(data_gen.index_array),
+                                           np.arange(25)))
+            epochs.append(labels)
+        self.assertTrue(np.array_equal(epochs[0], epochs[1]))
+
+    def test_BlockShuffle_shards(self):
+        tmp_shards = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                 suffix=".shards")
+        samples = self.sampleList_rgb_2D[:10]
+        build_shards(samples, self.tmp_data.name, tmp_shards.name)
+        shuffle = BlockShuffle.from_shards(samples[::-1], tmp_shards.name,
+                                           block_size=10, buffer_size=1)
+        self.assertTrue(np.array_equal(shuffle.permutation(10),
+                                       np.arange(10)[::-1]))
+        tmp_shards.cleanup()
+
+    def test_TFDataset_BlockShuffle(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, grayscale=False,
+                                 batch_size=6, resize=(8, 8), seed=0,
+                                 shuffle=BlockShuffle(block_size=4,
+                                                      buffer_size=8))
+        dataset = data_gen.as_tf_dataset(cache=False)
+        for epoch in range(0, 2):
+            labels = np.concatenate([batch[1].numpy() for batch in dataset])
+            self.assertEqual(labels.shape, self.labels_ohe.shape)
+            self.assertTrue(np.array_equal(np.sort(labels, axis=0),
+                                           np.sort(self.labels_ohe, axis=0)))
+
+    def test_TFDataset_BlockShuffle_cache(self):
+        shuffle = BlockShuffle(block_size=4, buffer_size=8)
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 labels=self.labels_ohe, grayscale=False,
+                                 batch_size=6, resize=(8, 8), seed=0,
+                                 shuffle=shuffle)
+        # Track the loading order of the samples
+        loaded = []
+        tf_load = data_gen._tf_load
+        def track(index):
+            loaded.append(int(index))
+            return tf_load(index)
+        data_gen._tf_load = track
+        dataset = data_gen.as_tf_dataset(cache=True, num_parallel_calls=1)
+        for epoch in range(0, 2):
+            labels = np.concatenate([batch[1].numpy() for batch in dataset])
+            self.assertTrue(np.array_equal(np.sort(labels, axis=0),
+                                           np.sort(self.labels_ohe, axis=0)))
+        # Images are only loaded once and in block order
+        order = shuffle.permutation(len(self.sampleList_rgb_2D),
+                                    np.random.RandomState(0))
+        self.assertEqual(loaded, order.tolist())
+
+    def test_Profiling(self):
+        data_gen = DataGenerator(self.sampleList_rgb_2D, self.tmp_data.name,
+                                 grayscale=False, batch_size=5, resize=(8, 8),
+                                 subfunctions=[Padding(shape=(20, 20))],
+                                 workers=3, profiling=True)
+        self.assertTrue(isinstance(data_gen.profiler, Profiler))
+        for i in range(0, len(data_gen)) : data_gen[i]
+        summary = data_gen.profiler.summary()
+        for stage in ["loader", "subfunction.Padding", "resize", "standardize"]:
+            self.assertEqual(summary[stage]["calls"], 25)
+            self.assertTrue(summary[stage]["time"] > 0)
+        self.assertEqual(summary["batch"]["calls"], 5)
+        self.assertEqual(summary["resize"]["bytes"], 25 * 8 * 8 * 3)
+        df = data_gen.profiler.to_dataframe()
+        self.assertTrue("time_per_call" in df.columns)
+        data_gen.profiler.reset()
+        self.assertEqual(len(data_gen.profiler.summary()), 0)
@@ -27,8 +27,10 @@ from PIL import Image
 import numpy as np
 #Internal libraries
 from aucmedi import DataGenerator, NeuralNetwork, ImageAugmentation, VolumeAugmentation
-from aucmedi.data_processing.io_loader import numpy_loader
+from aucmedi.data_processing.io_loader import numpy_loader, cache_loader
+from aucmedi.data_processing.io_cache import SharedCache
 from aucmedi.ensemble import *
+from aucmedi.ensemble.preparation import __prepared_store__
 
 #-----------------------------------------------------#
 #                  Unittest: Ensemble                 #
@@ -179,6 +181,26 @@ class EnsembleTEST(unittest.TestCase):
         del el
         self.assertFalse(os.path.exists(path_tmp_bagging))
 
+    def test_Bagging_SharedCache(self):
+        # Pack images into shared memory
+        images = {}
+        for i in range(0, 3):
+            images["sample_" + str(i)] = np.random.rand(16, 16, 3) * 255
+        cache = SharedCache(images, grayscale=False, two_dim=True)
+        # Initialize training DataGenerator
+        datagen = DataGenerator(list(cache.keys()), None,
+                                labels=self.labels_ohe, batch_size=3,
+                                resize=None, loader=cache_loader, cache=cache,
+                                grayscale=False, standardize_mode="tf",
+                                workers=0)
+        # Run Bagging based training process in spawned processes
+        el = Bagging(model=self.model2D, k_fold=2)
+        hist = el.train(datagen, epochs=1, iterations=None)
+        self.assertTrue("cv_0.loss" in hist and "cv_1.loss" in hist)
+        # Check that the shared memory block outlived all folds
+        self.assertTrue(np.array_equal(cache["sample_2"], images["sample_2"]))
+        cache.close()
+
     def test_Bagging_predict(self):
         # Initialize training DataGenerator
         datagen = DataGenerator(self.sampleList2D, self.tmp_data.name,
@@ -334,6 +356,32 @@ class EnsembleTEST(unittest.TestCase):
         del el
         self.assertFalse(os.path.exists(path_tmp_bagging))
 
+    def test_Stacking_training_prepared(self):
+        # Initialize training DataGenerator with prepared images
+        datagen = DataGenerator(np.repeat(self.sampleList2D, 4),
+                                self.tmp_data.name,
+                                labels=np.repeat(self.labels_ohe, 4, axis=0),
+                                batch_size=3, resize=(16, 16),
+                                data_aug=None, grayscale=False, subfunctions=[],
+                                standardize_mode="tf", workers=0,
+                                prepare_images=True)
+        model_large = NeuralNetwork(n_labels=2, channels=3,
+                                    architecture="2D.Vanilla",
+                                    batch_queue_size=1, input_shape=(24, 24))
+        # Check PreparedStore for each input shape
+        prepared = {}
+        store = __prepared_store__(datagen, (16, 16), prepared)
+        self.assertIs(store, datagen.prepared_store)
+        store = __prepared_store__(datagen, (24, 24), prepared)
+        self.assertEqual(store.shape, (24, 24, 3))
+        self.assertIs(store, __prepared_store__(datagen, (24, 24),
+                                                prepared))
+        # Run Stacking based training process with heterogeneous input shapes
+        el = Stacking(model_list=[self.model2D, model_large],
+                      metalearner="mean")
+        hist = el.train(datagen, epochs=1, iterations=1)
+        self.assertTrue("nn_0.loss" in hist and "nn_1.loss" in hist)
+
     def test_Stacking_training_aggregate(self):
         # Initialize training DataGenerator
         datagen = DataGenerator(np.repeat(self.sampleList2D, 4),
@@ -23,6 +23,7 @@
 import unittest
 import numpy as np
 import pandas as pd
+from scipy import sparse
 import random
 import tempfile
 from PIL import Image
@@ -30,6 +31,8 @@ import os
 #Internal libraries
 from aucmedi import *
 from aucmedi.evaluation import *
+from aucmedi.evaluation.metrics import compute_metrics, \
+                                       compute_confusion_matrix, compute_roc
 
 #-----------------------------------------------------#
 #                 Unittest: Evaluation                #
@@ -483,3 +486,24 @@ class EvaluationTEST(unittest.TestCase):
         self.assertFalse(os.path.exists(path_plot))
         self.assertTrue(isinstance(res, pd.DataFrame))
         self.assertTrue(self.labels_ohe.shape[1] == res.shape[0])
+
+    #-------------------------------------------------#
+    #        Evaluation - Sparse Annotations          #
+    #-------------------------------------------------#
+    def test_evaluate_metrics_sparse(self):
+        labels_sparse = sparse.csr_matrix(self.labels_ohe)
+        # Check metrics
+        metrics = compute_metrics(self.preds, self.labels_ohe, 4, threshold=0.5)
+        metrics_sparse = compute_metrics(self.preds, labels_sparse, 4,
+                                         threshold=0.5)
+        self.assertTrue(metrics.equals(metrics_sparse))
+        # Check confusion matrix
+        cm = compute_confusion_matrix(self.preds, labels_sparse, 4)
+        self.assertTrue(np.array_equal(cm, compute_confusion_matrix(
+                                        self.preds, self.labels_ohe, 4)))
+        # Check ROC coordinates
+        fpr_list, tpr_list = compute_roc(self.preds, labels_sparse, 4)
+        fpr_ref, tpr_ref = compute_roc(self.preds, self.labels_ohe, 4)
+        for c in range(0, 4):
+            self.assertTrue(np.array_equal(fpr_list[c], fpr_ref[c]))
+            self.assertTrue(np.array_equal(tpr_list[c], tpr_ref[c]))
@@ -0,0 +1,183 @@
+#==============================================================================#
+#  Author:       Dominik Müller                                                #
+#  Copyright:    2022 IT-Infrastructure for Translational Medical Research,    #
+#                University of Augsburg                                        #
+#                                                                              #
+#  This program is free software: you can redistribute it and/or modify        #
+#  it under the terms of the GNU General Public License as published by        #
+#  the Free Software Foundation, either version 3 of the License, or           #
+#  (at your option) any later version.                                         #
+#                                                                              #
+#  This program is distributed in the hope that it will be useful,             #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#  GNU General Public License for more details.                                #
+#                                                                              #
+#  You should have received a copy of the GNU General Public License           #
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#-----------------------------------------------------#
+#                   Library imports                   #
+#-----------------------------------------------------#
+#External libraries
+import unittest
+import numpy as np
+import tempfile
+import pickle
+import time
+import os
+#Internal libraries
+from aucmedi.data_processing.io_cache import *
+
+#-----------------------------------------------------#
+#                 Unittest: IO Cache                  #
+#-----------------------------------------------------#
+class IOcacheTEST(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        np.random.seed(1234)
+        self.samples = ["sample_" + str(i) for i in range(0, 10)]
+        self.images = [np.random.rand(16, 16, 3) * 255 for i in range(0, 10)]
+
+    #-------------------------------------------------#
+    #                 Prepared Store                  #
+    #-------------------------------------------------#
+    def test_PreparedStore_create(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        path_store = os.path.join(tmp_data.name, "store")
+        store = PreparedStore(path_store, self.samples + self.samples[:3],
+                              shape=(16, 16, 3), dtype="float32")
+        self.assertEqual(len(store), 10)
+        self.assertTrue(os.path.exists(os.path.join(path_store, "images.npy")))
+        self.assertTrue(os.path.exists(os.path.join(path_store, "index.json")))
+        self.assertFalse(store.contains("sample_0"))
+        self.assertFalse("unknown" in store)
+
+    def test_PreparedStore_readwrite(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        store = PreparedStore(os.path.join(tmp_data.name, "store"),
+                              self.samples, shape=(16, 16, 3), dtype="float32")
+        for sample, img in zip(self.samples, self.images):
+            store.write(sample, img)
+        for sample, img in zip(self.samples, self.images):
+            self.assertTrue(store.contains(sample))
+            img_store = store.read(sample)
+            self.assertTrue(np.allclose(img_store, img))
+            self.assertFalse(img_store.flags.writeable)
+        self.assertRaises(ValueError, store.write, "sample_0",
+                          np.zeros((8, 8, 3)))
+
+    def test_PreparedStore_dtype(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        store = PreparedStore(os.path.join(tmp_data.name, "store"),
+                              self.samples, shape=(16, 16, 3), dtype="uint8")
+        store.write("sample_1", self.images[1])
+        img_store = store.read("sample_1")
+        self.assertEqual(img_store.dtype, np.uint8)
+        self.assertTrue(np.array_equal(img_store,
+                                       self.images[1].astype(np.uint8)))
+
+    def test_PreparedStore_reopen(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        store = PreparedStore(os.path.join(tmp_data.name, "store"),
+                              self.samples, shape=(16, 16, 3), dtype="float16")
+        store.write("sample_2", self.images[2])
+        store.flush()
+        # Reopen from disk
+        store_disk = PreparedStore.load(store.path)
+        self.assertTrue(store_disk.contains("sample_2"))
+        self.assertFalse(store_disk.contains("sample_3"))
+        self.assertTrue(np.array_equal(store_disk.read("sample_2"),
+                                       store.read("sample_2")))
+        # Transfer via pickling
+        store_pickled = pickle.loads(pickle.dumps(store))
+        self.assertTrue(np.array_equal(store_pickled.read("sample_2"),
+                                       store.read("sample_2")))
+
+    #-------------------------------------------------#
+    #                   Disk Cache                    #
+    #-------------------------------------------------#
+    def test_DiskCache_readwrite(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        cache = DiskCache(os.path.join(tmp_data.name, "cache"))
+        key = cache.key("sample_0", (16, 16), {"two_dim": True})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, self.images[0])
+        self.assertTrue(np.array_equal(cache.get(key), self.images[0]))
+        # Reopen cache in another instance
+        cache_pickled = pickle.loads(pickle.dumps(cache))
+        self.assertTrue(np.array_equal(cache_pickled.get(key), self.images[0]))
+        cache.clear()
+        self.assertIsNone(cache.get(key))
+
+    def test_DiskCache_key(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        cache = DiskCache(tmp_data.name)
+        key_a = cache.key("sample_0", (16, 16), {"a": 1, "b": 2})
+        self.assertEqual(key_a, cache.key("sample_0", (16, 16),
+                                          {"b": 2, "a": 1}))
+        self.assertNotEqual(key_a, cache.key("sample_0", (16, 8),
+                                             {"a": 1, "b": 2}))
+        self.assertNotEqual(cache.key(self.images[0]),
+                            cache.key(self.images[1]))
+        self.assertNotEqual(cache.key(np.mean), cache.key(np.std))
+
+    def test_DiskCache_eviction(self):
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        size_entry = self.images[0].nbytes + 128
+        cache = DiskCache(tmp_data.name, max_size=size_entry * 3)
+        keys = [cache.key(sample) for sample in self.samples[:5]]
+        for i in range(0, 3):
+            cache.put(keys[i], self.images[i])
+            time.sleep(0.01)
+        # Access first entry to mark it as recently used
+        self.assertIsNotNone(cache.get(keys[0]))
+        time.sleep(0.01)
+        cache.put(keys[3], self.images[3])
+        cache.put(keys[4], self.images[4])
+        self.assertTrue(cache.size <= size_entry * 3)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[4]))
+
+    #-------------------------------------------------#
+    #                  Memory Cache                   #
+    #-------------------------------------------------#
+    def test_MemoryCache_readwrite(self):
+        cache = MemoryCache(max_size=self.images[0].nbytes * 10)
+        self.assertIsNone(cache.get("sample_0"))
+        cache.put("sample_0", self.images[0])
+        self.assertTrue(np.array_equal(cache.get("sample_0"), self.images[0]))
+        self.assertTrue("sample_0" in cache)
+        stats = cache.statistics()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], self.images[0].nbytes)
+        # Transfer via pickling results into an empty cache
+        cache_pickled = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(len(cache_pickled), 0)
+        self.assertEqual(cache_pickled.max_size, cache.max_size)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_MemoryCache_eviction(self):
+        cache = MemoryCache(max_size=self.images[0].nbytes * 3)
+        for i in range(0, 3):
+            cache.put(self.samples[i], self.images[i])
+        # Access first entry to mark it as recently used
+        self.assertIsNotNone(cache.get(self.samples[0]))
+        cache.put(self.samples[3], self.images[3])
+        self.assertIsNotNone(cache.get(self.samples[0]))
+        self.assertIsNone(cache.get(self.samples[1]))
+        self.assertEqual(cache.statistics()["evictions"], 1)
+        self.assertTrue(cache.size <= cache.max_size)
+        # Images larger than the budget are not cached
+        cache.put("large", np.zeros((64, 64, 3)))
+        self.assertFalse("large" in cache)
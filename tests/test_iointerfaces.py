@@ -23,12 +23,17 @@
 import unittest
 import numpy as np
 import pandas as pd
+from scipy import sparse
 import tempfile
 from PIL import Image
 import json
+import time
 import os
 #Internal libraries
 from aucmedi.data_processing.io_interfaces import *
+from aucmedi.data_processing.io_interfaces.parsing import iterate_json_object
+from aucmedi.data_processing.io_data import input_interface
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #               Unittest: IO Interfaces               #
@@ -151,6 +156,39 @@ class IOinterfacesTEST(unittest.TestCase):
         self.assertTrue(len(ds[0]), 25)
         self.assertTrue(len(ds[1]), 25)
 
+    def test_JSON_duplicates(self):
+        # Create imaging data
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        for i in range(0, 3):
+            img_pillow = Image.fromarray(np.zeros((16, 16, 3), np.uint8))
+            img_pillow.save(os.path.join(tmp_data.name,
+                                         "image.sample_" + str(i) + ".png"))
+        # Create JSON data with duplicate samples (json.load keeps the last one)
+        tmp_json = tempfile.NamedTemporaryFile(mode="w", prefix="tmp.aucmedi.",
+                                               suffix=".json")
+        for ohe, values in [(False, ["x", "y", "z", "y"]),
+                            (True, [[1, 0], [0, 1], [1, 0], [0, 1]])]:
+            with open(tmp_json.name, "w") as writer:
+                writer.write("{\"image.sample_0\": " + json.dumps(values[0]) + \
+                             ", \"image.sample_1\": " + json.dumps(values[1]) + \
+                             ", \"image.sample_0\": " + json.dumps(values[2]) + \
+                             ", \"image.sample_2\": " + json.dumps(values[3]) + \
+                             "}")
+            ds = json_loader(path_data=tmp_json.name,
+                             path_imagedir=tmp_data.name,
+                             allowed_image_formats=self.aif, training=True,
+                             ohe=ohe)
+            self.assertEqual(ds[0], ["image.sample_0", "image.sample_1",
+                                     "image.sample_2"])
+            if not ohe:
+                self.assertEqual(ds[3], ["y", "z"])
+                self.assertTrue(np.array_equal(ds[1], [[0, 1], [1, 0],
+                                                       [1, 0]]))
+            else:
+                self.assertTrue(np.array_equal(ds[1], [[1, 0], [0, 1],
+                                                       [0, 1]]))
+
     #-------------------------------------------------#
     #                 CSV IO Interface                #
     #-------------------------------------------------#
@@ -234,3 +272,265 @@ class IOinterfacesTEST(unittest.TestCase):
                         ohe=True, col_sample="index")
         self.assertTrue(len(ds[0]), 25)
         self.assertTrue(len(ds[1]), 25)
+
+    def test_CSV_validation(self):
+        # Create imaging data with nested samples
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        os.mkdir(os.path.join(tmp_data.name, "nested"))
+        data = {}
+        for i in range(0, 25):
+            img = np.random.rand(16, 16, 3) * 255
+            img_pillow = Image.fromarray(img.astype(np.uint8))
+            if i % 5 == 0 : index = "nested/image.sample_" + str(i) + ".png"
+            else : index = "image.sample_" + str(i) + ".png"
+            data[index[:-4]] = 0
+            path_sample = os.path.join(tmp_data.name, index)
+            img_pillow.save(path_sample)
+        # Create CSV & JSON data with missing samples
+        for missing in [None, "image.sample_missing", "nested/image.missing"]:
+            if missing is not None : data[missing] = 0
+            tmp_csv = tempfile.NamedTemporaryFile(mode="w", suffix=".csv",
+                                                  prefix="tmp.aucmedi.")
+            df = pd.DataFrame.from_dict(data, orient="index",
+                                        columns=["class"])
+            df.index.name = "index"
+            df.to_csv(tmp_csv.name, index=True, header=True)
+            tmp_json = tempfile.NamedTemporaryFile(mode="w", suffix=".json",
+                                                   prefix="tmp.aucmedi.")
+            json.dump(data, tmp_json)
+            tmp_json.flush()
+            # Run CSV & JSON IO with validation
+            paras = {"path_imagedir": tmp_data.name, "training": False,
+                     "allowed_image_formats": self.aif}
+            if missing is None:
+                ds = csv_loader(path_data=tmp_csv.name, col_sample="index",
+                                **paras)
+                self.assertEqual(len(ds[0]), 25)
+                self.assertEqual(ds[4], "png")
+                ds = json_loader(path_data=tmp_json.name, **paras)
+                self.assertEqual(len(ds[0]), 25)
+            else:
+                self.assertRaises(Exception, csv_loader, tmp_csv.name,
+                                  col_sample="index", **paras)
+                self.assertRaises(Exception, json_loader, tmp_json.name,
+                                  **paras)
+                # Run CSV & JSON IO without validation
+                ds = csv_loader(path_data=tmp_csv.name, col_sample="index",
+                                validate=False, **paras)
+                self.assertTrue(missing in ds[0])
+                ds = json_loader(path_data=tmp_json.name, validate=False,
+                                 **paras)
+                self.assertTrue(missing in ds[0])
+
+    def test_Directory_manifest(self):
+        # Create imaging data with subdirectories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        for i in range(0, 3):
+            os.mkdir(os.path.join(tmp_data.name, "class_" + str(i)))
+        for i in range(0, 12):
+            img = np.random.rand(16, 16, 3) * 255
+            img_pillow = Image.fromarray(img.astype(np.uint8))
+            index = "image.sample_" + str(i) + ".png"
+            label_dir = "class_" + str((i % 3))
+            path_sample = os.path.join(tmp_data.name, label_dir, index)
+            img_pillow.save(path_sample)
+        # Mark directories as unmodified for a while
+        past = time.time() - 60
+        for d in ["class_0", "class_1", "class_2", "."]:
+            os.utime(os.path.join(tmp_data.name, d), (past, past))
+        # Run Directory IO with persisted manifest
+        tmp_cache = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                suffix=".cache")
+        ds_ref = directory_loader(tmp_data.name, self.aif, training=True)
+        ds = directory_loader(tmp_data.name, self.aif, training=True,
+                              manifest=tmp_cache.name)
+        self.assertEqual(len(os.listdir(tmp_cache.name)), 1)
+        self.assertEqual(ds[0], ds_ref[0])
+        self.assertTrue(np.array_equal(ds[1], ds_ref[1]))
+        self.assertEqual(ds[3], ds_ref[3])
+        # Check that unmodified directories are not rescanned
+        path_manifest = os.path.join(tmp_cache.name,
+                                     os.listdir(tmp_cache.name)[0])
+        with open(path_manifest, "r") as reader:
+            content = json.load(reader)
+        content["directories"]["class_1"]["entries"].append(
+                                            ["image.cached.png", False, 0, 0])
+        with open(path_manifest, "w") as writer:
+            json.dump(content, writer)
+        ds = directory_loader(tmp_data.name, self.aif, training=True,
+                              manifest=path_manifest)
+        self.assertTrue(os.path.join("class_1", "image.cached.png") in ds[0])
+        # Check that modified directories are rescanned
+        img_pillow.save(os.path.join(tmp_data.name, "class_1", "new.png"))
+        os.utime(os.path.join(tmp_data.name, "class_1"), (past+1, past+1))
+        ds = directory_loader(tmp_data.name, self.aif, training=True,
+                              manifest=path_manifest)
+        self.assertFalse(os.path.join("class_1", "image.cached.png") in ds[0])
+        self.assertTrue(os.path.join("class_1", "new.png") in ds[0])
+        self.assertEqual(len(ds[0]), 13)
+        # Check testing format with manifest
+        ds = directory_loader(os.path.join(tmp_data.name, "class_0"),
+                              self.aif, training=False,
+                              manifest=tmp_cache.name)
+        self.assertEqual(len(ds[0]), 4)
+        self.assertEqual(ds[4], "png")
+
+    #-------------------------------------------------#
+    #            Compact Annotation Parsing           #
+    #-------------------------------------------------#
+    def test_Annotation_compact(self):
+        # Create imaging data
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        classes_sparse = np.random.choice([3, 10, 1], size=25).tolist()
+        classes_ohe = pd.get_dummies(classes_sparse).to_numpy()
+        index_list = []
+        for i in range(0, 25):
+            img = np.random.rand(16, 16, 3) * 255
+            img_pillow = Image.fromarray(img.astype(np.uint8))
+            index = "image.sample_" + str(i)
+            index_list.append(index)
+            img_pillow.save(os.path.join(tmp_data.name, index + ".png"))
+        # Check sparse and one-hot encoded CSV format
+        tmp_csv = tempfile.NamedTemporaryFile(mode="w", prefix="tmp.aucmedi.",
+                                              suffix=".csv")
+        df = pd.DataFrame(classes_ohe, columns=["a", "b", "c"])
+        df.insert(0, "SAMPLE", index_list)
+        df["CLASS"] = classes_sparse
+        df.to_csv(tmp_csv.name, index=False, header=True)
+        ds = csv_loader(tmp_csv.name, tmp_data.name, self.aif, ohe=False)
+        self.assertEqual(ds[0], index_list)
+        self.assertEqual(ds[1].dtype, np.uint8)
+        self.assertTrue(np.array_equal(ds[1], classes_ohe))
+        self.assertEqual(ds[3], [1, 3, 10])
+        ds = csv_loader(tmp_csv.name, tmp_data.name, self.aif, ohe=True,
+                        ohe_range=["a", "b", "c"])
+        self.assertEqual(ds[1].dtype, np.uint8)
+        self.assertTrue(np.array_equal(ds[1], classes_ohe))
+        self.assertEqual(ds[2], 3)
+        # Check one-hot encoded JSON format with legend and soft labels
+        data = {index_list[i]: classes_ohe[i].tolist() for i in range(0, 25)}
+        data["legend"] = ["a", "b", "c"]
+        data["image.sample_24"] = [0.2, 0.3, 0.5]
+        tmp_json = tempfile.NamedTemporaryFile(mode="w", prefix="tmp.aucmedi.",
+                                               suffix=".json")
+        with open(tmp_json.name, "w") as writer:
+            json.dump(data, writer, indent=2)
+        ds = json_loader(tmp_json.name, tmp_data.name, self.aif, ohe=True)
+        self.assertEqual(ds[0], index_list)
+        self.assertEqual(ds[1].dtype, np.float32)
+        self.assertTrue(np.allclose(ds[1][:-1], classes_ohe[:-1]))
+        self.assertEqual(ds[2], 3)
+        self.assertEqual(ds[3], ["a", "b", "c"])
+        # Check sample indices as compact SampleTable
+        ds = input_interface("json", tmp_data.name, path_data=tmp_json.name,
+                             ohe=True, sample_table=True)
+        self.assertTrue(isinstance(ds[0], SampleTable))
+        self.assertEqual(ds[0].tolist(), index_list)
+        # Check streaming JSON parser with small chunks
+        pairs = list(iterate_json_object(tmp_json.name, chunk_size=7))
+        self.assertEqual(pairs, list(data.items()))
+
+    def test_Annotation_sparse(self):
+        # Create imaging data with subdirectories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        classes_sparse = np.random.randint(0, 4, size=25).tolist()
+        tmp_flat = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        index_list = []
+        for i in range(0, 25):
+            img = np.random.rand(16, 16, 3) * 255
+            img_pillow = Image.fromarray(img.astype(np.uint8))
+            subdir = os.path.join(tmp_data.name, "class_" + \
+                                  str(classes_sparse[i]))
+            if not os.path.exists(subdir) : os.mkdir(subdir)
+            index = "image.sample_" + str(i)
+            index_list.append(index)
+            img_pillow.save(os.path.join(subdir, index + ".png"))
+            img_pillow.save(os.path.join(tmp_flat.name, index + ".png"))
+        # Check directory format
+        ds = directory_loader(tmp_data.name, self.aif, training=True)
+        ds_sparse = directory_loader(tmp_data.name, self.aif, training=True,
+                                     sparse_labels=True)
+        self.assertTrue(sparse.isspmatrix_csr(ds_sparse[1]))
+        self.assertTrue(np.array_equal(ds_sparse[1].toarray(), ds[1]))
+        # Check sparse and one-hot encoded CSV format
+        tmp_csv = tempfile.NamedTemporaryFile(mode="w", prefix="tmp.aucmedi.",
+                                              suffix=".csv")
+        df = pd.DataFrame(np.eye(4, dtype=np.uint8)[classes_sparse],
+                          columns=["a", "b", "c", "d"])
+        df.insert(0, "SAMPLE", index_list)
+        df["CLASS"] = classes_sparse
+        df.to_csv(tmp_csv.name, index=False, header=True)
+        for ohe in [False, True]:
+            ds = csv_loader(tmp_csv.name, tmp_flat.name, self.aif, ohe=ohe,
+                            ohe_range=["a", "b", "c", "d"])
+            ds_sparse = csv_loader(tmp_csv.name, tmp_flat.name, self.aif,
+                                   ohe=ohe, ohe_range=["a", "b", "c", "d"],
+                                   sparse_labels=True)
+            self.assertTrue(sparse.isspmatrix_csr(ds_sparse[1]))
+            self.assertEqual(ds_sparse[1].dtype, np.uint8)
+            self.assertTrue(np.array_equal(ds_sparse[1].toarray(), ds[1]))
+            self.assertEqual(ds_sparse[2], 4)
+        # Check sparse and one-hot encoded JSON format via input interface
+        for ohe in [False, True]:
+            if ohe : data = {index_list[i]: np.eye(4, dtype=int)[c].tolist() \
+                             for i, c in enumerate(classes_sparse)}
+            else : data = dict(zip(index_list, classes_sparse))
+            tmp_json = tempfile.NamedTemporaryFile(mode="w", suffix=".json",
+                                                   prefix="tmp.aucmedi.")
+            with open(tmp_json.name, "w") as writer:
+                json.dump(data, writer)
+            ds = input_interface("json", tmp_flat.name, path_data=tmp_json.name,
+                                 ohe=ohe)
+            ds_sparse = input_interface("json", tmp_flat.name,
+                                        path_data=tmp_json.name, ohe=ohe,
+                                        sparse_labels=True)
+            self.assertTrue(sparse.isspmatrix_csr(ds_sparse[1]))
+            self.assertTrue(np.array_equal(ds_sparse[1].toarray(), ds[1]))
+
+    #-------------------------------------------------#
+    #              Streaming JSON Parser              #
+    #-------------------------------------------------#
+    def test_JSON_streaming_adversarial(self):
+        data = {"quoted \"key\"": "escaped \"quotes\" and \\ backslash \\\"",
+                "commas, and: colons": "a, \"b\": c, {not an object}",
+                "braces {}[]": "}{][\",",
+                "nested": {"a": [1, [2, {"b": "}"}]], "c": {"d": {}}},
+                "numbers": [0, -1.5e-3, 12345678901234567890, 3.0, 1e10],
+                "literals": [True, False, None],
+                "unicode ä☃": "\U0001F600 ß",
+                "empty": [], "": "", "image.sample_1": [0, 1, 0],
+                "image.sample_1 ": 12345}
+        tmp_json = tempfile.NamedTemporaryFile(mode="w", prefix="tmp.aucmedi.",
+                                               suffix=".json")
+        # Split tokens at every possible chunk boundary
+        for indent in [None, 2]:
+            for ensure_ascii in [True, False]:
+                with open(tmp_json.name, "w") as writer:
+                    json.dump(data, writer, indent=indent,
+                              ensure_ascii=ensure_ascii)
+                for chunk_size in range(1, 24):
+                    pairs = list(iterate_json_object(tmp_json.name,
+                                                     chunk_size=chunk_size))
+                    self.assertEqual(pairs, list(data.items()))
+        # Check irregular whitespace and empty objects
+        for text, pairs in [(" \n{ \"a\" :1 ,\"b\":[ 1 ,2 ]\t}\n ",
+                             [("a", 1), ("b", [1, 2])]),
+                            ("{}", []), (" {\n} ", []),
+                            ("{\"a\":{}}", [("a", {})])]:
+            with open(tmp_json.name, "w") as writer : writer.write(text)
+            for chunk_size in [1, 2, 3, 1024]:
+                self.assertEqual(list(iterate_json_object(tmp_json.name,
+                                                          chunk_size)), pairs)
+        # Check invalid objects
+        for text in ["{\"a\" 1}", "{\"a\": 1,}", "{\"a\": 1", "[1, 2]",
+                     "{1: 2}", "{\"a\": tru}", "{\"a\": 1 \"b\": 2}", ""]:
+            with open(tmp_json.name, "w") as writer : writer.write(text)
+            for chunk_size in [1, 3, 1024]:
+                self.assertRaises(ValueError, list,
+                                  iterate_json_object(tmp_json.name,
+                                                      chunk_size))
@@ -25,10 +25,16 @@ import numpy as np
 import tempfile
 from PIL import Image
 import SimpleITK as sitk
+import pickle
 import os
+import zipfile
 #Internal libraries
 from aucmedi.data_processing.io_loader import *
+from aucmedi.data_processing.io_shards import build_shards
+from aucmedi.data_processing.io_cache import SharedCache
 from aucmedi import DataGenerator
+from aucmedi.data_processing.subfunctions import Chromer, Clip, Crop, \
+                                                 Padding, Resize, Standardize
 
 #-----------------------------------------------------#
 #                 Unittest: IO Loader                 #
@@ -99,6 +105,237 @@ class IOloaderTEST(unittest.TestCase):
                                grayscale=False)
             self.assertTrue(np.array_equal(img.shape, self.img_2d_rgb.shape))
 
+    # Test for reduced-resolution decoding
+    def test_image_loader_reduced(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        img_large = np.random.rand(128, 96, 3) * 255
+        for ext in ["jpg", "png"]:
+            img_pillow = Image.fromarray(img_large.astype(np.uint8))
+            img_pillow.save(os.path.join(tmp_data.name, "sample." + ext))
+        for backend in ["pil", "opencv"]:
+            for grayscale in [False, True]:
+                channels = 1 if grayscale else 3
+                # Full resolution decoding
+                img = image_loader("sample", tmp_data.name, image_format="jpg",
+                                   grayscale=grayscale, backend=backend)
+                self.assertTrue(np.array_equal(img.shape, (128, 96, channels)))
+                self.assertEqual(img.dtype, np.uint8)
+                # Reduced decoding at smallest scale at or above target
+                img = image_loader("sample", tmp_data.name, image_format="jpg",
+                                   grayscale=grayscale, backend=backend,
+                                   resize=(30, 20))
+                self.assertTrue(np.array_equal(img.shape, (32, 24, channels)))
+                img = image_loader("sample", tmp_data.name, image_format="jpg",
+                                   grayscale=grayscale, backend=backend,
+                                   resize=(50, 40))
+                self.assertTrue(np.array_equal(img.shape, (64, 48, channels)))
+        # PNG is only reduced by the OpenCV backend
+        img = image_loader("sample", tmp_data.name, image_format="png",
+                           backend="pil", resize=(30, 20))
+        self.assertTrue(np.array_equal(img.shape, (128, 96, 3)))
+        img = image_loader("sample", tmp_data.name, image_format="png",
+                           backend="opencv", resize=(30, 20))
+        self.assertTrue(np.array_equal(img.shape, (32, 24, 3)))
+        img = image_loader("sample", tmp_data.name, image_format="png",
+                           backend="opencv")
+        self.assertTrue(np.array_equal(img, img_large.astype(np.uint8)))
+        self.assertRaises(ValueError, image_loader, "sample", tmp_data.name,
+                          image_format="png", backend="test")
+        # Test DataGenerator
+        data_gen = DataGenerator(["sample"], tmp_data.name, resize=(30, 20),
+                                 image_format="jpg", loader_resize=True,
+                                 standardize_mode=None, batch_size=1)
+        self.assertEqual(data_gen.loader_kwargs["resize"], (30, 20))
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (1, 30, 20, 3)))
+        # Shape changing Subfunctions operate on the original image
+        sf_crop = Crop(shape=(64, 48), mode="center")
+        data_gen = DataGenerator(["sample"], tmp_data.name, resize=(30, 20),
+                                 image_format="jpg", subfunctions=[sf_crop],
+                                 standardize_mode=None, batch_size=1)
+        img = image_loader("sample", tmp_data.name, image_format="jpg")
+        img = Resize(shape=(30, 20)).transform(sf_crop.transform(img))
+        self.assertTrue(np.array_equal(next(data_gen)[0][0], img))
+        self.assertRaises(ValueError, DataGenerator, ["sample"], tmp_data.name,
+                          resize=(30, 20), image_format="jpg",
+                          subfunctions=[sf_crop], loader_resize=True)
+        # Shape preserving Subfunctions are supported
+        data_gen = DataGenerator(["sample"], tmp_data.name, resize=(30, 20),
+                                 image_format="jpg", subfunctions=[Clip(max=100)],
+                                 loader_resize=True, standardize_mode=None,
+                                 batch_size=1)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (1, 30, 20, 3)))
+        self.assertTrue(np.max(batch[0]) <= 100)
+
+    #-------------------------------------------------#
+    #                  Shard Loader                   #
+    #-------------------------------------------------#
+    # Test for encoded shards of image files
+    def test_shard_loader_encoded(self):
+        # Create temporary directories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        tmp_shards = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                 suffix=".shards")
+        # Create dataset
+        sample_list = []
+        for i in range(0, 6):
+            img_pillow = Image.fromarray(self.img_2d_rgb.astype(np.uint8))
+            index = "image.sample_" + str(i) + ".png"
+            img_pillow.save(os.path.join(tmp_data.name, index))
+            sample_list.append(index)
+        np.save(os.path.join(tmp_data.name, "array.npy"), self.img_2d_rgb)
+        # Build shards in two steps with small shard size (appending)
+        index = build_shards(sample_list[:3], tmp_data.name, tmp_shards.name,
+                             shard_size=1024)
+        index = build_shards(sample_list + ["array.npy"], tmp_data.name,
+                             tmp_shards.name, shard_size=1024)
+        self.assertEqual(len(index["samples"]), 7)
+        self.assertTrue(len(index["shards"]) > 1)
+        # Load images and compare with image_loader
+        for grayscale in [False, True]:
+            for sample in sample_list:
+                img = shard_loader(sample, tmp_shards.name,
+                                   grayscale=grayscale)
+                img_ref = image_loader(sample, tmp_data.name,
+                                       grayscale=grayscale)
+                self.assertTrue(np.array_equal(img, img_ref))
+        img = shard_loader("array.npy", tmp_shards.name)
+        self.assertTrue(np.array_equal(img, self.img_2d_rgb))
+        self.assertRaises(ValueError, shard_loader, "unknown", tmp_shards.name)
+        self.assertRaises(ValueError, build_shards, sample_list,
+                          tmp_data.name, tmp_shards.name, mode="raw")
+        # Samples appended after opening the shards are loadable
+        img_pillow.save(os.path.join(tmp_data.name, "image.sample_new.png"))
+        build_shards(["image.sample_new.png"], tmp_data.name, tmp_shards.name,
+                     shard_size=1024)
+        img = shard_loader("image.sample_new.png", tmp_shards.name)
+        self.assertTrue(np.array_equal(img, self.img_2d_rgb.astype(np.uint8)))
+        # Index is not accessed again for known samples
+        path_index = os.path.join(tmp_shards.name, "index.json")
+        os.rename(path_index, path_index + ".moved")
+        img = shard_loader(sample_list[0], tmp_shards.name)
+        self.assertTrue(np.array_equal(img, self.img_2d_rgb.astype(np.uint8)))
+        os.rename(path_index + ".moved", path_index)
+        # Test DataGenerator
+        data_gen = DataGenerator(sample_list, tmp_shards.name, resize=None,
+                                 loader=shard_loader, batch_size=2, workers=2)
+        for i in range(0, 3):
+            batch = next(data_gen)
+            self.assertTrue(np.array_equal(batch[0].shape, (2, 16, 16, 3)))
+
+    # Test for decoding encoded shards like the image_loader & numpy_loader
+    def test_shard_loader_encoded_decoding(self):
+        # Create temporary directories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        tmp_shards = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                 suffix=".shards")
+        # Create dataset with images and arrays
+        img_pillow = Image.fromarray(self.img_2d_rgb.astype(np.uint8))
+        img_pillow.save(os.path.join(tmp_data.name, "image.jpg"))
+        np.save(os.path.join(tmp_data.name, "gray.npy"),
+                self.img_2d_gray[:,:,0])
+        build_shards(["image.jpg", "gray.npy"], tmp_data.name,
+                     tmp_shards.name)
+        # Compare with image_loader for all backends
+        for backend in ["pil", "opencv"]:
+            for resize in [None, (8, 8)]:
+                img = shard_loader("image.jpg", tmp_shards.name,
+                                   resize=resize, backend=backend)
+                img_ref = image_loader("image.jpg", tmp_data.name,
+                                       resize=resize, backend=backend)
+                self.assertTrue(np.array_equal(img, img_ref))
+        # Compare with numpy_loader
+        img = shard_loader("gray.npy", tmp_shards.name, grayscale=True)
+        img_ref = numpy_loader("gray.npy", tmp_data.name, grayscale=True)
+        self.assertTrue(np.array_equal(img, img_ref))
+        self.assertRaises(ValueError, shard_loader, "gray.npy",
+                          tmp_shards.name, grayscale=False)
+
+    # Test for caching & read-ahead of samples from shards
+    def test_shard_loader_caches(self):
+        # Create temporary directories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        tmp_shards = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                 suffix=".shards")
+        tmp_cache = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                suffix=".cache")
+        # Create dataset
+        sample_list = []
+        for i in range(0, 4):
+            img_pillow = Image.fromarray(np.uint8(self.img_2d_rgb + i))
+            index = "image.sample_" + str(i) + ".png"
+            img_pillow.save(os.path.join(tmp_data.name, index))
+            sample_list.append(index)
+        build_shards(sample_list, tmp_data.name, tmp_shards.name)
+        # Load samples with disk cache & read-ahead
+        data_gen = DataGenerator(sample_list, tmp_shards.name, resize=None,
+                                 loader=shard_loader, batch_size=2,
+                                 shuffle=False, standardize_mode=None,
+                                 disk_cache=tmp_cache.name, read_ahead=4)
+        for i in range(0, 2):
+            batch = data_gen[i]
+            for j in range(0, 2):
+                img_ref = image_loader(sample_list[i*2+j], tmp_data.name)
+                self.assertTrue(np.array_equal(batch[0][j], img_ref))
+        # Shards are not staged by the read-ahead
+        self.assertEqual(len(data_gen.read_ahead.pending), 0)
+        # Cache keys depend on the location of the samples in the shards
+        key = data_gen._disk_cache_key(0)
+        self.assertIsNotNone(data_gen.disk_cache.get(key))
+        self.assertNotEqual(key, data_gen._disk_cache_key(1))
+
+    # Test for raw shards of loaded volumes
+    def test_shard_loader_raw(self):
+        # Create temporary directories
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        tmp_shards = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                 suffix=".shards")
+        # Create dataset
+        sample_list = []
+        for i in range(0, 4):
+            index = "3Dimage.sample_" + str(i)
+            image_sitk = sitk.GetImageFromArray(self.img_3d_hu[:,:,:,0] + i)
+            image_sitk.SetSpacing([0.5,0.5,2.0])
+            sitk.WriteImage(image_sitk, os.path.join(tmp_data.name,
+                                                     index + ".mha"))
+            sample_list.append(index)
+        # Build shards
+        build_shards(sample_list, tmp_data.name, tmp_shards.name,
+                     image_format="mha", mode="raw", loader=sitk_loader)
+        self.assertRaises(ValueError, build_shards, sample_list,
+                          tmp_data.name, tmp_shards.name, mode="encoded")
+        # Appending requires identical loader parameters
+        index = build_shards(sample_list, tmp_data.name, tmp_shards.name,
+                             image_format="mha", mode="raw", loader=sitk_loader)
+        self.assertEqual(len(index["samples"]), 4)
+        self.assertRaises(ValueError, build_shards, sample_list,
+                          tmp_data.name, tmp_shards.name, image_format="mha",
+                          mode="raw", loader=sitk_loader,
+                          resampling=(1.0, 1.0, 1.0))
+        self.assertRaises(ValueError, build_shards, sample_list,
+                          tmp_data.name, tmp_shards.name, image_format="mha",
+                          mode="raw", loader=numpy_loader)
+        # Load volumes as read-only views and compare with sitk_loader
+        for sample in sample_list:
+            img = shard_loader(sample, tmp_shards.name)
+            img_ref = sitk_loader(sample, tmp_data.name, image_format="mha")
+            self.assertTrue(np.array_equal(img, img_ref))
+            self.assertEqual(img.dtype, img_ref.dtype)
+            self.assertFalse(img.flags.writeable)
+        # Test DataGenerator
+        data_gen = DataGenerator(sample_list, tmp_shards.name, resize=None,
+                                 loader=shard_loader, grayscale=True,
+                                 standardize_mode="z-score", batch_size=2)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (2, 32, 8, 8, 1)))
+
     #-------------------------------------------------#
     #                  NumPy Loader                   #
     #-------------------------------------------------#
@@ -182,6 +419,102 @@ class IOloaderTEST(unittest.TestCase):
                                grayscale=False, two_dim=False)
             self.assertTrue(np.array_equal(img.shape, self.img_3d_rgb.shape))
 
+    # Test for memory-mapping and strict non-pickle mode
+    def test_numpy_loader_mmap(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        np.save(os.path.join(tmp_data.name, "sample.npy"), self.img_3d_gray)
+        img = numpy_loader("sample", tmp_data.name, image_format="npy",
+                           grayscale=True, two_dim=False, mmap_mode="r",
+                           allow_pickle=False)
+        self.assertIsInstance(img, np.memmap)
+        self.assertFalse(img.flags.writeable)
+        self.assertTrue(np.array_equal(img, self.img_3d_gray))
+        # Pickled object arrays are rejected in strict mode
+        img_obj = np.empty((2,), dtype=object)
+        np.save(os.path.join(tmp_data.name, "object.npy"), img_obj,
+                allow_pickle=True)
+        self.assertRaises(ValueError, numpy_loader, "object", tmp_data.name,
+                          image_format="npy", allow_pickle=False)
+        # Test DataGenerator
+        data_gen = DataGenerator(["sample"], tmp_data.name, image_format="npy",
+                                 loader=numpy_loader, resize=None,
+                                 standardize_mode="z-score", grayscale=True,
+                                 two_dim=False, mmap_mode="r", batch_size=1)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (1, 16, 16, 16, 1)))
+
+    # Test for npz archives and shards
+    def test_numpy_loader_archive(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        samples = {"sample_" + str(i): np.random.rand(16, 16, 1) \
+                   for i in range(0, 6)}
+        shard_a = {k: samples[k] for k in list(samples)[:3]}
+        shard_b = {k: samples[k] for k in list(samples)[3:]}
+        np.savez(os.path.join(tmp_data.name, "shard_a.npz"), **shard_a)
+        np.savez_compressed(os.path.join(tmp_data.name, "shard_b.npz"),
+                            **shard_b)
+        shards = ["shard_a.npz", "shard_b.npz"]
+        for mmap_mode in [None, "r"]:
+            for index in samples:
+                img = numpy_loader(index, tmp_data.name, grayscale=True,
+                                   archive=shards, mmap_mode=mmap_mode,
+                                   allow_pickle=False)
+                self.assertTrue(np.array_equal(img, samples[index]))
+                # Uncompressed shard is memory-mapped
+                if mmap_mode is not None and index in shard_a:
+                    self.assertIsInstance(img, np.memmap)
+                else : self.assertNotIsInstance(img, np.memmap)
+        self.assertRaises(ValueError, numpy_loader, "unknown", tmp_data.name,
+                          grayscale=True, archive=shards)
+        # Single archive
+        img = numpy_loader("sample_0", tmp_data.name, grayscale=True,
+                           archive="shard_a.npz")
+        self.assertTrue(np.array_equal(img, samples["sample_0"]))
+        # Test DataGenerator
+        data_gen = DataGenerator(list(samples), tmp_data.name,
+                                 loader=numpy_loader, archive=shards,
+                                 mmap_mode="r", resize=None, grayscale=True,
+                                 batch_size=3)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (3, 16, 16, 1)))
+        # Writable memory-mapping is not supported for archives
+        for mmap_mode in ["r+", "w+"]:
+            self.assertRaises(ValueError, numpy_loader, "sample_0",
+                              tmp_data.name, grayscale=True,
+                              archive=shards, mmap_mode=mmap_mode)
+        # Modified archive is indexed again
+        shard_c = {"sample_6": np.random.rand(16, 16, 1)}
+        np.savez(os.path.join(tmp_data.name, "shard_a.npz"), **shard_c)
+        img = numpy_loader("sample_6", tmp_data.name, grayscale=True,
+                           archive=shards, mmap_mode="r")
+        self.assertTrue(np.array_equal(img, shard_c["sample_6"]))
+        self.assertRaises(ValueError, numpy_loader, "sample_0", tmp_data.name,
+                          grayscale=True, archive=shards)
+
+    def test_numpy_loader_archive_version(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        # Store arrays with all header versions in an uncompressed archive
+        samples = {}
+        path_archive = os.path.join(tmp_data.name, "shard.npz")
+        with zipfile.ZipFile(path_archive, "w") as zf:
+            for version in [(1, 0), (2, 0), (3, 0)]:
+                index = "sample_" + str(version[0])
+                samples[index] = np.random.rand(16, 16, 1)
+                with zf.open(index + ".npy", "w") as fd:
+                    np.lib.format.write_array(fd, samples[index],
+                                              version=version)
+        for index in samples:
+            img = numpy_loader(index, tmp_data.name, grayscale=True,
+                               archive="shard.npz", mmap_mode="r")
+            self.assertIsInstance(img, np.memmap)
+            self.assertTrue(np.array_equal(img, samples[index]))
+
     #-------------------------------------------------#
     #                   sITK Loader                   #
     #-------------------------------------------------#
@@ -281,6 +614,106 @@ class IOloaderTEST(unittest.TestCase):
             batch = next(data_gen)
             self.assertTrue(np.array_equal(batch[0].shape, (1, 18, 10, 10, 1)))
 
+    # Test for single-pass resampling to target shape
+    def test_sitk_loader_resize(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        # Create image
+        index = "3Dimage.sample.mha"
+        image_sitk = sitk.GetImageFromArray(self.img_3d_hu[:,:,:,0])
+        image_sitk.SetSpacing([0.5,0.75,2.0])
+        sitk.WriteImage(image_sitk, os.path.join(tmp_data.name, index))
+        # Load image with combined resampling and resizing
+        for resampling in [(1.0,1.0,1.0), None]:
+            img = sitk_loader(index, tmp_data.name, resampling=resampling,
+                              resize=(10, 12, 14), threads=1)
+            self.assertTrue(np.array_equal(img.shape, (10, 12, 14, 1)))
+            self.assertEqual(img.dtype, np.float32)
+            img = sitk_loader(index, tmp_data.name, resampling=resampling,
+                              resize=(10, 12, 14), roi=(8, 8, 8))
+            self.assertTrue(np.array_equal(img.shape, (10, 12, 14, 1)))
+        # Constant volume stays constant
+        image_sitk = sitk.GetImageFromArray(np.full((16, 16, 16), 7.0))
+        sitk.WriteImage(image_sitk, os.path.join(tmp_data.name, "const.mha"))
+        img = sitk_loader("const.mha", tmp_data.name, resize=(9, 9, 9))
+        self.assertTrue(np.allclose(img, 7.0))
+        # Load images via DataGenerator which skips resizing
+        data_gen = DataGenerator([index], tmp_data.name, loader=sitk_loader,
+                                 resize=(10, 12, 14), loader_resize=True,
+                                 standardize_mode=None, grayscale=True,
+                                 batch_size=1, profiling=True)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (1, 10, 12, 14, 1)))
+        img = sitk_loader(index, tmp_data.name, resize=(10, 12, 14))
+        self.assertTrue(np.array_equal(batch[0][0], img))
+        self.assertNotIn("resize", data_gen.profiler.summary())
+        # Subfunction pipeline of the AutoML for 3D volumes is rejected
+        sf_list = [Standardize(mode="grayscale"),
+                   Padding(mode="constant", shape=(10, 12, 14)),
+                   Crop(shape=(10, 12, 14), mode="random"),
+                   Chromer(target="rgb")]
+        self.assertRaises(ValueError, DataGenerator, [index], tmp_data.name,
+                          loader=sitk_loader, resize=(10, 12, 14),
+                          subfunctions=sf_list, loader_resize=True,
+                          grayscale=True)
+        # Only a single resampling for shape preserving Subfunctions
+        data_gen = DataGenerator([index], tmp_data.name, loader=sitk_loader,
+                                 resize=(10, 12, 14), loader_resize=True,
+                                 subfunctions=[sf_list[0], sf_list[3]],
+                                 standardize_mode=None, grayscale=True,
+                                 batch_size=1, profiling=True)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (1, 10, 12, 14, 3)))
+        self.assertNotIn("resize", data_gen.profiler.summary())
+
+    # Test for region of interest loading
+    def test_sitk_loader_ROI(self):
+        # Create temporary directory
+        tmp_data = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                               suffix=".data")
+        # Create images
+        sample_list = []
+        for format in [".mha", ".nii.gz"]:
+            index = "3Dimage.sample" + format
+            path_sample = os.path.join(tmp_data.name, index)
+            image_sitk = sitk.GetImageFromArray(self.img_3d_hu[:,:,:,0])
+            image_sitk.SetSpacing([0.5,0.75,2.0])
+            image_sitk.SetOrigin([10.0,-4.0,3.0])
+            sitk.WriteImage(image_sitk, path_sample)
+            sample_list.append(index)
+        for index in sample_list:
+            for resampling in [(1.0,1.0,1.0), (2.5,0.9,0.6), None]:
+                img_full = sitk_loader(index, tmp_data.name,
+                                       resampling=resampling)
+                # Center region is identical to cropping the full volume
+                img = sitk_loader(index, tmp_data.name, resampling=resampling,
+                                  roi=(6, 5, 4))
+                self.assertTrue(np.array_equal(img.shape, (6, 5, 4, 1)))
+                start = [(o - r) // 2 for o, r in zip(img_full.shape, (6,5,4))]
+                img_crop = img_full[start[0]:start[0]+6, start[1]:start[1]+5,
+                                    start[2]:start[2]+4]
+                self.assertTrue(np.allclose(img, img_crop, atol=1e-4))
+                # Random region
+                img = sitk_loader(index, tmp_data.name, resampling=resampling,
+                                  roi=(6, 5, 4), roi_mode="random")
+                self.assertTrue(np.array_equal(img.shape, (6, 5, 4, 1)))
+            # Region larger than volume is filled with outside value
+            img = sitk_loader(index, tmp_data.name, roi=(40, 16, 16),
+                              outside_value=-1000)
+            self.assertTrue(np.array_equal(img.shape, (40, 16, 16, 1)))
+            self.assertTrue(np.all(img[0] == -1000))
+            self.assertRaises(ValueError, sitk_loader, index, tmp_data.name,
+                              roi=(6, 5, 4), roi_mode="test")
+        # Load images via DataGenerator
+        data_gen = DataGenerator(sample_list, tmp_data.name,
+                                 loader=sitk_loader, roi=(8, 8, 8),
+                                 roi_mode="random", resize=None,
+                                 standardize_mode=None, grayscale=True,
+                                 batch_size=2)
+        batch = next(data_gen)
+        self.assertTrue(np.array_equal(batch[0].shape, (2, 8, 8, 8, 1)))
+
     #-------------------------------------------------#
     #                  Cache Loader                   #
     #-------------------------------------------------#
@@ -304,6 +737,42 @@ class IOloaderTEST(unittest.TestCase):
             batch = next(data_gen)
             self.assertTrue(np.array_equal(batch[0].shape, (2, 16, 16, 16, 1)))
 
+    # Test for shared memory cache
+    def test_cache_loader_SharedCache(self):
+        # Create dataset
+        cache = {}
+        for i in range(0, 6):
+            img = np.random.rand(16, 16) * 255
+            cache["image.sample_" + str(i)] = img
+        # Build shared cache and verify image shapes once
+        shared_cache = SharedCache(cache, grayscale=True, two_dim=True)
+        self.assertEqual(len(shared_cache), 6)
+        for index in cache:
+            img = cache_loader(index, None, grayscale=True, two_dim=True,
+                               cache=shared_cache)
+            self.assertTrue(np.array_equal(img.shape, (16, 16, 1)))
+            self.assertTrue(np.array_equal(img[:,:,0], cache[index]))
+            self.assertFalse(img.flags.writeable)
+        self.assertRaises(ValueError, SharedCache, cache, grayscale=False)
+        # Attach to shared memory via pickling
+        attached = pickle.loads(pickle.dumps(shared_cache))
+        self.assertEqual(attached.name, shared_cache.name)
+        self.assertTrue(np.array_equal(attached["image.sample_3"],
+                                       shared_cache["image.sample_3"]))
+        attached.close()
+        # Test DataGenerator with worker processes
+        data_gen = DataGenerator(list(cache.keys()), None, loader=cache_loader,
+                                 resize=None, standardize_mode=None,
+                                 grayscale=True, batch_size=3, workers=2,
+                                 multiprocessing=True, cache=shared_cache)
+        for i in range(0, 2):
+            batch = data_gen[i]
+            self.assertTrue(np.array_equal(batch[0].shape, (3, 16, 16, 1)))
+            self.assertTrue(np.allclose(batch[0][0][:,:,0],
+                                        cache["image.sample_" + str(i*3)]))
+        data_gen._shutdown_pools()
+        shared_cache.close()
+
     # Test for grayscale 2D images
     def test_cache_loader_2Dgray(self):
         # Create temporary directory
@@ -88,6 +88,24 @@ class NeuralNetworkTEST(unittest.TestCase):
         self.assertTrue("tl_loss" in hist and "tl_val_loss" in hist)
         self.assertTrue("ft_loss" in hist and "ft_val_loss" in hist)
 
+    def test_training_tfdataset(self):
+        model = NeuralNetwork(n_labels=4, channels=3, batch_queue_size=1,
+                              input_shape=(32, 32))
+        hist = model.train(training_generator=self.datagen.as_tf_dataset(),
+                           validation_generator=self.datagen.as_tf_dataset(),
+                           epochs=2, iterations=3)
+        self.assertTrue("loss" in hist and "val_loss" in hist)
+
+    def test_training_tfdataset_transferlearning(self):
+        model = NeuralNetwork(n_labels=4, channels=3, batch_queue_size=1,
+                              input_shape=(32, 32))
+        model.tf_epochs = 1
+        hist = model.train(training_generator=self.datagen.as_tf_dataset(),
+                           validation_generator=self.datagen.as_tf_dataset(),
+                           epochs=2, iterations=3, transfer_learning=True)
+        self.assertTrue("tl_loss" in hist and "tl_val_loss" in hist)
+        self.assertTrue("ft_loss" in hist and "ft_val_loss" in hist)
+
     #-------------------------------------------------#
     #                 Model Inference                 #
     #-------------------------------------------------#
@@ -96,3 +114,28 @@ class NeuralNetworkTEST(unittest.TestCase):
         preds = model.predict(self.datagen)
         self.assertTrue(preds.shape == (1, 4))
         self.assertTrue(np.sum(preds) >= 0.99 and np.sum(preds) <= 1.01)
+
+    def test_predict_tfdataset(self):
+        model = NeuralNetwork(n_labels=4, channels=3, batch_queue_size=1,
+                              input_shape=(32, 32))
+        preds = model.predict(self.datagen.as_tf_dataset())
+        self.assertTrue(preds.shape == (1, 4))
+        self.assertTrue(np.allclose(preds, model.predict(self.datagen),
+                                    atol=1e-5))
+
+    def test_predict_multiprocessing(self):
+        datagen = DataGenerator(self.sampleList_rgb, self.tmp_data.name,
+                                resize=(32, 32), grayscale=False,
+                                batch_size=1, workers=2)
+        model = NeuralNetwork(n_labels=4, channels=3, batch_queue_size=1,
+                              multiprocessing=True)
+        preds = model.predict(datagen)
+        self.assertTrue(preds.shape == (1, 4))
+        # Delegated multi-processing is only active during the call
+        self.assertFalse(datagen.multiprocessing)
+        self.assertEqual(datagen.pool_size, 2)
+        # Process pool is kept for further calls
+        pool = datagen.pools[True]
+        preds = model.predict(datagen)
+        self.assertIs(datagen.pools[True], pool)
+        self.assertFalse(datagen.multiprocessing)
@@ -22,9 +22,11 @@
 #External libraries
 import unittest
 import numpy as np
+from scipy import sparse
 from sklearn.datasets import make_classification
 #Internal libraries
 from aucmedi.sampling import sampling_split, sampling_kfold
+from aucmedi.data_processing.sample_table import SampleTable
 
 #-----------------------------------------------------#
 #                  Unittest: Sampling                 #
@@ -182,3 +184,64 @@ class SamplingTEST(unittest.TestCase):
             self.assertTrue(tm.shape[0] > 795 and tm.shape[0] < 805)
             self.assertTrue(vx.shape[0] > 195 and vx.shape[0] < 205)
             self.assertTrue(vm.shape[0] > 195 and vm.shape[0] < 205)
+
+    #-------------------------------------------------#
+    #            Sampling with a SampleTable          #
+    #-------------------------------------------------#
+    def test_SampleTable(self):
+        samples = SampleTable(["sample_" + str(i) for i in range(1000)])
+        sample_labels = {samples[i]: self.y[i] for i in range(1000)}
+        # Check percentage split
+        subsets = sampling_split(samples, self.y, sampling=[0.7, 0.2, 0.1],
+                                 iterative=True, stratified=True)
+        self.assertEqual(sum(len(ss[0]) for ss in subsets), 1000)
+        for (sx, sy) in subsets:
+            self.assertTrue(isinstance(sx, SampleTable))
+            for i in range(len(sx)):
+                self.assertTrue(np.array_equal(sample_labels[sx[i]], sy[i]))
+        self.assertEqual(len(set(subsets[0][0]) | set(subsets[1][0]) | \
+                             set(subsets[2][0])), 1000)
+        # Check k-fold cross-validation
+        subsets = sampling_kfold(samples, self.y, n_splits=3)
+        for (tx, ty, vx, vy) in subsets:
+            self.assertTrue(isinstance(tx, SampleTable))
+            self.assertEqual(len(tx) + len(vx), 1000)
+            self.assertTrue(np.array_equal(sample_labels[vx[0]], vy[0]))
+            self.assertFalse(set(tx) & set(vx))
+
+    #-------------------------------------------------#
+    #          Sampling with sparse annotations       #
+    #-------------------------------------------------#
+    def test_SparseLabels(self):
+        labels = (np.random.rand(1000, 30) < 0.1).astype(np.uint8)
+        labels_sparse = sparse.csr_matrix(labels)
+        # Check iterative percentage split (identical to dense annotations)
+        subsets = sampling_split(self.x, labels, sampling=[0.7, 0.3],
+                                 iterative=True, seed=1)
+        subsets_sparse = sampling_split(self.x, labels_sparse,
+                                        sampling=[0.7, 0.3], iterative=True,
+                                        seed=1)
+        for ss, ss_sparse in zip(subsets, subsets_sparse):
+            self.assertTrue(sparse.issparse(ss_sparse[1]))
+            self.assertTrue(np.array_equal(ss[0], ss_sparse[0]))
+            self.assertTrue(np.array_equal(ss[1], ss_sparse[1].toarray()))
+        # Check iterative k-fold cross-validation (identical to dense annotations)
+        folds = sampling_kfold(self.x, labels, n_splits=3, iterative=True,
+                               seed=1)
+        folds_sparse = sampling_kfold(self.x, labels_sparse, n_splits=3,
+                                      iterative=True, seed=1)
+        for fold, fold_sparse in zip(folds, folds_sparse):
+            self.assertTrue(np.array_equal(fold[2], fold_sparse[2]))
+            self.assertTrue(np.array_equal(fold[3], fold_sparse[3].toarray()))
+        # Check stratified and random sampling
+        labels_sparse = sparse.csr_matrix(self.y)
+        subsets = sampling_split(self.x, labels_sparse, sampling=[0.8, 0.2],
+                                 seed=1)
+        subsets_dense = sampling_split(self.x, self.y, sampling=[0.8, 0.2],
+                                       seed=1)
+        self.assertTrue(sparse.issparse(subsets[1][1]))
+        self.assertTrue(np.array_equal(subsets[1][1].sum(axis=0).A1,
+                                       subsets_dense[1][1].sum(axis=0)))
+        folds = sampling_kfold(self.x, labels_sparse, n_splits=4,
+                               stratified=False)
+        self.assertEqual(folds[0][3].shape, (250, 2))
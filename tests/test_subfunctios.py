@@ -243,3 +243,68 @@ class SubfunctionsTEST(unittest.TestCase):
         self.assertTrue(np.array_equal(img_filtered.shape, (16, 24, 32, 3)))
         self.assertRaises(ValueError, sf.transform, self.img3Dhu.copy())
         self.assertRaises(ValueError, sf.transform, self.img2Drgb.copy())
+
+    #-------------------------------------------------#
+    #          Subfunction: SubfunctionPipeline       #
+    #-------------------------------------------------#
+    def test_PIPELINE_create(self):
+        sf = SubfunctionPipeline([Padding(mode="constant", shape=(32, 32)),
+                                  Crop(shape=(16, 16), mode="center"),
+                                  Clip(min=10, max=200),
+                                  Standardize(mode="z-score"),
+                                  Crop(shape=(8, 8), mode="center"),
+                                  Crop(shape=(4, 4), mode="random"),
+                                  Chromer(target="rgb")])
+        self.assertEqual([step[0] for step in sf.plan],
+                         ["pad_crop", "clip_standardize", "crop",
+                          "transform", "transform"])
+        sf = SubfunctionPipeline([Padding(mode="reflect", shape=(32, 32)),
+                                  Crop(shape=(16, 16), mode="center"),
+                                  Clip(min=10), Standardize(mode="tf")])
+        self.assertEqual([step[0] for step in sf.plan],
+                         ["transform", "crop", "transform", "transform"])
+        sf = SubfunctionPipeline([Padding(mode="edge", shape=(32, 32, 32)),
+                                  Crop(shape=(16, 16, 16), mode="center"),
+                                  Crop(shape=(8, 8, 8), mode="random")])
+        self.assertEqual([step[0] for step in sf.plan],
+                         ["pad_crop", "transform"])
+
+    def test_PIPELINE_shape_preserving(self):
+        sf = SubfunctionPipeline([Clip(min=10, max=200),
+                                  Standardize(mode="z-score")])
+        self.assertTrue(sf.shape_preserving)
+        sf = SubfunctionPipeline([Clip(min=10, max=200),
+                                  Crop(shape=(8, 8), mode="center")])
+        self.assertFalse(sf.shape_preserving)
+
+    def test_PIPELINE_transform(self):
+        images = [self.img2Dgray, self.img2Drgb, self.img3Dgray,
+                  self.img3Dhu, np.uint8(self.img2Drgb),
+                  np.int16(self.img3Dhu)]
+        for img in images:
+            dim = len(img.shape) - 1
+            sf_lists = [[Padding(mode="constant", shape=(40,)*dim),
+                         Crop(shape=(20,)*dim, mode="center")],
+                        [Padding(mode="edge", shape=(20,)*dim),
+                         Crop(shape=(12,)*dim, mode="center")],
+                        [Padding(mode="square"),
+                         Crop(shape=(20,)*dim, mode="center")],
+                        [Crop(shape=(9,)*dim, mode="center")]]
+            for mode in ["z-score", "minmax", "grayscale"]:
+                sf_lists.append([Clip(min=5, max=150),
+                                 Standardize(mode=mode)])
+                sf_lists.append([Clip(max=100), Standardize(mode=mode)])
+            for sf_list in sf_lists:
+                # Apply Subfunctions sequentially
+                img_seq = img.copy()
+                for sf in sf_list : img_seq = sf.transform(img_seq)
+                # Apply fused pipeline
+                sf = SubfunctionPipeline(sf_list)
+                img_fused = sf.transform(img.copy())
+                self.assertEqual(img_seq.dtype, img_fused.dtype)
+                self.assertTrue(np.array_equal(img_seq, img_fused))
+                if dim == 3 : self.assertTrue(img_fused.flags.c_contiguous)
+        # Crop larger than padded image raises like sequential application
+        sf = SubfunctionPipeline([Padding(mode="constant", shape=(20, 20)),
+                                  Crop(shape=(30, 30), mode="center")])
+        self.assertRaises(ValueError, sf.transform, self.img2Dgray.copy())
@@ -85,3 +85,22 @@ class UtilityTEST(unittest.TestCase):
         for key in hist_returned:
             self.assertTrue(key in hist_returned and key in hist_loaded)
             self.assertTrue(len(hist_returned[key]) == len(hist_loaded[key]))
+
+    #-------------------------------------------------#
+    #            Callbacks: ProfilerLogger            #
+    #-------------------------------------------------#
+    def test_Callbacks_ProfilerLogger(self):
+        tmp_model = tempfile.TemporaryDirectory(prefix="tmp.aucmedi.",
+                                                suffix=".model")
+        path_csv = os.path.join(tmp_model.name, "profiling.csv")
+        datagen = DataGenerator(self.sampleList_rgb, self.tmp_data.name,
+                                labels=self.labels_ohe, resize=(32, 32),
+                                grayscale=False, batch_size=1, profiling=True)
+        cb_profiler = ProfilerLogger(datagen.profiler, path=path_csv,
+                                     verbose=0)
+        model = NeuralNetwork(n_labels=4, channels=3, batch_queue_size=1)
+        model.train(training_generator=datagen, epochs=3,
+                    callbacks=[cb_profiler])
+        self.assertEqual(len(cb_profiler.history), 3)
+        self.assertTrue("loader" in cb_profiler.history[0].index)
+        self.assertTrue(os.path.exists(path_csv))